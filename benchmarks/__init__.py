@@ -0,0 +1 @@
+"""Benchmarks do Coloeus (executar a partir da raiz do repositório com python -m benchmarks.<nome>)"""
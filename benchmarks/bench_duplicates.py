@@ -0,0 +1,99 @@
+"""
+Compara a busca de duplicatas em etapas (tamanho, hash parcial, hash
+completo) com a abordagem ingênua de calcular o hash completo de todos os
+arquivos, em bytes lidos e tempo, e mede a repetição com o cache de hashes.
+
+    python -m benchmarks.bench_duplicates --files 2000 --max-size 4194304
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from duplicates import DuplicateStats, HashCache, find_duplicates, full_hash
+from scan_result import ScanResult
+from scanner_engine import ParallelWalker
+
+
+def make_duplicates_tree(root: str, files: int, max_size: int, duplicate_ratio: float, seed: int = 0):
+    """
+    Cria arquivos com conteúdo aleatório em que uma fração são cópias de
+    outros e vários têm o mesmo tamanho sem ter o mesmo conteúdo
+    """
+    rng = random.Random(seed)
+    # Poucos tamanhos distintos, para forçar colisões na primeira etapa
+    sizes = [rng.randint(1, max_size) for _ in range(max(1, files // 20))]
+    originals = []
+    for i in range(files):
+        dirpath = os.path.join(root, f"d{i % 50}")
+        os.makedirs(dirpath, exist_ok=True)
+        path = os.path.join(dirpath, f"f{i}.dat")
+        if originals and rng.random() < duplicate_ratio:
+            shutil.copyfile(rng.choice(originals), path)
+            continue
+        with open(path, "wb") as fh:
+            fh.write(rng.randbytes(rng.choice(sizes)))
+        originals.append(path)
+
+
+def scan(root: str) -> ScanResult:
+    result = ScanResult()
+    for dirpath, rows in ParallelWalker().walk([root]):
+        result.add_rows(dirpath, rows)
+    return result
+
+
+def naive(files: ScanResult):
+    """Hash completo de todos os arquivos, agrupando por hash"""
+    groups = {}
+    bytes_read = 0
+    for i in range(len(files)):
+        digest, read = full_hash(files.path_at(i), files.sizes[i])
+        bytes_read += read
+        groups.setdefault(digest, []).append(i)
+    return sum(1 for members in groups.values() if len(members) > 1), bytes_read
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="arquivos na árvore sintética")
+    parser.add_argument("--max-size", type=int, default=1024 * 1024, help="tamanho máximo de cada arquivo")
+    parser.add_argument("--duplicates", type=float, default=0.2, help="fração de arquivos que são cópias")
+    parser.add_argument("--root", help="usa uma árvore existente em vez de gerar uma")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="coloeus-bench-")
+    root = args.root
+    if not root:
+        root = os.path.join(tmp, "tree")
+        make_duplicates_tree(root, args.files, args.max_size, args.duplicates)
+
+    try:
+        files = scan(root)
+
+        start = time.perf_counter()
+        naive_groups, naive_bytes = naive(files)
+        naive_time = time.perf_counter() - start
+
+        cache = HashCache(os.path.join(tmp, "hash_cache.db"))
+        cold = DuplicateStats()
+        cold_groups = len(find_duplicates(files, cache=cache, stats=cold))
+        warm = DuplicateStats()
+        find_duplicates(files, cache=cache, stats=warm)
+        cache.close()
+
+        print(f"{len(files)} arquivos, {files.total_size / 1024**2:.1f} MB")
+        print(f"{'abordagem':>18} {'grupos':>7} {'MB lidos':>9} {'tempo (s)':>10}")
+        print(f"{'hash completo':>18} {naive_groups:>7} {naive_bytes / 1024**2:>9.1f} {naive_time:>10.2f}")
+        print(f"{'etapas':>18} {cold_groups:>7} {cold.bytes_read / 1024**2:>9.1f} {cold.elapsed:>10.2f}")
+        print(f"{'etapas com cache':>18} {cold_groups:>7} {warm.bytes_read / 1024**2:>9.1f} {warm.elapsed:>10.2f}")
+        print(f"Bytes lidos (etapas/ingênuo): {cold.bytes_read / max(naive_bytes, 1):.1%} "
+              f"- hash parcial: {cold.partial_hashed}, completo: {cold.full_hashed}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
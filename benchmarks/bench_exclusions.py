@@ -0,0 +1,70 @@
+"""
+Mede quanto as exclusões podam de uma varredura em uma árvore com a forma
+de um disco do Windows (WinSxS, lixeira, temporários, caches de navegador,
+node_modules e .git). Cada configuração roda --repeat vezes com o cache do
+sistema de arquivos já aquecido; vale a melhor.
+
+    python -m benchmarks.bench_exclusions --files 300000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_windows_tree
+from exclusions import ExclusionRules
+from scanner_engine import ParallelWalker, ScanFilter, ScanStats
+
+CONFIGS = [
+    ("sem exclusões", {}),
+    ("system", {"exclude": ExclusionRules(presets=["system"])}),
+    ("system+dev", {"exclude": ExclusionRules(presets=["system", "dev"])}),
+    ("system+dev+caches", {"exclude": ExclusionRules(presets=["system", "dev", "caches"])}),
+    ("max_depth 3", {"max_depth": 3}),
+    ("sem reparse/volume", {"same_filesystem": True, "skip_reparse_points": True}),
+]
+
+
+def scan(root: str, options: dict, repeat: int) -> ScanStats:
+    best = None
+    for _ in range(repeat):
+        stats = ScanStats()
+        for _ in ParallelWalker(ScanFilter(**options)).walk([root], stats):
+            pass
+        if best is None or stats.elapsed < best.elapsed:
+            best = stats
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200_000, help="arquivos na árvore sintética")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por configuração (vale a melhor)")
+    parser.add_argument("--root", help="usa uma árvore existente em vez de gerar uma")
+    args = parser.parse_args()
+
+    root = args.root
+    tmp = None
+    if not root:
+        tmp = tempfile.mkdtemp(prefix="coloeus-bench-")
+        root = os.path.join(tmp, "C")
+        start = time.perf_counter()
+        dirs = make_windows_tree(root, args.files)
+        print(f"Árvore sintética: {args.files} arquivos, {dirs} diretórios ({time.perf_counter() - start:.1f}s)")
+
+    try:
+        baseline = None
+        print(f"{'configuração':>20} {'tempo (s)':>10} {'pastas':>9} {'arquivos':>10} {'podadas':>8} {'redução':>8}")
+        for label, options in CONFIGS:
+            stats = scan(root, options, args.repeat)
+            baseline = baseline or stats.elapsed
+            print(f"{label:>20} {stats.elapsed:>10.2f} {stats.dirs_visited:>9} {stats.files_examined:>10} "
+                  f"{stats.dirs_pruned:>8} {1 - stats.elapsed / baseline:>8.0%}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Mede o custo de importar os módulos do scanner com -X importtime (em um
+processo novo a cada repetição) e confere um orçamento: o melhor tempo
+acumulado de cada módulo deve ficar abaixo de --budget ms e nenhum módulo
+proibido (Qt, ctypes, winreg, subprocess) pode ser carregado por ele.
+Sai com código 1 se algum módulo estourar o orçamento.
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --module script --budget 100 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Módulos que só o scanner precisa importar, sem interface nem chamadas ao Windows
+DEFAULT_MODULES = ["script", "coloeus"]
+FORBIDDEN = ["PySide6", "ctypes", "winreg", "subprocess"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module: str) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Importa module em um processo novo e retorna ({módulo: µs acumulados},
+    módulos proibidos carregados)
+    """
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {FORBIDDEN!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        if cumulative_us.isdigit():
+            cumulative[name] = int(cumulative_us)
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help="módulo a medir (repetível; padrão: script e coloeus)")
+    parser.add_argument("--budget", type=float, default=100.0, help="tempo máximo de importação em ms")
+    parser.add_argument("--repeat", type=int, default=5, help="processos por módulo (vale o melhor)")
+    parser.add_argument("--top", type=int, default=10, help="dependências mais caras listadas")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.module or DEFAULT_MODULES:
+        # O primeiro processo também grava os .pyc
+        import_profile(module)
+        runs = [import_profile(module) for _ in range(args.repeat)]
+        best, loaded = min(runs, key=lambda run: run[0].get(module, 0))
+        total = best.get(module, 0) / 1000
+
+        over = total > args.budget or loaded
+        failed = failed or bool(over)
+        print(f"{module}: {total:.1f} ms (orçamento {args.budget:.0f} ms)"
+              + (f" - carrega {', '.join(loaded)}" if loaded else "")
+              + (" ESTOUROU" if over else ""))
+        print(f"  {'dependência':>24} {'acumulado (ms)':>15}")
+        ranked = sorted((item for item in best.items() if item[0] != module), key=lambda item: -item[1])
+        for name, cumulative_us in ranked[:args.top]:
+            print(f"  {name:>24} {cumulative_us / 1000:>15.1f}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Mede a vazão da varredura de várias raízes independentes (uma árvore
+sintética por "disco") em um único processo com threads e com um processo
+por raiz (ProcessWalker). Com discos e núcleos livres, a vazão com
+processos deve crescer quase linearmente com o número de raízes; a coluna
+"aditiva" compara a vazão obtida com N vezes a de uma raiz sozinha.
+
+Em uma única máquina as árvores sintéticas dividem o mesmo disco (e ficam
+no cache do sistema depois da primeira leitura), então o limite medido é
+o processador: use --root com pastas em discos diferentes para medir o
+caso real.
+
+    python -m benchmarks.bench_processes --files 200000 --roots 4
+    python -m benchmarks.bench_processes --root D:\\ --root E:\\ --repeat 1
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_tree
+from process_scan import ProcessWalker
+from scanner_engine import ParallelWalker, ScanFilter, ScanStats
+from scan_result import ScanResult
+
+
+def scan_threads(roots, workers):
+    """Todas as raízes em um ParallelWalker, como scan_files sem processes"""
+    stats = ScanStats()
+    result = ScanResult()
+    for dirpath, rows in ParallelWalker(ScanFilter(), workers=workers).walk(roots, stats):
+        if rows:
+            result.add_rows(dirpath, rows)
+    return result, stats
+
+
+def scan_processes(roots, workers):
+    """Uma raiz por processo, juntando os lotes serializados como scan_files com processes"""
+    stats = ScanStats()
+    result = ScanResult()
+    walker = ProcessWalker(ParallelWalker(ScanFilter(), workers=workers), processes=len(roots), per_root=True)
+    for batch in walker.walk_results(roots, stats):
+        result.extend(batch)
+    return result, stats
+
+
+def best_of(repeat, scan, roots, workers):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result, _ = scan(roots, workers)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, len(result))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="arquivos em cada árvore sintética")
+    parser.add_argument("--roots", type=int, default=4, help="quantidade de árvores sintéticas")
+    parser.add_argument("--root", action="append", help="usa pastas existentes (uma por disco) em vez de gerar árvores")
+    parser.add_argument("--workers", type=int, help="threads por processo (padrão do walker)")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por configuração (vale a melhor)")
+    args = parser.parse_args()
+
+    roots = args.root
+    tmp = None
+    if not roots:
+        tmp = tempfile.mkdtemp(prefix="coloeus-bench-")
+        roots = []
+        start = time.perf_counter()
+        for i in range(args.roots):
+            root = os.path.join(tmp, f"disk{i}")
+            make_tree(root, args.files, seed=i)
+            roots.append(root)
+        print(f"Árvores sintéticas: {args.roots} x {args.files} arquivos ({time.perf_counter() - start:.1f}s)")
+    print(f"Núcleos: {os.cpu_count()}")
+
+    try:
+        # Aquece o cache do sistema para todas as configurações lerem do mesmo jeito
+        scan_threads(roots, args.workers)
+        single, single_files = best_of(args.repeat, scan_threads, roots[:1], args.workers)
+        single_rate = single_files / single
+
+        print(f"{'modo':>10} {'raízes':>7} {'tempo (s)':>10} {'arquivos':>10} {'arquivos/s':>12} {'aditiva':>8}")
+        print(f"{'1 raiz':>10} {1:>7} {single:>10.2f} {single_files:>10} {single_rate:>12.0f} {1:>8.2f}")
+        for name, scan in (("threads", scan_threads), ("processos", scan_processes)):
+            elapsed, files = best_of(args.repeat, scan, roots, args.workers)
+            rate = files / elapsed
+            print(f"{name:>10} {len(roots):>7} {elapsed:>10.2f} {files:>10} {rate:>12.0f} "
+                  f"{rate / (single_rate * len(roots)):>8.2f}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Mede o custo do relatório de progresso no walk: alterna execuções com e sem
+callback de progresso e compara o melhor tempo de cada modo. Com --index o
+walk é respondido pelo índice (só o loop em Python, sem E/S), o pior caso
+para o overhead relativo.
+
+    python -m benchmarks.bench_progress --files 200000 --repeat 15
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_tree
+from scan_index import ScanIndex
+from scanner_engine import ParallelWalker, ScanFilter
+
+
+def timed_walk(root: str, index, progress) -> float:
+    walker = ParallelWalker(ScanFilter(min_size=1024), index=index, progress=progress)
+    start = time.perf_counter()
+    for _ in walker.walk([root]):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="arquivos na árvore sintética")
+    parser.add_argument("--root", help="usa uma árvore existente em vez de gerar uma")
+    parser.add_argument("--repeat", type=int, default=10, help="execuções de cada modo")
+    parser.add_argument("--index", action="store_true", help="responde o walk pelo índice persistente")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="coloeus-bench-")
+    root = args.root
+    if not root:
+        root = os.path.join(tmp, "tree")
+        make_tree(root, args.files)
+
+    try:
+        index = ScanIndex(os.path.join(tmp, "scan_index.db")) if args.index else None
+        reports = []
+        # Aquece o cache de páginas (e o índice)
+        timed_walk(root, index, None)
+        timed_walk(root, index, reports.append)
+
+        plain, with_progress = [], []
+        reports.clear()
+        for _ in range(args.repeat):
+            plain.append(timed_walk(root, index, None))
+            with_progress.append(timed_walk(root, index, reports.append))
+        if index is not None:
+            index.close()
+
+        best_plain, best_progress = min(plain), min(with_progress)
+        print(f"{'modo':>14} {'melhor (s)':>11} {'média (s)':>10}")
+        print(f"{'sem progresso':>14} {best_plain:>11.3f} {sum(plain) / len(plain):>10.3f}")
+        print(f"{'com progresso':>14} {best_progress:>11.3f} {sum(with_progress) / len(with_progress):>10.3f}")
+        print(f"Overhead: {best_progress / best_plain - 1:+.1%} "
+              f"({len(reports) / args.repeat:.0f} relatórios por walk)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
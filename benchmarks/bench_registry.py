@@ -0,0 +1,99 @@
+"""
+Compara a leitura das chaves de desinstalação do jeito antigo (hives em
+série, um QueryValueEx por valor) com read_uninstall_entries (uma passada
+de EnumValue por subchave, hives e blocos de subchaves em paralelo) sobre
+um registro sintético em memória. latency simula o custo de cada chamada.
+Depois altera, remove e cria --changes entradas e mede o refresh
+incremental do RegistrySnapshot (só última gravação + entradas alteradas).
+
+    python -m benchmarks.bench_registry --entries 5000 --latency 0.00005
+    python -m benchmarks.bench_registry --real   # registro real (Windows)
+"""
+import argparse
+import random
+import time
+
+from benchmarks.synthetic import synthetic_registry
+from registry import (
+    REG_SZ, UNINSTALL_KEYS, FakeRegistryBackend, RegistryBackend, RegistrySnapshot, WinRegBackend,
+    read_uninstall_entries
+)
+
+# Valores consultados pela listagem antiga, na mesma ordem
+LEGACY_VALUES = ["DisplayName", "InstallLocation", "DisplayVersion", "EstimatedSize",
+                 "UninstallString", "Publisher", "DisplayIcon"]
+
+
+def legacy_read(backend: RegistryBackend):
+    """Hives em série e um QueryValueEx por valor, como a listagem original"""
+    entries = []
+    for hive, path in UNINSTALL_KEYS:
+        try:
+            names = backend.list_subkeys(hive, path)
+        except OSError:
+            continue
+        for name in names:
+            values = {}
+            for value_name in LEGACY_VALUES:
+                try:
+                    values[value_name] = backend.query_value(hive, f"{path}\\{name}", value_name)
+                except OSError:
+                    if value_name == "DisplayName":
+                        break
+            entries.append((name, values))
+    return entries
+
+
+def simulate_changes(backend: FakeRegistryBackend, changes: int, seed: int = 1):
+    """Atualiza, desinstala e instala changes entradas cada (como após algumas (des)instalações)"""
+    rng = random.Random(seed)
+    hive, path = UNINSTALL_KEYS[0]
+    names = backend.list_subkeys(hive, path)
+    picked = rng.sample(names, min(len(names), 2 * changes))
+    for name in picked[:changes]:
+        backend.set_values(hive, f"{path}\\{name}", {"DisplayVersion": ("99.0", REG_SZ)})
+    for name in picked[changes:]:
+        backend.delete_key(hive, f"{path}\\{name}")
+    for i in range(changes):
+        backend.set_values(hive, f"{path}\\{{NOVO{i:04X}}}", {"DisplayName": (f"Programa novo {i}", REG_SZ)})
+
+
+def timed(function, backend):
+    calls_before = getattr(backend, "calls", 0)
+    start = time.perf_counter()
+    entries = function(backend)
+    return time.perf_counter() - start, len(entries), getattr(backend, "calls", 0) - calls_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=5000, help="entradas no registro sintético")
+    parser.add_argument("--latency", type=float, default=0.00005, help="segundos simulados por chamada ao registro")
+    parser.add_argument("--workers", type=int, default=8, help="threads de leitura")
+    parser.add_argument("--changes", type=int, default=5, help="entradas alteradas, removidas e criadas")
+    parser.add_argument("--save", help="salva o registro sintético em JSON")
+    parser.add_argument("--real", action="store_true", help="usa o registro real do Windows")
+    args = parser.parse_args()
+
+    backend = WinRegBackend() if args.real else synthetic_registry(args.entries, args.latency)
+    if args.save and not args.real:
+        backend.to_json(args.save)
+
+    legacy = timed(legacy_read, backend)
+    parallel = timed(lambda b: read_uninstall_entries(b, workers=args.workers), backend)
+    snapshot = RegistrySnapshot(workers=args.workers)
+    snapshot.refresh(backend)
+    if not args.real:
+        simulate_changes(backend, args.changes)
+    incremental = timed(snapshot.refresh, backend)
+
+    print(f"{'leitura':>22} {'tempo (s)':>10} {'entradas':>9} {'chamadas':>9}")
+    print(f"{'série + QueryValueEx':>22} {legacy[0]:>10.3f} {legacy[1]:>9} {legacy[2]:>9}")
+    print(f"{'paralela + EnumValue':>22} {parallel[0]:>10.3f} {parallel[1]:>9} {parallel[2]:>9}")
+    print(f"{'refresh incremental':>22} {incremental[0]:>10.3f} {incremental[1]:>9} {incremental[2]:>9}")
+    print(f"Aceleração: {legacy[0] / parallel[0]:.1f}x (incremental: {legacy[0] / incremental[0]:.1f}x, "
+          f"{snapshot.reread} entradas relidas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compara uma varredura fria (índice vazio) com uma morna (árvore sem mudanças)
+usando o índice persistente do ParallelWalker.
+
+    python -m benchmarks.bench_scan_index --files 500000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_tree
+from scan_index import ScanIndex
+from scanner_engine import ParallelWalker, ScanFilter, ScanStats
+
+
+def timed_walk(root: str, index: ScanIndex, force_rescan: bool = False) -> ScanStats:
+    stats = ScanStats()
+    walker = ParallelWalker(ScanFilter(min_size=1024), index=index, force_rescan=force_rescan)
+    for _ in walker.walk([root], stats):
+        pass
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="arquivos na árvore sintética")
+    parser.add_argument("--root", help="usa uma árvore existente em vez de gerar uma")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="coloeus-bench-")
+    root = args.root
+    if not root:
+        root = os.path.join(tmp, "tree")
+        make_tree(root, args.files)
+
+    try:
+        index = ScanIndex(os.path.join(tmp, "scan_index.db"))
+        start = time.perf_counter()
+        cold = timed_walk(root, index)
+        cold_total = time.perf_counter() - start
+        start = time.perf_counter()
+        warm = timed_walk(root, index)
+        warm_total = time.perf_counter() - start
+        index.close()
+
+        print(f"{'varredura':>10} {'walk (s)':>9} {'total (s)':>10} {'pastas do índice':>17}")
+        print(f"{'fria':>10} {cold.elapsed:>9.2f} {cold_total:>10.2f} {cold.dirs_from_index:>17}")
+        print(f"{'morna':>10} {warm.elapsed:>9.2f} {warm_total:>10.2f} {warm.dirs_from_index:>17}")
+        print(f"Morna/fria: {warm_total / cold_total:.1%}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
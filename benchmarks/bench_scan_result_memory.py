@@ -0,0 +1,59 @@
+"""
+Compara a memória por entrada de uma lista de FileInfo com o ScanResult
+colunar, usando linhas sintéticas (sem tocar no disco).
+
+    python -m benchmarks.bench_scan_result_memory --rows 2000000
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_batches
+from scan_result import ScanResult
+from script import FileInfo
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def build_file_infos(rows: int):
+    files = []
+    for dirpath, batch in synthetic_batches(rows):
+        for name, size, last_accessed, last_modified, ext, is_directory in batch:
+            # Mesma construção do scan_files anterior (strings novas por entrada)
+            files.append(FileInfo(os.path.join(dirpath, name), size, last_accessed, last_modified,
+                                  os.path.splitext(name)[1].lower(), is_directory))
+    return files
+
+
+def build_scan_result(rows: int):
+    result = ScanResult()
+    for dirpath, batch in synthetic_batches(rows):
+        result.add_rows(dirpath, batch)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    print(f"{'formato':>14} {'bytes/entrada':>14} {'total (MB)':>11} {'montagem (s)':>13}")
+    for label, build in (("FileInfo", build_file_infos), ("ScanResult", build_scan_result)):
+        result, current, elapsed = measure(lambda: build(args.rows))
+        print(f"{label:>14} {current / args.rows:>14.1f} {current / 1024**2:>11.1f} {elapsed:>13.2f}")
+        del result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Mede a escalabilidade do ParallelWalker em função do número de threads.
+
+    python -m benchmarks.bench_scan_workers --files 1000000 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import make_tree
+from scanner_engine import ParallelWalker, ScanFilter, ScanStats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000, help="arquivos na árvore sintética")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--root", help="usa uma árvore existente em vez de gerar uma")
+    args = parser.parse_args()
+
+    root = args.root
+    tmp = None
+    if not root:
+        tmp = tempfile.mkdtemp(prefix="coloeus-bench-")
+        root = os.path.join(tmp, "tree")
+        start = time.perf_counter()
+        dirs = make_tree(root, args.files)
+        print(f"Árvore sintética: {args.files} arquivos, {dirs} diretórios ({time.perf_counter() - start:.1f}s)")
+
+    try:
+        baseline = None
+        print(f"{'threads':>8} {'tempo (s)':>10} {'pastas/s':>12} {'arquivos/s':>12} {'speedup':>8}")
+        for workers in args.workers:
+            stats = ScanStats()
+            walker = ParallelWalker(ScanFilter(), workers=workers)
+            for _ in walker.walk([root], stats):
+                pass
+            baseline = baseline or stats.elapsed
+            print(f"{stats.workers:>8} {stats.elapsed:>10.2f} {stats.dirs_per_second:>12.0f} "
+                  f"{stats.files_examined / stats.elapsed:>12.0f} {baseline / stats.elapsed:>8.2f}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
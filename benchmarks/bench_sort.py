@@ -0,0 +1,45 @@
+"""
+Mede a ordenação do ScanResult por coluna (permutação calculada e em cache)
+e a ordem padrão do scanner (tamanho decrescente e caminho).
+
+    python -m benchmarks.bench_sort --rows 1000000
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_batches
+from scan_result import ScanResult
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    result = ScanResult()
+    for dirpath, batch in synthetic_batches(args.rows):
+        result.add_rows(dirpath, batch)
+
+    print(f"{'ordenação':>22} {'tempo (s)':>10}")
+    for label, column, descending in (
+        ("tamanho ↓", "size", True),
+        ("tamanho ↑ (cache)", "size", False),
+        ("modificado ↓", "mtime", True),
+        ("nome ↑", "name", False),
+        ("tamanho ↓ (cache)", "size", True),
+    ):
+        start = time.perf_counter()
+        result.sort_by(column, descending)
+        print(f"{label:>22} {time.perf_counter() - start:>10.3f}")
+
+    sizes = [row.size for row in result[:1000]]
+    assert sizes == sorted(sizes, reverse=True), "ordem por bytes incorreta"
+
+    result._argsort_cache.clear()
+    start = time.perf_counter()
+    result.sort()
+    print(f"{'padrão do scanner':>22} {time.perf_counter() - start:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
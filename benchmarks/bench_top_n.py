@@ -0,0 +1,64 @@
+"""
+Compara scan_files com lista completa contra o modo top_n (heap limitado).
+Cada modo roda em um subprocesso próprio para medir o pico de RSS isoladamente.
+
+    python -m benchmarks.bench_top_n --files 500000 --top-n 1000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.measure import peak_rss_bytes
+from benchmarks.synthetic import make_tree
+
+
+def run_child(root: str, top_n: int):
+    from script import SystemScanner
+
+    start = time.perf_counter()
+    files = SystemScanner.scan_files([root], top_n=top_n or None)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"elapsed": elapsed, "results": len(files), "peak_rss": peak_rss_bytes()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200_000, help="arquivos na árvore sintética")
+    parser.add_argument("--top-n", type=int, default=1000)
+    parser.add_argument("--root", help="usa uma árvore existente em vez de gerar uma")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_child(args.root, args.child)
+        return
+
+    root = args.root
+    tmp = None
+    if not root:
+        tmp = tempfile.mkdtemp(prefix="coloeus-bench-")
+        root = os.path.join(tmp, "tree")
+        make_tree(root, args.files)
+
+    try:
+        print(f"{'modo':>12} {'tempo (s)':>10} {'resultados':>11} {'pico RSS (MB)':>14}")
+        for label, top_n in (("completo", 0), (f"top {args.top_n}", args.top_n)):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_top_n", "--root", root, "--child", str(top_n)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{label:>12} {result['elapsed']:>10.2f} {result['results']:>11} "
+                  f"{result['peak_rss'] / 1024**2:>14.1f}")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Conjunto reproduzível de benchmarks do scanner, da listagem de programas e
+do preenchimento da interface. Roda sem tela (Qt offscreen, registro
+sintético), então serve também no Linux. Cada caso roda em um processo
+novo, para o pico de memória (RSS) medido ser só dele; o melhor de
+--repeat execuções é o que vale.
+
+Os resultados podem ser gravados como baseline em benchmarks/results e
+comparados com execuções futuras: --compare sai com código 1 se o tempo
+ou a memória de algum caso piorar mais que --threshold.
+
+    python -m benchmarks.suite --list
+    python -m benchmarks.suite --case scan-wide --case ui-files
+    python -m benchmarks.suite --scale 0.1 --save baseline
+    python -m benchmarks.suite --scale 0.1 --compare baseline
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.measure import peak_rss_bytes
+from benchmarks.synthetic import (
+    make_deep_tree, make_huge_files, make_tree, make_windows_tree, synthetic_batches, synthetic_registry
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Métricas comparadas com a baseline (maior é pior)
+COMPARED = ["seconds", "peak_rss"]
+
+
+@dataclass
+class Case:
+    """Um benchmark: prepare gera os dados (fora da medição) e run devolve (segundos, itens)"""
+    name: str
+    description: str
+    prepare: Callable[[str, float], None]
+    run: Callable[[str, float], tuple]
+
+
+def _scaled(value: int, scale: float) -> int:
+    return max(1, int(value * scale))
+
+
+# --- Varredura -------------------------------------------------------------
+
+TREES = {
+    "scan-deep": ("cadeias de 40 pastas aninhadas, 10 arquivos por nível",
+                  lambda root, scale: make_deep_tree(root, _scaled(50_000, scale))),
+    "scan-wide": ("64 subpastas por pasta, 20 arquivos em cada",
+                  lambda root, scale: make_tree(root, _scaled(50_000, scale), files_per_dir=20, fanout=64)),
+    "scan-small": ("muitos arquivos pequenos (500 por pasta, até 512 bytes)",
+                   lambda root, scale: make_tree(root, _scaled(200_000, scale), files_per_dir=500,
+                                                 max_file_size=512)),
+    "scan-huge": ("poucos arquivos enormes (esparsos, 4 GB cada)",
+                  lambda root, scale: make_huge_files(root, _scaled(50, scale))),
+    "scan-windows": ("disco com a forma do Windows (WinSxS, lixeira, caches, node_modules)",
+                     lambda root, scale: make_windows_tree(root, _scaled(100_000, scale))),
+}
+# Presets de exclusions usados no caso scan-excluded
+EXCLUDED_PRESETS = ["system", "dev", "caches"]
+
+
+def _tree_root(workdir: str, name: str) -> str:
+    return os.path.join(workdir, name)
+
+
+def _prepare_tree(name: str):
+    def prepare(workdir: str, scale: float):
+        root = _tree_root(workdir, name)
+        marker = os.path.join(workdir, f"{name}.done")
+        # Com --workdir, a árvore é reaproveitada entre execuções da mesma escala
+        if os.path.exists(marker) and open(marker).read() == str(scale):
+            return
+        shutil.rmtree(root, ignore_errors=True)
+        TREES[name][1](root, scale)
+        with open(marker, "w") as fh:
+            fh.write(str(scale))
+    return prepare
+
+
+def _run_scan(name: str, presets: Optional[List[str]] = None):
+    def run(workdir: str, scale: float):
+        from script import ExclusionRules, ScanStats, SystemScanner
+        options = {}
+        if presets:
+            options = dict(exclude=ExclusionRules(presets=presets), same_filesystem=True, skip_reparse_points=True)
+        stats = ScanStats()
+        start = time.perf_counter()
+        result = SystemScanner.scan_files([_tree_root(workdir, name)], stats=stats, **options)
+        elapsed = time.perf_counter() - start
+        assert len(result) == stats.files_matched
+        return elapsed, stats.files_examined
+    return run
+
+
+# --- Programas instalados ----------------------------------------------------
+
+def _registry_path(workdir: str) -> str:
+    return os.path.join(workdir, "registry.json")
+
+
+def _prepare_registry(workdir: str, scale: float):
+    synthetic_registry(_scaled(5000, scale)).to_json(_registry_path(workdir))
+
+
+def _run_programs(workdir: str, scale: float):
+    from registry import FakeRegistryBackend
+    from script import SystemScanner
+    backend = FakeRegistryBackend.from_json(_registry_path(workdir))
+    start = time.perf_counter()
+    programs = SystemScanner.get_installed_programs(backend=backend, full_refresh=True)
+    return time.perf_counter() - start, len(programs)
+
+
+# --- Interface (Qt offscreen) ------------------------------------------------
+
+def _window():
+    """Janela principal sem tela e sem os avisos modais (que bloqueariam o processo)"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QMessageBox
+    app = QApplication.instance() or QApplication([])
+    QMessageBox.exec = lambda self: QMessageBox.Ok
+    from ui import FileScannerWindow
+    window = FileScannerWindow()
+    window.show()
+    window.build_pending_tabs()
+    app.processEvents()
+    return app, window
+
+
+def _nothing(workdir: str, scale: float):
+    pass
+
+
+def _run_ui_startup(workdir: str, scale: float):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QMessageBox
+    app = QApplication.instance() or QApplication([])
+    QMessageBox.exec = lambda self: QMessageBox.Ok
+    start = time.perf_counter()
+    from ui import FileScannerWindow
+    window = FileScannerWindow()
+    window.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    window.close()
+    return elapsed, 1
+
+
+def _run_ui_files(workdir: str, scale: float):
+    from script import ScanResult
+    result = ScanResult()
+    for dirpath, rows in synthetic_batches(_scaled(500_000, scale)):
+        result.add_rows(dirpath, rows)
+    result.sort()
+    app, window = _window()
+    start = time.perf_counter()
+    window.display_files(result)
+    # Inclui a primeira pintura da tabela
+    window.files_table.viewport().repaint()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    window.close()
+    return elapsed, len(result)
+
+
+def _run_ui_programs(workdir: str, scale: float):
+    from registry import FakeRegistryBackend
+    from script import SystemScanner
+    programs = SystemScanner.get_installed_programs(backend=FakeRegistryBackend.from_json(_registry_path(workdir)))
+    app, window = _window()
+    start = time.perf_counter()
+    window.display_programs(programs)
+    window.programs_table.viewport().repaint()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    window.cancel_thread(window.icon_thread)
+    window.icon_thread.wait()
+    window.close()
+    return elapsed, len(programs)
+
+
+CASES: Dict[str, Case] = {}
+for _name, (_description, _) in TREES.items():
+    CASES[_name] = Case(_name, f"scan_files: {_description}", _prepare_tree(_name), _run_scan(_name))
+CASES["scan-excluded"] = Case("scan-excluded", f"scan-windows com os presets {'+'.join(EXCLUDED_PRESETS)} e sem junções",
+                              _prepare_tree("scan-windows"), _run_scan("scan-windows", EXCLUDED_PRESETS))
+CASES["programs"] = Case("programs", "get_installed_programs sobre 5000 entradas sintéticas (escala 1)",
+                         _prepare_registry, _run_programs)
+CASES["ui-startup"] = Case("ui-startup", "criação e primeira exibição da janela", _nothing, _run_ui_startup)
+CASES["ui-files"] = Case("ui-files", "display_files com 500 mil linhas (escala 1)", _nothing, _run_ui_files)
+CASES["ui-programs"] = Case("ui-programs", "display_programs com a lista sintética", _prepare_registry,
+                            _run_ui_programs)
+
+
+def run_in_process(name: str, workdir: str, scale: float, repeat: int) -> Dict[str, float]:
+    """Executa o caso neste processo (chamado pelo processo filho)"""
+    import logging
+    logging.disable(logging.INFO)
+    case = CASES[name]
+    runs = [case.run(workdir, scale) for _ in range(repeat)]
+    seconds, items = min(runs)
+    return {
+        "seconds": seconds,
+        "items": items,
+        "items_per_second": items / seconds if seconds > 0 else 0.0,
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+def run_case(name: str, workdir: str, scale: float, repeat: int) -> Dict[str, float]:
+    """Prepara os dados e mede o caso em um processo novo"""
+    CASES[name].prepare(workdir, scale)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--run-case", name, "--workdir", workdir,
+         "--scale", str(scale), "--repeat", str(repeat)],
+        capture_output=True, text=True, cwd=ROOT, env=env
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} falhou:\n{proc.stderr.strip()}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def result_path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(RESULTS_DIR, f"{name}.json")
+
+
+def save_results(name: str, results: Dict[str, Dict[str, float]], scale: float):
+    path = result_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": {
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+            },
+            "scale": scale,
+            "cases": results,
+        }, fh, indent=2)
+    print(f"Resultados gravados em {path}")
+
+
+def load_results(name: str) -> dict:
+    with open(result_path(name), "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: dict, threshold: float) -> List[str]:
+    """Imprime as variações em relação à baseline e retorna os casos que pioraram"""
+    regressions = []
+    print(f"\n{'caso':>13} {'tempo':>9} {'Δ tempo':>9} {'Δ RSS':>9}")
+    for name, metrics in results.items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            print(f"{name:>13} {metrics['seconds']:>9.3f} {'(novo)':>9}")
+            continue
+        deltas = {
+            metric: metrics[metric] / before[metric] - 1 if before[metric] else 0.0
+            for metric in COMPARED
+        }
+        worse = [metric for metric, delta in deltas.items() if delta > threshold]
+        if worse:
+            regressions.append(name)
+        print(f"{name:>13} {metrics['seconds']:>9.3f} {deltas['seconds']:>+9.1%} {deltas['peak_rss']:>+9.1%}"
+              + (" PIOROU" if worse else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="caso a executar (repetível; padrão: todos)")
+    parser.add_argument("--list", action="store_true", help="lista os casos e sai")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplica o tamanho dos dados sintéticos")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por caso (vale a melhor)")
+    parser.add_argument("--workdir", help="pasta dos dados sintéticos (mantida para as próximas execuções)")
+    parser.add_argument("--save", metavar="NOME", help="grava os resultados em benchmarks/results/NOME.json")
+    parser.add_argument("--compare", metavar="NOME", help="compara com uma baseline gravada")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora tolerada na comparação (0.2 = 20%%)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_in_process(args.run_case, args.workdir, args.scale, args.repeat)))
+        return
+    if args.list:
+        for case in CASES.values():
+            print(f"{case.name:>13}  {case.description}")
+        return
+
+    baseline = load_results(args.compare) if args.compare else None
+    if baseline is not None and baseline.get("scale") != args.scale:
+        print(f"Aviso: a baseline foi gravada com --scale {baseline.get('scale')}")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="coloeus-suite-")
+    os.makedirs(workdir, exist_ok=True)
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        print(f"{'caso':>13} {'tempo (s)':>10} {'itens':>9} {'itens/s':>11} {'pico RSS (MB)':>14}")
+        for name in args.case or list(CASES):
+            metrics = results[name] = run_case(name, workdir, args.scale, args.repeat)
+            print(f"{name:>13} {metrics['seconds']:>10.3f} {metrics['items']:>9} "
+                  f"{metrics['items_per_second']:>11.0f} {metrics['peak_rss'] / 1024**2:>14.1f}")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        save_results(args.save, results, args.scale)
+    if baseline is not None and compare(results, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
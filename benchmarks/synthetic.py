@@ -0,0 +1,152 @@
+import os
+import random
+import time
+from typing import Optional
+
+from registry import REG_DWORD, REG_EXPAND_SZ, REG_SZ, UNINSTALL_KEYS, FakeRegistryBackend
+
+
+def make_tree(root: str, files: int, files_per_dir: int = 50, fanout: int = 8,
+              max_file_size: int = 4096, seed: Optional[int] = 0) -> int:
+    """
+    Cria uma árvore sintética com `files` arquivos distribuídos em diretórios
+    com até `fanout` subdiretórios e `files_per_dir` arquivos cada.
+    Retorna o número de diretórios criados.
+    """
+    rng = random.Random(seed)
+    extensions = [".txt", ".log", ".dat", ".iso", ".mp4", ".tmp", ""]
+    pending = [root]
+    created = 0
+    dirs = 0
+    while created < files:
+        dirpath = pending.pop(0)
+        os.makedirs(dirpath, exist_ok=True)
+        dirs += 1
+        for i in range(min(files_per_dir, files - created)):
+            name = f"f{i}{rng.choice(extensions)}"
+            size = rng.randint(0, max_file_size)
+            with open(os.path.join(dirpath, name), "wb") as fh:
+                if size:
+                    fh.truncate(size)
+            created += 1
+        pending.extend(os.path.join(dirpath, f"d{i}") for i in range(fanout))
+    return dirs
+
+
+def make_deep_tree(root: str, files: int, depth: int = 40, files_per_dir: int = 10,
+                   max_file_size: int = 4096, seed: Optional[int] = 0) -> int:
+    """
+    Cria cadeias de `depth` pastas aninhadas (uma subpasta por nível) até
+    somar `files` arquivos. Retorna o número de diretórios criados.
+    """
+    rng = random.Random(seed)
+    created = 0
+    dirs = 0
+    chain = 0
+    while created < files:
+        dirpath = os.path.join(root, f"c{chain}")
+        for level in range(depth):
+            if created >= files:
+                break
+            dirpath = os.path.join(dirpath, f"n{level}")
+            os.makedirs(dirpath, exist_ok=True)
+            dirs += 1
+            for i in range(min(files_per_dir, files - created)):
+                with open(os.path.join(dirpath, f"f{i}.dat"), "wb") as fh:
+                    fh.truncate(rng.randint(0, max_file_size))
+                created += 1
+        chain += 1
+    return dirs
+
+
+def make_huge_files(root: str, count: int, size: int = 4 * 1024**3) -> int:
+    """
+    Cria `count` arquivos de `size` bytes (esparsos: o tamanho é definido
+    sem gravar os dados). Retorna o número de diretórios criados.
+    """
+    os.makedirs(root, exist_ok=True)
+    for i in range(count):
+        with open(os.path.join(root, f"imagem{i}.iso"), "wb") as fh:
+            fh.truncate(size)
+    return 1
+
+
+# Partes de um disco do Windows típico: (caminho, fração dos arquivos, arquivos por pasta, subpastas por pasta)
+WINDOWS_LAYOUT = [
+    ("Windows/WinSxS", 0.30, 2, 16),
+    ("Windows/System32", 0.08, 60, 6),
+    ("Windows/System32/DriverStore/FileRepository", 0.05, 6, 12),
+    ("$Recycle.Bin/S-1-5-21-1004", 0.03, 20, 4),
+    ("Users/usuario/AppData/Local/Temp", 0.06, 15, 6),
+    ("Users/usuario/AppData/Local/Google/Chrome/User Data/Default/Cache", 0.05, 40, 4),
+    ("Users/usuario/source/repos/app/node_modules", 0.18, 5, 10),
+    ("Users/usuario/source/repos/app/.git", 0.05, 8, 16),
+    ("Users/usuario/source/repos/app/src", 0.03, 20, 6),
+    ("Users/usuario/Documents", 0.07, 30, 6),
+    ("Program Files", 0.10, 25, 8),
+]
+
+
+def make_windows_tree(root: str, files: int, seed: Optional[int] = 0) -> int:
+    """
+    Cria uma árvore com a forma de um disco do Windows (WinSxS com muitas
+    pastas pequenas, lixeira, temporários, caches, node_modules e .git)
+    somando cerca de `files` arquivos. Retorna o número de diretórios criados.
+    """
+    dirs = 0
+    for index, (path, fraction, files_per_dir, fanout) in enumerate(WINDOWS_LAYOUT):
+        count = max(1, int(files * fraction))
+        dirs += make_tree(
+            os.path.join(root, *path.split("/")), count, files_per_dir, fanout,
+            seed=None if seed is None else seed + index
+        )
+    return dirs
+
+
+def synthetic_registry(entries: int, latency: float = 0.0, seed: int = 0) -> FakeRegistryBackend:
+    """Registro com entradas distribuídas entre as três chaves (parte sem DisplayName, como componentes)"""
+    rng = random.Random(seed)
+    backend = FakeRegistryBackend(latency=latency)
+    weights = [0.6, 0.3, 0.1]
+    for i in range(entries):
+        hive, path = rng.choices(UNINSTALL_KEYS, weights)[0]
+        values = {
+            "UninstallString": (f"MsiExec.exe /X{{{i:08X}-0000-0000-0000-000000000000}}", REG_EXPAND_SZ),
+            "InstallDate": ("20240101", REG_SZ),
+            "NoModify": (1, REG_DWORD),
+            "Language": (1046, REG_DWORD),
+            "VersionMajor": (rng.randint(1, 20), REG_DWORD),
+        }
+        if rng.random() < 0.8:
+            values.update({
+                "DisplayName": (f"Programa {i}", REG_SZ),
+                "DisplayVersion": (f"{rng.randint(1, 20)}.{rng.randint(0, 99)}", REG_SZ),
+                "Publisher": (f"Fornecedor {i % 150}", REG_SZ),
+                "EstimatedSize": (rng.randint(100, 4_000_000), REG_DWORD),
+                "URLInfoAbout": (f"https://example.com/{i}", REG_SZ),
+            })
+            if rng.random() < 0.5:
+                values["InstallLocation"] = (f"%ProgramFiles%\\Inexistente\\Programa {i}", REG_EXPAND_SZ)
+            if rng.random() < 0.5:
+                values["DisplayIcon"] = (f"C:\\Inexistente\\programa{i}.exe,0", REG_SZ)
+        backend.set_values(hive, f"{path}\\{{{i:08X}}}", values)
+    return backend
+
+
+def synthetic_batches(rows: int, files_per_dir: int = 40, seed: int = 0):
+    """Gera lotes (diretório, linhas) no formato do walker"""
+    rng = random.Random(seed)
+    extensions = [".txt", ".log", ".dat", ".iso", ".mp4", ".tmp", ".dll", ".exe", ""]
+    now = time.time()
+    produced = 0
+    dir_index = 0
+    while produced < rows:
+        dirpath = os.path.join("C:\\", "Users", "operador", "dados", f"projeto{dir_index // 100}", f"pasta{dir_index}")
+        batch = []
+        for i in range(min(files_per_dir, rows - produced)):
+            ext = rng.choice(extensions)
+            batch.append((f"arquivo_{i:05d}{ext}", rng.randint(0, 10**9), now - rng.random() * 1e7,
+                          now - rng.random() * 1e7, ext, False))
+        produced += len(batch)
+        dir_index += 1
+        yield dirpath, batch
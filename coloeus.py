@@ -0,0 +1,243 @@
+"""
+Interface de linha de comando do Coloeus, sem Qt: varredura de arquivos,
+programas instalados e uso de disco, com saída em NDJSON, CSV ou JSON.
+Os arquivos são escritos à medida que o walker os encontra (sem ordenação),
+exceto com --top, que precisa do resultado completo.
+
+    python -m coloeus scan C:\\Users --min-size 100M --format csv > grandes.csv
+    python -m coloeus scan C:\\Users --where 'ext in (.iso, .vhdx) and path !~ "node_modules"'
+    python -m coloeus scan C:\\ --exclude-preset system --exclude-preset dev --no-reparse
+    python -m coloeus scan C:\\ D:\\ E:\\ --processes 3
+    python -m coloeus programs --format json
+    python -m coloeus disk C:\\ D:\\
+"""
+import argparse
+import csv
+import json
+import logging
+import re
+import sys
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from exclusions import PRESETS as EXCLUSION_PRESETS
+
+# Sufixos aceitos em --min-size/--max-size
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024**2, "MB": 1024**2,
+              "G": 1024**3, "GB": 1024**3, "T": 1024**4, "TB": 1024**4}
+
+FILE_FIELDS = ["path", "size", "last_accessed", "last_modified", "extension", "is_directory"]
+PROGRAM_FIELDS = ["name", "version", "size", "publisher", "install_location", "uninstall_string"]
+DISK_FIELDS = ["path", "total", "used", "free", "percent_used"]
+
+
+def parse_size(text: str) -> int:
+    """Converte "1500", "64K", "1.5G" etc. em bytes"""
+    value = text.strip().upper()
+    number = value.rstrip("BKMGT")
+    unit = value[len(number):]
+    if unit not in SIZE_UNITS:
+        raise argparse.ArgumentTypeError(f"tamanho inválido: {text}")
+    try:
+        return int(float(number) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamanho inválido: {text}")
+
+
+def parse_query(text: str):
+    """Compila a expressão de --where (o erro aponta a posição inválida)"""
+    from filter_expr import FilterSyntaxError, compile_filter
+    try:
+        return compile_filter(text)
+    except FilterSyntaxError as e:
+        raise argparse.ArgumentTypeError(f"filtro inválido: {e}")
+
+
+def parse_regex(text: str):
+    try:
+        return re.compile(text, re.IGNORECASE)
+    except re.error as e:
+        raise argparse.ArgumentTypeError(f"regex inválida: {e}")
+
+
+class RecordWriter:
+    """Escreve registros (dicts) em NDJSON, CSV ou como um array JSON, um a um"""
+
+    def __init__(self, stream: TextIO, fmt: str, fields: List[str]):
+        self.stream = stream
+        self.format = fmt
+        self.count = 0
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fields, extrasaction="ignore", lineterminator="\n")
+            self._csv.writeheader()
+        elif fmt == "json":
+            stream.write("[")
+
+    def write(self, record: Dict):
+        if self.format == "csv":
+            self._csv.writerow(record)
+        elif self.format == "json":
+            self.stream.write((",\n " if self.count else "\n ") + json.dumps(record, ensure_ascii=False))
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def write_many(self, records: Iterable[Dict]):
+        for record in records:
+            self.write(record)
+        # Entrega cada lote a quem lê o pipe
+        self.stream.flush()
+
+    def close(self):
+        if self.format == "json":
+            self.stream.write("\n]\n" if self.count else "]\n")
+        self.stream.flush()
+
+
+def file_records(result) -> Iterable[Dict]:
+    """Registros das linhas de um ScanResult, na ordem atual"""
+    for row in result:
+        yield {
+            "path": row.path,
+            "size": row.size,
+            "last_accessed": row.last_accessed,
+            "last_modified": row.last_modified,
+            "extension": row.extension,
+            "is_directory": row.is_directory,
+        }
+
+
+def print_progress(progress):
+    """Linha de progresso em stderr (não mistura com os dados em stdout)"""
+    fraction = progress.fraction
+    done = f"{fraction:6.1%} " if fraction is not None else ""
+    sys.stderr.write(
+        f"\r{done}{progress.dirs_visited} pastas, {progress.files_matched} itens "
+        f"({progress.elapsed:.1f}s)" + ("\n" if progress.finished else "")
+    )
+    sys.stderr.flush()
+
+
+def cmd_scan(args, writer: RecordWriter) -> int:
+    from script import ExclusionRules, SystemScanner
+    from scanner_engine import CancellationToken, ScanStats
+
+    stats = ScanStats()
+    token = CancellationToken()
+    options = dict(
+        min_size=args.min_size,
+        max_size=args.max_size,
+        extensions=[ext if ext.startswith(".") else f".{ext}" for ext in args.ext] if args.ext else None,
+        include_directories=args.dirs,
+        query=args.where,
+        exclude=ExclusionRules(args.exclude or (), args.exclude_regex or (), args.exclude_preset or ()),
+        max_depth=args.max_depth,
+        same_filesystem=args.one_file_system,
+        skip_reparse_points=args.no_reparse,
+        workers=args.workers,
+        processes=args.processes,
+        stats=stats,
+        use_index=args.index,
+        cancel_token=token,
+        progress=print_progress if args.progress else None,
+    )
+    try:
+        if args.top:
+            writer.write_many(file_records(SystemScanner.scan_files(args.directories, top_n=args.top, **options)))
+        else:
+            for batch in SystemScanner.iter_scan_files(args.directories, **options):
+                writer.write_many(file_records(batch))
+    except KeyboardInterrupt:
+        token.cancel()
+        writer.close()
+        return 130
+    writer.close()
+    return 0
+
+
+def cmd_programs(args, writer: RecordWriter) -> int:
+    from script import SystemScanner
+    from registry import FakeRegistryBackend
+
+    backend = FakeRegistryBackend.from_json(args.registry_json) if args.registry_json else None
+    programs = SystemScanner.get_installed_programs(include_updates=args.include_updates, backend=backend)
+    writer.write_many({field: getattr(program, field) for field in PROGRAM_FIELDS} for program in programs)
+    writer.close()
+    return 0
+
+
+def cmd_disk(args, writer: RecordWriter) -> int:
+    from script import SystemScanner
+
+    paths = args.paths or SystemScanner.list_volumes()
+    writer.write_many(SystemScanner.get_disk_usage(path) for path in paths)
+    writer.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="coloeus", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--format", choices=["ndjson", "csv", "json"], default="ndjson", help="formato da saída")
+    parser.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="só registra erros em stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="lista arquivos por tamanho e extensão")
+    scan.add_argument("directories", nargs="+", help="diretórios a varrer")
+    scan.add_argument("--min-size", type=parse_size, default=0, help="tamanho mínimo (ex.: 100M)")
+    scan.add_argument("--max-size", type=parse_size, help="tamanho máximo (ex.: 2G)")
+    scan.add_argument("--ext", action="append", help="extensão a incluir (repetível)")
+    scan.add_argument("--dirs", action="store_true", help="inclui diretórios no resultado")
+    scan.add_argument(
+        "--where", type=parse_query,
+        help='expressão de filtro, ex.: \'size > 1G and mtime < 90d and path !~ "node_modules"\''
+    )
+    scan.add_argument("--exclude", action="append", help="glob de pasta a ignorar, ex.: node_modules, */AppData/Local/Temp (repetível)")
+    scan.add_argument("--exclude-regex", action="append", type=parse_regex, help="regex do caminho de pasta a ignorar (repetível)")
+    scan.add_argument(
+        "--exclude-preset", action="append", choices=sorted(EXCLUSION_PRESETS),
+        help="grupo de pastas conhecidas a ignorar (repetível)"
+    )
+    scan.add_argument("--max-depth", type=int, help="níveis de subpastas percorridos (0 = só os arquivos do diretório)")
+    scan.add_argument("--one-file-system", action="store_true", help="não desce em pastas de outros volumes")
+    scan.add_argument("--no-reparse", action="store_true", help="não segue junções nem outros pontos de nova análise")
+    scan.add_argument("--top", type=int, help="só os N maiores, ordenados (espera o fim da varredura)")
+    scan.add_argument("--workers", type=int, help="threads do walker")
+    scan.add_argument(
+        "--processes", type=int,
+        help="varre cada volume em um processo próprio, até N processos (padrão: um só processo)"
+    )
+    scan.add_argument("--index", action="store_true", help="reaproveita o índice persistente de varreduras")
+    scan.add_argument("--progress", action="store_true", help="mostra o progresso em stderr")
+    scan.set_defaults(handler=cmd_scan, fields=FILE_FIELDS)
+
+    programs = commands.add_parser("programs", help="lista os programas instalados")
+    programs.add_argument("--include-updates", action="store_true", help="inclui atualizações do Windows")
+    programs.add_argument("--registry-json", help="lê um registro salvo com FakeRegistryBackend.to_json")
+    programs.set_defaults(handler=cmd_programs, fields=PROGRAM_FIELDS)
+
+    disk = commands.add_parser("disk", help="uso de disco dos volumes")
+    disk.add_argument("paths", nargs="*", help="volumes ou pastas (padrão: todos os volumes montados)")
+    disk.set_defaults(handler=cmd_disk, fields=DISK_FIELDS)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.ERROR if args.quiet else logging.INFO, stream=sys.stderr)
+
+    stream = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        return args.handler(args, RecordWriter(stream, args.format, args.fields))
+    except BrokenPipeError:
+        # Leitor fechou o pipe (ex.: | head): encerra sem rastro
+        sys.stderr.close()
+        return 0
+    finally:
+        if args.output:
+            stream.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
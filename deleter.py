@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional, Tuple
+
+from scanner_engine import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+# Remoções simultâneas (a maior parte do tempo é espera pelo sistema de arquivos)
+DEFAULT_WORKERS = 8
+# Erro dos caminhos não processados por cancelamento
+CANCELLED = "cancelado"
+NO_RESPONSE = "sem resposta do processo elevado"
+BATCH_REJECTED = "lista de remoção alterada antes da confirmação; nada foi removido"
+
+
+@dataclass
+class DeleteResult:
+    """Resultado da remoção de um caminho"""
+    path: str
+    deleted: bool
+    error: Optional[str] = None
+    # Removido pelo processo auxiliar elevado
+    elevated: bool = False
+
+
+@dataclass
+class DeleteProgress:
+    """Andamento de uma remoção em lote"""
+    done: int = 0
+    total: int = 0
+    deleted: int = 0
+    failed: int = 0
+    # Caminhos aguardando o processo elevado
+    pending_elevation: int = 0
+    current: str = ""
+    finished: bool = False
+
+
+# Recebe os caminhos que exigem elevação e retorna um DeleteResult para cada um
+Elevator = Callable[[List[str]], List[DeleteResult]]
+
+
+def delete_path(path: str):
+    """Remove um arquivo ou diretório (recursivamente); erros saem como OSError"""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=False)
+    else:
+        os.remove(path)
+
+
+def delete_paths(
+    paths: List[str],
+    workers: int = DEFAULT_WORKERS,
+    progress: Optional[Callable[[DeleteProgress], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    elevate: Optional[Elevator] = None,
+    progress_interval: float = 0.1
+) -> List[DeleteResult]:
+    """
+    Remove os caminhos em um pool de threads e retorna um DeleteResult por
+    caminho, na ordem recebida. Os que falham por falta de permissão são
+    entregues juntos, em um único lote, a elevate (quando informado).
+    progress é chamado na thread que chamou, no máximo a cada
+    progress_interval segundos e ao final.
+    """
+    results: List[Optional[DeleteResult]] = [None] * len(paths)
+    state = DeleteProgress(total=len(paths))
+    last_report = 0.0
+
+    def report(force: bool = False):
+        nonlocal last_report
+        if progress is not None and (force or time.monotonic() - last_report >= progress_interval):
+            last_report = time.monotonic()
+            progress(DeleteProgress(**asdict(state)))
+
+    def cancelled() -> bool:
+        if cancel_token is None:
+            return False
+        # Pausado, espera; cancelar também libera a espera
+        cancel_token.wait_resumed()
+        return cancel_token.cancelled
+
+    def run(index: int) -> Tuple[DeleteResult, bool]:
+        """(resultado, precisa de elevação)"""
+        path = paths[index]
+        if cancelled():
+            return DeleteResult(path, False, CANCELLED), False
+        try:
+            delete_path(path)
+            return DeleteResult(path, True), False
+        except FileNotFoundError:
+            # Já não existe: o objetivo foi atingido
+            return DeleteResult(path, True), False
+        except PermissionError as e:
+            return DeleteResult(path, False, str(e)), elevate is not None
+        except OSError as e:
+            logger.error(f"Failed to delete {path}: {e}")
+            return DeleteResult(path, False, str(e)), False
+
+    def record(index: int, result: DeleteResult):
+        results[index] = result
+        state.done += 1
+        state.current = result.path
+        if result.deleted:
+            state.deleted += 1
+        else:
+            state.failed += 1
+
+    denied: List[int] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run, i): i for i in range(len(paths))}
+        for future in as_completed(futures):
+            index = futures[future]
+            result, needs_elevation = future.result()
+            if needs_elevation:
+                denied.append(index)
+                state.pending_elevation += 1
+            else:
+                record(index, result)
+            report()
+
+    if denied:
+        denied.sort()
+        if cancelled():
+            elevated = [DeleteResult(paths[i], False, CANCELLED) for i in denied]
+        else:
+            logger.info(f"Deleting {len(denied)} paths that need elevation in one batch")
+            report(force=True)
+            elevated = elevate([paths[i] for i in denied])
+        state.pending_elevation = 0
+        for index, result in zip(denied, elevated):
+            record(index, result)
+
+    state.finished = True
+    report(force=True)
+    return results
+
+
+def write_batch_file(paths: List[str]) -> Tuple[str, str]:
+    """
+    Grava os caminhos (um por linha, UTF-8) em um arquivo temporário para o
+    processo elevado. Retorna o arquivo e o SHA-256 do conteúdo, que vai na
+    linha de comando elevada: o arquivo fica na pasta temporária do usuário,
+    onde qualquer processo dele poderia trocá-lo depois da confirmação do UAC.
+    """
+    import tempfile
+    data = "\n".join(paths).encode("utf-8")
+    fd, batch_path = tempfile.mkstemp(prefix="coloeus-delete-", suffix=".txt")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    return batch_path, hashlib.sha256(data).hexdigest()
+
+
+def read_batch_file(batch_path: str, digest: str) -> List[str]:
+    """
+    Lê a lista uma única vez e confere o SHA-256 informado pelo processo que
+    a gravou (ValueError se não confere); os caminhos vêm desse mesmo conteúdo
+    """
+    with open(batch_path, "rb") as fh:
+        data = fh.read()
+    if hashlib.sha256(data).hexdigest() != digest.lower():
+        raise ValueError("batch file does not match its SHA-256")
+    return [line for line in data.decode("utf-8").split("\n") if line]
+
+
+def write_results(results_path: str, results: List[DeleteResult]):
+    """Grava os resultados em JSON de forma atômica (quem espera só vê o arquivo completo)"""
+    partial_path = results_path + ".partial"
+    # "x" não segue um arquivo ou link deixado no lugar por outro processo
+    with open(partial_path, "x", encoding="utf-8") as fh:
+        json.dump([asdict(result) for result in results], fh)
+    os.replace(partial_path, results_path)
+
+
+def remove_batch_files(batch_path: str, results_path: str):
+    """Apaga a lista e os resultados (inclusive parciais) de uma remoção elevada"""
+    for path in (batch_path, results_path, results_path + ".partial"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def read_results(results_path: str) -> List[DeleteResult]:
+    with open(results_path, "r", encoding="utf-8") as fh:
+        return [DeleteResult(**item) for item in json.load(fh)]
+
+
+def wait_for_results(
+    batch_path: str,
+    results_path: str,
+    paths: List[str],
+    timeout: float = 600.0,
+    cancel_token: Optional[CancellationToken] = None,
+    poll: float = 0.1
+) -> List[DeleteResult]:
+    """
+    Espera o processo elevado gravar os resultados. Se ele não responder a
+    tempo (ex.: o UAC foi recusado), os caminhos são dados como não removidos.
+    Em todos os casos a lista e os resultados são apagados no fim; sem a
+    lista, um processo elevado que ainda não a leu não remove nada, e um que
+    termine depois apaga os próprios resultados.
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        while time.monotonic() < deadline:
+            if cancel_token is not None and cancel_token.cancelled:
+                break
+            if os.path.exists(results_path):
+                try:
+                    results = {result.path: result for result in read_results(results_path)}
+                except (OSError, ValueError, TypeError) as e:
+                    logger.error(f"Invalid delete results {results_path}: {e}")
+                    break
+                # Lista vazia: o processo elevado recusou uma lista alterada
+                missing = NO_RESPONSE if results or not paths else BATCH_REJECTED
+                return [results.get(path) or DeleteResult(path, False, missing) for path in paths]
+            time.sleep(poll)
+        return [DeleteResult(path, False, NO_RESPONSE) for path in paths]
+    finally:
+        # A lista sai primeiro: é o sinal de abandono verificado pelo processo elevado
+        remove_batch_files(batch_path, results_path)
+
+
+def run_delete_helper(args: List[str]) -> int:
+    """
+    Ponto de entrada do processo elevado:
+        --delete-batch <lista> <sha256> <resultados>   remove todos os caminhos da lista
+        --delete <caminho>                             remove um único caminho (formato antigo)
+
+    A lista só é usada se o SHA-256 (que vem na linha de comando aprovada
+    no UAC) confere com o conteúdo lido; caso contrário nada é removido e
+    os resultados ficam vazios. A lista pertence a quem a gravou: se ela
+    sumir antes do fim, quem esperava desistiu e os resultados são apagados.
+    """
+    if len(args) >= 4 and args[0] == "--delete-batch":
+        batch_path, digest, results_path = args[1], args[2], args[3]
+        try:
+            paths = read_batch_file(batch_path, digest)
+        except OSError as e:
+            logger.error(f"Failed to read delete batch {batch_path}: {e}")
+            return 1
+        except (ValueError, UnicodeDecodeError) as e:
+            logger.error(f"Rejected delete batch {batch_path}: {e}")
+            write_results(results_path, [])
+            return 2
+        results = [
+            DeleteResult(r.path, r.deleted, r.error, elevated=True) for r in delete_paths(paths)
+        ]
+        write_results(results_path, results)
+        if not os.path.exists(batch_path):
+            # Quem esperava já desistiu (tempo esgotado ou cancelamento)
+            remove_batch_files(batch_path, results_path)
+        return 0 if all(result.deleted for result in results) else 1
+    if len(args) >= 2 and args[0] == "--delete":
+        result = delete_paths([args[1]], workers=1)[0]
+        return 0 if result.deleted else 1
+    logger.error(f"Invalid delete helper arguments: {args}")
+    return 2
@@ -0,0 +1,127 @@
+import os
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class DirNode:
+    """Pasta da árvore agregada, com totais recursivos"""
+    __slots__ = (
+        "path", "parent", "children", "own_size", "own_files", "largest_file",
+        "total_size", "total_files", "total_dirs", "row", "_sorted"
+    )
+
+    def __init__(self, path: str, own_size: int, own_files: int, largest_file: Tuple[str, int]):
+        self.path = path
+        self.parent: Optional["DirNode"] = None
+        self.children: List["DirNode"] = []
+        self.own_size = own_size
+        self.own_files = own_files
+        # Maior arquivo diretamente nesta pasta: (nome, tamanho)
+        self.largest_file = largest_file
+        self.total_size = own_size
+        self.total_files = own_files
+        self.total_dirs = 0
+        # Posição entre os irmãos ordenados por tamanho (usada pela view)
+        self.row = 0
+        self._sorted = False
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path) or self.path
+
+    def sorted_children(self) -> List["DirNode"]:
+        """Subpastas por tamanho total decrescente (ordenadas uma única vez)"""
+        if not self._sorted:
+            self.children.sort(key=lambda node: node.total_size, reverse=True)
+            for row, child in enumerate(self.children):
+                child.row = row
+            self._sorted = True
+        return self.children
+
+    @property
+    def largest_child(self) -> Tuple[str, int]:
+        """Maior item imediato (arquivo ou subpasta): (nome, tamanho)"""
+        largest = self.largest_file
+        children = self.sorted_children()
+        if children and children[0].total_size > largest[1]:
+            return children[0].name, children[0].total_size
+        return largest
+
+    def __repr__(self):
+        return f"DirNode({self.path!r}, total_size={self.total_size}, total_files={self.total_files})"
+
+
+class DirTree:
+    """
+    Árvore de uso de disco por pasta (estilo du), montada durante o próprio
+    walk: cada thread registra os totais diretos de cada pasta que lê e
+    finalize() soma os totais recursivos de baixo para cima, sem percorrer
+    o disco novamente.
+    """
+
+    def __init__(self):
+        self._records: List[Tuple[str, int, int, Tuple[str, int]]] = []
+        self.nodes: Dict[str, DirNode] = {}
+        self.roots: List[DirNode] = []
+
+    def add_dir(self, path: str, own_size: int, own_files: int, largest_file: Tuple[str, int]):
+        """Registra os totais diretos de uma pasta (chamado pelas threads do walker)"""
+        # list.append é atômico, dispensando lock entre as threads
+        self._records.append((path, own_size, own_files, largest_file))
+
+    def finalize(self):
+        """Liga as pastas às suas pais e calcula os totais recursivos"""
+        records, self._records = self._records, []
+        nodes = self.nodes
+        for path, own_size, own_files, largest_file in records:
+            nodes[path] = DirNode(path, own_size, own_files, largest_file)
+
+        self.roots = []
+        for node in nodes.values():
+            parent = nodes.get(os.path.dirname(node.path))
+            if parent is not None and parent is not node:
+                node.parent = parent
+                parent.children.append(node)
+            else:
+                self.roots.append(node)
+
+        # Pastas mais profundas primeiro: cada uma soma seus totais à pai
+        for node in sorted(nodes.values(), key=lambda n: n.path.count(os.sep), reverse=True):
+            parent = node.parent
+            if parent is not None:
+                parent.total_size += node.total_size
+                parent.total_files += node.total_files
+                parent.total_dirs += node.total_dirs + 1
+        self.roots.sort(key=lambda node: node.total_size, reverse=True)
+        for row, root in enumerate(self.roots):
+            root.row = row
+
+    def get(self, path: str) -> Optional[DirNode]:
+        return self.nodes.get(os.path.normpath(path))
+
+    def total_size(self, path: str) -> int:
+        node = self.get(path)
+        return node.total_size if node else 0
+
+    def walk(self, node: DirNode) -> Iterator[DirNode]:
+        """Percorre a subárvore de node (sem incluí-lo)"""
+        stack = list(node.children)
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(current.children)
+
+    def top_folders(self, path: str, n: int = 10, recursive: bool = False) -> List[DirNode]:
+        """
+        As n maiores pastas sob path: só as filhas diretas, ou todas as
+        descendentes com recursive=True
+        """
+        node = self.get(path)
+        if node is None:
+            return []
+        if not recursive:
+            return node.sorted_children()[:n]
+        return heapq.nlargest(n, self.walk(node), key=lambda child: child.total_size)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
@@ -0,0 +1,293 @@
+import os
+import mmap
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from scanner_engine import CancellationToken, default_workers
+from scan_index import default_index_path
+from scan_result import ScanResult
+
+logger = logging.getLogger(__name__)
+
+# Bytes lidos do início e do fim de cada arquivo na etapa de hash parcial
+PARTIAL_BLOCK = 4096
+# Buffer das leituras do hash completo
+READ_CHUNK = 1024 * 1024
+# A partir deste tamanho o hash completo lê o arquivo via mmap
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Arquivo candidato: (caminho, tamanho, última modificação)
+Candidate = Tuple[str, int, float]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    partial BLOB,
+    full BLOB
+);
+"""
+
+
+def default_hash_cache_path() -> str:
+    """Cache de hashes ao lado do índice de varreduras"""
+    return os.path.join(os.path.dirname(default_index_path()), "hash_cache.db")
+
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=20)
+
+
+def partial_hash(path: str, size: int, block: int = PARTIAL_BLOCK) -> Tuple[bytes, int]:
+    """
+    Hash do primeiro e do último bloco do arquivo. Arquivos de até dois
+    blocos são lidos inteiros, então o hash parcial deles já é o completo.
+    Retorna (hash, bytes lidos).
+    """
+    digest = _new_hash()
+    with open(path, "rb", buffering=0) as fh:
+        if size <= 2 * block:
+            data = fh.read()
+            digest.update(data)
+            return digest.digest(), len(data)
+        head = fh.read(block)
+        fh.seek(-block, os.SEEK_END)
+        tail = fh.read(block)
+    digest.update(head)
+    digest.update(tail)
+    return digest.digest(), len(head) + len(tail)
+
+
+def full_hash(path: str, size: int, chunk: int = READ_CHUNK) -> Tuple[bytes, int]:
+    """Hash do conteúdo inteiro (mmap para arquivos grandes, senão leituras de chunk bytes)"""
+    digest = _new_hash()
+    with open(path, "rb", buffering=0) as fh:
+        if size >= MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+                    return digest.digest(), len(mapped)
+            except (OSError, ValueError) as e:
+                logger.debug(f"mmap failed for {path}, falling back to reads: {e}")
+        buffer = bytearray(chunk)
+        view = memoryview(buffer)
+        read = 0
+        while True:
+            n = fh.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+            read += n
+    return digest.digest(), read
+
+
+@dataclass
+class DuplicateGroup:
+    """Arquivos com o mesmo tamanho e o mesmo conteúdo"""
+    size: int
+    digest: str
+    paths: List[str] = field(default_factory=list)
+
+    @property
+    def wasted(self) -> int:
+        """Espaço liberado mantendo só uma cópia"""
+        return self.size * (len(self.paths) - 1)
+
+
+@dataclass
+class DuplicateStats:
+    """Estatísticas de uma busca de duplicatas"""
+    files_considered: int = 0
+    size_candidates: int = 0
+    partial_hashed: int = 0
+    full_hashed: int = 0
+    cache_hits: int = 0
+    bytes_read: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    cancelled: bool = False
+
+
+class HashCache:
+    """
+    Cache persistente (SQLite) de hashes parciais e completos. Uma entrada só
+    vale enquanto o arquivo mantiver o mesmo tamanho e a mesma data de modificação.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_hash_cache_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get_many(self, files: List[Candidate]) -> Dict[Candidate, Tuple[Optional[bytes], Optional[bytes]]]:
+        """Retorna (parcial, completo) dos arquivos cujo tamanho e mtime não mudaram"""
+        wanted = {path: (path, size, mtime) for path, size, mtime in files}
+        found = {}
+        paths = list(wanted)
+        with self._lock:
+            # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT path, size, mtime, partial, full FROM hashes WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for path, size, mtime, partial, full in rows:
+                    key = wanted[path]
+                    if key[1] == size and key[2] == mtime:
+                        found[key] = (partial, full)
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, int, float, Optional[bytes], Optional[bytes]]]):
+        """Grava (caminho, tamanho, mtime, parcial, completo) em uma única transação"""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO hashes (path, size, mtime, partial, full) VALUES (?, ?, ?, ?, ?)",
+                        entries
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Error writing hash cache {self.path}: {e}")
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM hashes")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _hash_files(
+    hasher: Callable[[str, int], Tuple[bytes, int]],
+    files: List[Candidate],
+    workers: int,
+    stats: DuplicateStats,
+    cancel_token: Optional[CancellationToken] = None
+) -> Dict[Candidate, bytes]:
+    """Calcula hashes em paralelo (hashlib libera o GIL), descartando arquivos ilegíveis"""
+    def run(candidate: Candidate):
+        if cancel_token is not None:
+            cancel_token.wait_resumed()
+            if cancel_token.cancelled:
+                return candidate, None
+        try:
+            return candidate, hasher(candidate[0], candidate[1])
+        except OSError as e:
+            logger.debug(f"Error reading file {candidate[0]}: {e}")
+            return candidate, None
+
+    digests = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for candidate, hashed in pool.map(run, files):
+            if hashed is None:
+                if cancel_token is None or not cancel_token.cancelled:
+                    stats.errors += 1
+                continue
+            digests[candidate] = hashed[0]
+            stats.bytes_read += hashed[1]
+    return digests
+
+
+def _collisions(digests: Dict[Candidate, bytes]) -> List[List[Candidate]]:
+    """Agrupa por (tamanho, hash) e devolve só os grupos com mais de um arquivo"""
+    groups = defaultdict(list)
+    for candidate, digest in digests.items():
+        groups[(candidate[1], digest)].append(candidate)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def find_duplicates(
+    files: ScanResult,
+    min_size: int = 1,
+    workers: Optional[int] = None,
+    cache: Optional[HashCache] = None,
+    stats: Optional[DuplicateStats] = None,
+    cancel_token: Optional[CancellationToken] = None
+) -> List[DuplicateGroup]:
+    """
+    Encontra arquivos duplicados em um resultado de scan_files, em etapas:
+    tamanho, hash do primeiro/último bloco e, só para quem ainda colide,
+    hash do conteúdo inteiro. Retorna os grupos por espaço desperdiçado.
+
+    Args:
+        files: Resultado de SystemScanner.scan_files
+        min_size: Ignora arquivos menores que isso (arquivos vazios são todos iguais)
+        workers: Threads de leitura (None para o padrão)
+        cache: HashCache opcional; arquivos sem mudança não são relidos
+        stats: DuplicateStats opcional preenchido com os bytes lidos por etapa
+        cancel_token: CancellationToken opcional; cancelada, a busca não retorna grupos
+            (os hashes já calculados ainda vão para o cache)
+    """
+    stats = stats if stats is not None else DuplicateStats()
+    start = time.perf_counter()
+    workers = max(1, workers or default_workers())
+
+    # Etapa 1: só tamanhos repetidos podem ter conteúdo igual
+    by_size = defaultdict(list)
+    sizes = files.sizes
+    for i in files.storage_indices():
+        if files.is_dirs[i] or sizes[i] < min_size:
+            continue
+        by_size[sizes[i]].append(i)
+        stats.files_considered += 1
+    candidates = [
+        (files.path_at(i), size, files.mtimes[i])
+        for size, indices in by_size.items() if len(indices) > 1 for i in indices
+    ]
+    stats.size_candidates = len(candidates)
+
+    cached = cache.get_many(candidates) if cache is not None else {}
+    partials = {c: cached[c][0] for c in candidates if c in cached and cached[c][0] is not None}
+    fulls = {c: cached[c][1] for c in candidates if c in cached and cached[c][1] is not None}
+    stats.cache_hits = len(partials)
+
+    # Etapa 2: hash parcial dos candidatos que não estavam no cache
+    missing = [c for c in candidates if c not in partials]
+    partials.update(_hash_files(partial_hash, missing, workers, stats, cancel_token))
+    stats.partial_hashed = len(missing)
+
+    # Etapa 3: hash completo só do que ainda colide (arquivos pequenos já foram lidos inteiros)
+    colliding = [c for members in _collisions(partials) for c in members]
+    for candidate in colliding:
+        if candidate[1] <= 2 * PARTIAL_BLOCK:
+            fulls[candidate] = partials[candidate]
+    missing = [c for c in colliding if c not in fulls]
+    fulls.update(_hash_files(full_hash, missing, workers, stats, cancel_token))
+    stats.full_hashed = len(missing)
+
+    groups = [
+        DuplicateGroup(members[0][1], fulls[members[0]].hex(), sorted(c[0] for c in members))
+        for members in _collisions({c: fulls[c] for c in colliding if c in fulls})
+    ]
+    groups.sort(key=lambda group: (-group.wasted, group.paths[0].lower()))
+    if cancel_token is not None and cancel_token.cancelled:
+        # Com etapas incompletas os grupos não são confiáveis
+        stats.cancelled = True
+        groups = []
+
+    if cache is not None:
+        # Regrava só as entradas novas ou que ganharam o hash completo
+        cache.put_many(
+            (c[0], c[1], c[2], partials[c], fulls.get(c))
+            for c in candidates if c in partials and cached.get(c) != (partials[c], fulls.get(c))
+        )
+
+    stats.elapsed = time.perf_counter() - start
+    logger.info(
+        f"Found {len(groups)} duplicate groups among {stats.size_candidates} candidates in "
+        f"{stats.elapsed:.2f}s ({stats.bytes_read} bytes read, {stats.cache_hits} cached)"
+    )
+    return groups
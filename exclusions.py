@@ -0,0 +1,95 @@
+import re
+import fnmatch
+from typing import Dict, Iterable, List, Pattern, Union
+
+# Pastas conhecidas que raramente interessam numa busca e podem ser enormes
+PRESETS: Dict[str, List[str]] = {
+    # Lixeira, pontos de restauração, componentes do Windows e sistemas de arquivos virtuais do Linux
+    "system": [
+        "$Recycle.Bin", "System Volume Information", "$WINDOWS.~BT", "$Windows.~WS", "$WinREAgent",
+        "$SysReset", "Config.Msi", "Windows/WinSxS", "Windows/servicing", "Windows/System32/DriverStore",
+        "/proc", "/sys", "/dev", "/run",
+    ],
+    # Controle de versão, dependências e caches de ferramentas de desenvolvimento
+    "dev": [
+        ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", ".tox", ".mypy_cache",
+        ".pytest_cache", ".gradle",
+    ],
+    # Caches de navegadores e temporários (grandes, mas recriados pelos programas)
+    "caches": [
+        "AppData/Local/Temp", "AppData/Local/Microsoft/Windows/INetCache", "AppData/Local/*/Cache",
+        "AppData/Local/*/User Data/*/Cache", "AppData/Local/*/User Data/*/Code Cache", ".cache",
+    ],
+}
+
+_DRIVE = re.compile(r"[A-Za-z]:/")
+
+
+class ExclusionRules:
+    """
+    Pastas que o walker não percorre, verificadas antes de descer em cada
+    subpasta (a subárvore inteira fica de fora, sem nenhum scandir).
+
+    Globs sem barra comparam só o nome da pasta ("node_modules", "*.tmp");
+    com barra, o caminho: relativos casam com o fim do caminho
+    ("AppData/Local/Temp"), absolutos com ele inteiro ("C:/Windows/WinSxS",
+    "/proc"). Regex (texto ou já compiladas) são procuradas em qualquer ponto
+    do caminho. Nos dois casos o caminho usa "/" como separador, e globs e
+    regex em texto não diferenciam maiúsculas de minúsculas.
+
+    Nomes literais viram um conjunto e os demais globs uma única regex, para
+    que cada pasta custe uma consulta ao conjunto e no máximo duas buscas.
+    """
+
+    def __init__(
+        self,
+        globs: Iterable[str] = (),
+        regexes: Iterable[Union[str, Pattern]] = (),
+        presets: Iterable[str] = ()
+    ):
+        self.globs: List[str] = []
+        for preset in presets:
+            if preset not in PRESETS:
+                raise ValueError(f"Unknown exclusion preset: {preset}")
+            self.globs.extend(PRESETS[preset])
+        self.globs.extend(glob.strip() for glob in globs if glob.strip())
+        self.regexes: List[Pattern] = [
+            re.compile(regex, re.IGNORECASE) if isinstance(regex, str) else regex for regex in regexes
+        ]
+
+        names = set()
+        name_patterns = []
+        path_patterns = []
+        for glob in self.globs:
+            glob = glob.replace("\\", "/").rstrip("/") or "/"
+            if "/" not in glob:
+                if any(c in glob for c in "*?["):
+                    name_patterns.append(fnmatch.translate(glob))
+                else:
+                    names.add(glob.lower())
+                continue
+            if not glob.startswith(("/", "*")) and not _DRIVE.match(glob):
+                glob = "*/" + glob
+            path_patterns.append(fnmatch.translate(glob))
+        self._names = frozenset(names)
+        self._name_regex = re.compile("|".join(name_patterns), re.IGNORECASE) if name_patterns else None
+        self._path_regex = re.compile("|".join(path_patterns), re.IGNORECASE) if path_patterns else None
+
+    def __bool__(self) -> bool:
+        return bool(self.globs or self.regexes)
+
+    def __repr__(self) -> str:
+        return f"ExclusionRules(globs={self.globs!r}, regexes={[r.pattern for r in self.regexes]!r})"
+
+    def matches(self, path: str, name: str) -> bool:
+        """Se a pasta path (cujo nome é name) deve ficar fora da varredura"""
+        if name.lower() in self._names:
+            return True
+        if self._name_regex is not None and self._name_regex.match(name):
+            return True
+        if self._path_regex is None and not self.regexes:
+            return False
+        path = path.replace("\\", "/")
+        if self._path_regex is not None and self._path_regex.match(path):
+            return True
+        return any(regex.search(path) for regex in self.regexes)
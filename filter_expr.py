@@ -0,0 +1,291 @@
+"""
+Linguagem de filtros da busca de arquivos, compilada uma vez em um
+predicado avaliado pelas threads do walker:
+
+    size > 1GB and ext in (.iso, .vhdx) and mtime < 90d and path ~ "node_modules"
+
+Campos: size (tamanho), name, ext, path (caminho completo), mtime e atime
+(modificação e último acesso). Operadores: > >= < <= == != para números e
+texto, ~ e !~ (expressão regular, em qualquer ponto do texto), in e
+not in (listas entre parênteses), combinados com and, or, not e
+parênteses. Texto e regex não diferenciam maiúsculas de minúsculas; valores
+com espaços ou símbolos vão entre aspas (sem escapes: "C:\\Temp" é C:\\Temp).
+
+Tamanhos aceitam B, KB, MB, GB e TB (base 1024). Datas são um instante:
+AAAA-MM-DD ou uma idade (30s, 15m, 12h, 90d, 2w, 1y) contada a partir da
+compilação, de modo que "mtime < 90d" seleciona o que foi modificado antes
+de 90 dias atrás.
+
+Condições "path !~ R" (ou "not path ~ R") no nível de cima da expressão
+também viram uma regra de poda: pastas cujo caminho já casa com R não são
+percorridas, pois nada dentro delas passaria no filtro.
+"""
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024**2, "MB": 1024**2,
+              "G": 1024**3, "GB": 1024**3, "T": 1024**4, "TB": 1024**4}
+AGE_UNITS = {"s": 1, "m": 60, "min": 60, "h": 3600, "d": 86400, "w": 7 * 86400, "y": 365 * 86400}
+
+NUMBER_FIELDS = {"size", "mtime", "atime"}
+TEXT_FIELDS = {"name", "ext", "path"}
+FIELDS = NUMBER_FIELDS | TEXT_FIELDS
+
+# Argumentos do predicado compilado (mesma ordem usada pelo walker)
+PREDICATE_ARGS = "dirpath, name, ext, size, atime, mtime"
+
+_TOKEN = re.compile(r"""
+      (?P<string>"[^"]*"|'[^']*')
+    | (?P<op>>=|<=|!=|==|!~|[<>=~(),])
+    | (?P<word>[^\s()<>=!~,"']+)
+    """, re.VERBOSE)
+_NUMBER = re.compile(r"(\d+(?:\.\d+)?|\.\d+)\s*([a-z]*)", re.IGNORECASE)
+_COMPARISONS = {">", ">=", "<", "<=", "==", "!=", "="}
+# Construções de regex que podem casar com a pasta e não com o que há dentro dela
+_PREFIX_UNSAFE = re.compile(r"\$|\\Z|\\B|\(\?[=!]")
+
+
+class FilterSyntaxError(ValueError):
+    """Expressão de filtro inválida; position é o índice do erro no texto"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} (posição {position + 1})")
+        self.position = position
+
+
+@dataclass(frozen=True)
+class FilterExpression:
+    """
+    Filtro compilado. match(dirpath, name, ext, size, atime, mtime) decide
+    se um arquivo entra no resultado (ext em minúsculas, como no walker);
+    prune(dirpath), quando existe, diz se a subárvore pode ser ignorada.
+    """
+    text: str
+    match: Callable[..., bool] = field(compare=False, repr=False)
+    prune: Optional[Callable[[str], bool]] = field(compare=False, repr=False)
+    fields: FrozenSet[str]
+    # Instante de referência das idades (recompilar com ele dá o mesmo filtro)
+    now: float
+
+    def __reduce__(self):
+        # O predicado gerado não é serializável: outro processo recompila o texto
+        return compile_filter, (self.text, self.now)
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+    tokens = []
+    pos = 0
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if pos == len(text):
+            break
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise FilterSyntaxError(f"símbolo inesperado {text[pos]!r}", pos)
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "string":
+            tokens.append(("string", value[1:-1], pos))
+        elif kind == "word" and value.lower() in ("and", "or", "not", "in"):
+            tokens.append(("keyword", value.lower(), pos))
+        else:
+            tokens.append((kind, value, pos))
+        pos = m.end()
+    tokens.append(("end", "", len(text)))
+    return tokens
+
+
+class _Parser:
+    """
+    Descida recursiva que produz uma árvore de tuplas:
+    ("or", [nós]), ("and", [nós]), ("not", nó), ("cmp", campo, operador, valor)
+    e ("in", campo, frozenset), com os valores já convertidos
+    """
+
+    def __init__(self, text: str, now: float):
+        self.now = now
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.fields = set()
+
+    def peek(self) -> Tuple[str, str, int]:
+        return self.tokens[self.pos]
+
+    def accept(self, kind: str, value: str) -> bool:
+        if self.peek()[:2] == (kind, value):
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: str):
+        if not self.accept(kind, value):
+            self.error(f"esperado {value!r}")
+
+    def error(self, message: str, token: Optional[Tuple[str, str, int]] = None):
+        kind, value, position = token or self.peek()
+        found = "fim da expressão" if kind == "end" else repr(value)
+        raise FilterSyntaxError(f"{message}, encontrado {found}", position)
+
+    def parse(self) -> tuple:
+        if self.peek()[0] == "end":
+            raise FilterSyntaxError("expressão vazia", 0)
+        node = self.parse_or()
+        if self.peek()[0] != "end":
+            self.error("esperado and/or")
+        return node
+
+    def parse_or(self) -> tuple:
+        nodes = [self.parse_and()]
+        while self.accept("keyword", "or"):
+            nodes.append(self.parse_and())
+        return ("or", nodes) if len(nodes) > 1 else nodes[0]
+
+    def parse_and(self) -> tuple:
+        nodes = [self.parse_not()]
+        while self.accept("keyword", "and"):
+            nodes.append(self.parse_not())
+        return ("and", nodes) if len(nodes) > 1 else nodes[0]
+
+    def parse_not(self) -> tuple:
+        if self.accept("keyword", "not"):
+            return ("not", self.parse_not())
+        if self.accept("op", "("):
+            node = self.parse_or()
+            self.expect("op", ")")
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> tuple:
+        token = self.peek()
+        field_name = token[1].lower()
+        if token[0] != "word" or field_name not in FIELDS:
+            self.error(f"esperado um campo ({', '.join(sorted(FIELDS))})")
+        self.pos += 1
+        self.fields.add(field_name)
+
+        negated = self.accept("keyword", "not")
+        if negated or self.accept("keyword", "in"):
+            if negated:
+                self.expect("keyword", "in")
+            if field_name not in TEXT_FIELDS:
+                self.error(f"{field_name} não aceita in (só name, ext e path)", token)
+            self.expect("op", "(")
+            values = [self.convert(field_name, self.parse_value())]
+            while self.accept("op", ","):
+                values.append(self.convert(field_name, self.parse_value()))
+            self.expect("op", ")")
+            node = ("in", field_name, frozenset(values))
+            return ("not", node) if negated else node
+
+        op_token = self.peek()
+        op = op_token[1]
+        if op_token[0] != "op" or op not in _COMPARISONS | {"~", "!~"}:
+            self.error("esperado um operador")
+        self.pos += 1
+        value = self.parse_value()
+        if op in ("~", "!~"):
+            if field_name not in TEXT_FIELDS:
+                self.error(f"{field_name} não aceita {op} (só name, ext e path)", op_token)
+            try:
+                regex = re.compile(value[1], re.IGNORECASE)
+            except re.error as e:
+                raise FilterSyntaxError(f"regex inválida {value[1]!r}: {e}", value[2])
+            node = ("cmp", field_name, "~", regex)
+            return ("not", node) if op == "!~" else node
+        return ("cmp", field_name, "==" if op == "=" else op, self.convert(field_name, value))
+
+    def parse_value(self) -> Tuple[str, str, int]:
+        token = self.peek()
+        if token[0] not in ("word", "string"):
+            self.error("esperado um valor")
+        self.pos += 1
+        return token
+
+    def convert(self, field_name: str, token: Tuple[str, str, int]):
+        """Valor do token no tipo do campo (bytes, timestamp ou texto normalizado)"""
+        _, value, position = token
+        if field_name == "size":
+            m = _NUMBER.fullmatch(value.strip())
+            if m is None or m.group(2).upper() not in SIZE_UNITS:
+                raise FilterSyntaxError(f"tamanho inválido {value!r}", position)
+            return int(float(m.group(1)) * SIZE_UNITS[m.group(2).upper()])
+        if field_name in ("mtime", "atime"):
+            m = _NUMBER.fullmatch(value.strip())
+            if m is not None and m.group(2).lower() in AGE_UNITS:
+                return self.now - float(m.group(1)) * AGE_UNITS[m.group(2).lower()]
+            try:
+                return time.mktime(time.strptime(value.strip(), "%Y-%m-%d"))
+            except ValueError:
+                raise FilterSyntaxError(f"data inválida {value!r} (use AAAA-MM-DD ou uma idade como 90d)", position)
+        value = value.lower()
+        if field_name == "ext" and value and not value.startswith("."):
+            value = f".{value}"
+        return value
+
+
+def _subject(field_name: str, lowered: bool) -> str:
+    """Código que produz o valor do campo dentro do predicado"""
+    if field_name == "path":
+        return "_join(dirpath, name).lower()" if lowered else "_join(dirpath, name)"
+    if field_name == "name" and lowered:
+        return "name.lower()"
+    return field_name
+
+
+def _generate(node: tuple, constants: dict) -> str:
+    """Código Python do nó; os valores entram como constantes (_c0, _c1, ...)"""
+    kind = node[0]
+    if kind in ("and", "or"):
+        return "(" + f" {kind} ".join(_generate(child, constants) for child in node[1]) + ")"
+    if kind == "not":
+        return f"(not {_generate(node[1], constants)})"
+    name = f"_c{len(constants)}"
+    constants[name] = node[-1]
+    if kind == "in":
+        return f"({_subject(node[1], True)} in {name})"
+    _, field_name, op, _ = node
+    if op == "~":
+        return f"({name}.search({_subject(field_name, False)}) is not None)"
+    return f"({_subject(field_name, field_name in TEXT_FIELDS)} {op} {name})"
+
+
+def _prune_patterns(node: tuple) -> List[re.Pattern]:
+    """
+    Regex das condições obrigatórias "path !~ R": se a pasta (com o separador
+    no fim) já casa com R, todo caminho dentro dela também casa e falha no
+    filtro. Regex com âncora de fim ou lookahead ficam de fora, pois podem
+    casar com a pasta e não com o caminho mais longo.
+    """
+    if node[0] == "and":
+        return [pattern for child in node[1] for pattern in _prune_patterns(child)]
+    if node[0] == "not" and node[1][:3] == ("cmp", "path", "~") and not _PREFIX_UNSAFE.search(node[1][3].pattern):
+        return [node[1][3]]
+    return []
+
+
+def compile_filter(text: str, now: Optional[float] = None) -> FilterExpression:
+    """
+    Compila a expressão em um FilterExpression (levanta FilterSyntaxError).
+    now fixa o instante de referência das idades (padrão: time.time()).
+    """
+    now = time.time() if now is None else now
+    parser = _Parser(text, now)
+    tree = parser.parse()
+    constants = {}
+    code = _generate(tree, constants)
+    namespace = {"__builtins__": {}, "_join": os.path.join, **constants}
+    match = eval(compile(f"lambda {PREDICATE_ARGS}: {code}", "<filtro>", "eval"), namespace)
+
+    prune = None
+    patterns = tuple(_prune_patterns(tree))
+    if patterns:
+        def prune(dirpath: str) -> bool:
+            # Com o separador no fim, "cache/" poda "x/cache" mas não "x/cachet"
+            path = os.path.join(dirpath, "")
+            return any(pattern.search(path) for pattern in patterns)
+
+    return FilterExpression(text, match, prune, frozenset(parser.fields), now)
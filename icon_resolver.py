@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+from scanner_engine import CancellationToken
+from scan_index import default_index_path
+
+logger = logging.getLogger(__name__)
+
+# Extensões aceitas como ícone, em ordem de preferência
+ICON_EXTENSIONS = (".exe", ".ico")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS icons (
+    install_path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    icon TEXT
+);
+"""
+
+
+def default_icon_cache_path() -> str:
+    """Cache de ícones ao lado do índice de varreduras"""
+    return os.path.join(os.path.dirname(default_index_path()), "icon_cache.db")
+
+
+def parse_display_icon(display_icon: Optional[str]) -> Optional[str]:
+    """Extrai o caminho de um DisplayIcon ("C:\\app.exe",0 -> C:\\app.exe) se o arquivo existir"""
+    if not display_icon:
+        return None
+    # Limpa o caminho do ícone (pode conter índices, aspas ou variáveis)
+    icon_path = display_icon.split(",")[0].strip().strip('"')
+    icon_path = os.path.expandvars(icon_path)
+    return icon_path if icon_path and os.path.isfile(icon_path) else None
+
+
+def find_icon_file(install_location: str, max_depth: int = 2, max_entries: int = 5000) -> Optional[str]:
+    """
+    Procura um .exe (ou, na falta dele, um .ico) no diretório de instalação,
+    nível por nível com scandir, até max_depth subníveis e no máximo
+    max_entries entradas lidas
+    """
+    pending = deque([(install_location, 0)])
+    fallback = None
+    seen = 0
+    while pending:
+        dirpath, depth = pending.popleft()
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    seen += 1
+                    name = entry.name.lower()
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif name.endswith(ICON_EXTENSIONS[0]):
+                            return entry.path
+                        elif fallback is None and name.endswith(ICON_EXTENSIONS[1]):
+                            fallback = entry.path
+                    except OSError:
+                        continue
+                    if seen >= max_entries:
+                        return fallback
+        except OSError as e:
+            logger.debug(f"Error accessing {dirpath}: {e}")
+            continue
+        if depth < max_depth:
+            pending.extend((subdir, depth + 1) for subdir in sorted(subdirs))
+    return fallback
+
+
+class IconCache:
+    """
+    Cache persistente (SQLite) do ícone encontrado em cada diretório de
+    instalação. Uma entrada vale enquanto o mtime do diretório não mudar;
+    "nenhum ícone" também é guardado.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_icon_cache_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, install_path: str, mtime: float) -> Tuple[bool, Optional[str]]:
+        """Retorna (encontrado, ícone) para o diretório com esse mtime"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime, icon FROM icons WHERE install_path = ?", (install_path,)
+            ).fetchone()
+        if row is None or row[0] != mtime:
+            return False, None
+        return True, row[1]
+
+    def put_many(self, entries: List[Tuple[str, float, Optional[str]]]):
+        """Grava (diretório, mtime, ícone) em uma única transação"""
+        if not entries:
+            return
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO icons (install_path, mtime, icon) VALUES (?, ?, ?)", entries
+                    )
+            except sqlite3.Error as e:
+                logger.error(f"Error writing icon cache {self.path}: {e}")
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM icons")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class IconResolver:
+    """
+    Resolve ícones de programas fora do caminho crítico da listagem: usa o
+    DisplayIcon quando ele existe e, senão, uma busca limitada no diretório
+    de instalação, com o resultado guardado no IconCache.
+    """
+
+    def __init__(self, cache: Optional[IconCache] = None, workers: int = 4, max_depth: int = 2):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self._pending: List[Tuple[str, float, Optional[str]]] = []
+
+    def resolve(self, display_icon: Optional[str], install_location: Optional[str]) -> Optional[str]:
+        """Caminho do ícone de um programa (None se nenhum for encontrado)"""
+        icon_path = parse_display_icon(display_icon)
+        if icon_path or not install_location:
+            return icon_path
+
+        install_path = os.path.normpath(install_location)
+        try:
+            mtime = os.stat(install_path).st_mtime
+        except OSError:
+            return None
+        if self.cache is not None:
+            found, icon_path = self.cache.get(install_path, mtime)
+            if found:
+                return icon_path
+        icon_path = find_icon_file(install_path, self.max_depth)
+        # list.append é atômico; gravado no cache em flush()
+        self._pending.append((install_path, mtime, icon_path))
+        return icon_path
+
+    def resolve_many(
+        self,
+        programs: List[Tuple[Optional[str], Optional[str]]],
+        callback: Callable[[int, Optional[str]], None],
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        """
+        Resolve (DisplayIcon, diretório de instalação) em paralelo e chama
+        callback(índice, ícone) na thread que chamou, à medida que cada um termina
+        """
+        def run(index: int, display_icon: Optional[str], install_location: Optional[str]):
+            if cancel_token is not None and cancel_token.cancelled:
+                return index, None
+            return index, self.resolve(display_icon, install_location)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(run, i, *program) for i, program in enumerate(programs)]
+                for future in as_completed(futures):
+                    if cancel_token is not None and cancel_token.cancelled:
+                        for pending in futures:
+                            pending.cancel()
+                        break
+                    index, icon_path = future.result()
+                    callback(index, icon_path)
+        finally:
+            self.flush()
+
+    def flush(self):
+        pending, self._pending = self._pending, []
+        if self.cache is not None:
+            self.cache.put_many(pending)
@@ -0,0 +1,253 @@
+import os
+import sys
+import json
+import time
+import errno
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+# Exemplos de erro guardados por código (o total é sempre contado)
+MAX_ERROR_SAMPLES = 20
+# Intervalos guardados no modo trace (o excedente só soma nos tempos)
+MAX_TRACE_SPANS = 100_000
+# A partir do 3.12 o cProfile usa sys.monitoring: um único perfilador ativo
+# por processo, que já enxerga todas as threads
+SHARED_PROFILER = sys.version_info >= (3, 12)
+
+logger = logging.getLogger(__name__)
+
+
+def error_code(error: BaseException) -> str:
+    """Nome do errno de um erro (ex.: EACCES) ou o tipo da exceção"""
+    code = getattr(error, "errno", None)
+    if code is not None:
+        return errno.errorcode.get(code, str(code))
+    return type(error).__name__
+
+
+class Instrumentation:
+    """
+    Diagnóstico de uma operação: tempo por fase, contadores e erros por
+    errno, com perfil (cProfile) e trace opcionais.
+
+    Nada disto roda quando a operação recebe instrumentation=None: os
+    pontos instrumentados só consultam o relógio quando há um objeto, e o
+    walker acumula tudo em contadores locais de cada thread, somados aqui
+    uma vez no fim. Os tempos de fases executadas em várias threads (ex.:
+    scandir) são a soma entre as threads, não o tempo de parede.
+    """
+
+    def __init__(self, profile: bool = False, trace: bool = False):
+        self.profile = profile
+        self.trace = trace
+        self.phases: Dict[str, List[float]] = {}
+        self.counters: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.error_samples: Dict[str, List[str]] = {}
+        self.spans: List[tuple] = []
+        self._profiles = []
+        # Perfilador compartilhado pelas threads (3.12+) e quantas o estão usando
+        self._shared_profiler = None
+        self._profile_users = 0
+        # Motivo de o perfil não ter sido coletado (ex.: outro perfilador ativo)
+        self.profile_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self.started = time.time()
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        with self._lock:
+            phase = self.phases.setdefault(name, [0.0, 0])
+            phase[0] += seconds
+            phase[1] += calls
+
+    @contextmanager
+    def phase(self, name: str):
+        """Cronometra o bloco como uma chamada da fase name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.add_time(name, end - start)
+            if self.trace:
+                self.add_span(name, start, end)
+
+    def add_span(self, name: str, start: float, end: float, detail: Optional[str] = None):
+        """Guarda um intervalo (instantes de time.perf_counter) para o trace"""
+        with self._lock:
+            if len(self.spans) < MAX_TRACE_SPANS:
+                self.spans.append((name, threading.get_ident(), start - self._origin, end - start, detail))
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def add_counts(self, counts: Dict[str, int]):
+        with self._lock:
+            self.counters.update(counts)
+
+    def record_error(self, path: str, error: BaseException):
+        self.add_errors({error_code(error): 1}, {error_code(error): [f"{path}: {error}"]})
+
+    def add_errors(self, errors: Dict[str, int], samples: Dict[str, List[str]]):
+        with self._lock:
+            self.errors.update(errors)
+            for code, messages in samples.items():
+                kept = self.error_samples.setdefault(code, [])
+                kept.extend(messages[:MAX_ERROR_SAMPLES - len(kept)])
+
+    @contextmanager
+    def profiling(self):
+        """
+        Perfila o bloco com cProfile (sem efeito se profile=False). Até o
+        3.11 cada thread tem seu perfilador; do 3.12 em diante um só, ligado
+        pelo primeiro bloco e desligado pelo último, cobre todas as threads.
+        Se outro perfilador já estiver ativo, o bloco roda sem perfil.
+        """
+        if not self.profile:
+            yield
+            return
+        if SHARED_PROFILER:
+            with self._shared_profiling():
+                yield
+            return
+        profiler = self._start_profiler()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                with self._lock:
+                    self._profiles.append(profiler)
+
+    @contextmanager
+    def _shared_profiling(self):
+        with self._lock:
+            if self._profile_users == 0:
+                self._shared_profiler = self._start_profiler()
+            self._profile_users += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._profile_users -= 1
+                profiler = self._shared_profiler
+                if self._profile_users == 0 and profiler is not None:
+                    profiler.disable()
+                    self._profiles.append(profiler)
+                    self._shared_profiler = None
+
+    def _start_profiler(self):
+        """Novo cProfile já ligado, ou None se não for possível ligá-lo"""
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # "Another profiling tool is already active" (3.12+): segue sem perfil
+            if self.profile_error is None:
+                logger.warning(f"Profiling disabled: {e}")
+            self.profile_error = str(e)
+            return None
+        return profiler
+
+    def _profile_stats(self):
+        import pstats
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profiler in profiles[1:]:
+            stats.add(profiler)
+        return stats
+
+    def profile_report(self, limit: int = 30, sort: str = "cumulative") -> str:
+        """Funções mais caras de todas as threads perfiladas (texto do pstats)"""
+        import io
+        stats = self._profile_stats()
+        if stats is None:
+            return ""
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump_profile(self, path: str) -> bool:
+        """Grava o perfil combinado no formato do pstats (abre com snakeviz, etc.)"""
+        stats = self._profile_stats()
+        if stats is None:
+            return False
+        stats.dump_stats(path)
+        return True
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "phases": {
+                    name: {"seconds": seconds, "calls": calls}
+                    for name, (seconds, calls) in sorted(self.phases.items(), key=lambda item: -item[1][0])
+                },
+                "counters": dict(self.counters),
+                "errors": dict(self.errors.most_common()),
+                "error_samples": {code: list(messages) for code, messages in self.error_samples.items()},
+                # Perfiladores combinados: um por thread até o 3.11, um só a partir do 3.12
+                "profiled_threads": len(self._profiles),
+                "profile_error": self.profile_error,
+                "trace_spans": len(self.spans),
+            }
+
+    def export_json(self, path: str):
+        """Grava o diagnóstico em JSON (e, com perfil, o .prof ao lado)"""
+        data = self.to_dict()
+        if self._profiles:
+            profile_path = os.path.splitext(path)[0] + ".prof"
+            self.dump_profile(profile_path)
+            data["profile_file"] = profile_path
+            data["profile_top"] = self.profile_report(limit=30)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=2)
+
+    def export_trace(self, path: str):
+        """Grava os intervalos do modo trace no formato do chrome://tracing / Perfetto"""
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {"name": name, "ph": "X", "pid": os.getpid(), "tid": tid,
+             "ts": start * 1_000_000, "dur": duration * 1_000_000, "args": {"detail": detail} if detail else {}}
+            for name, tid, start, duration, detail in spans
+        ]
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events}, fh)
+
+    def summary(self) -> str:
+        """Resumo legível para o painel de diagnóstico"""
+        data = self.to_dict()
+        lines = ["Fases (s; fases das threads do walker somam todas as threads):"]
+        for name, phase in data["phases"].items():
+            lines.append(f"  {name:<22} {phase['seconds']:>10.3f}  ({phase['calls']} chamadas)")
+        lines.append("Contadores:")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"  {name:<22} {value:>10}")
+        if data["errors"]:
+            lines.append("Erros por código:")
+            for code, total in data["errors"].items():
+                lines.append(f"  {code:<22} {total:>10}")
+                for message in data["error_samples"].get(code, [])[:3]:
+                    lines.append(f"      {message}")
+        return "\n".join(lines)
+
+
+def phase(instrumentation: Optional[Instrumentation], name: str):
+    """instrumentation.phase(name), ou um contexto vazio sem instrumentação"""
+    return instrumentation.phase(name) if instrumentation is not None else nullcontext()
+
+
+def profiling(instrumentation: Optional[Instrumentation]):
+    """instrumentation.profiling(), ou um contexto vazio sem instrumentação"""
+    return instrumentation.profiling() if instrumentation is not None else nullcontext()
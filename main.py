@@ -1,16 +1,29 @@
 import sys
-from ui import FileScannerWindow
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon
+import multiprocessing
+from script import relaunch_as_admin
 
 def main():
+    # Processo auxiliar elevado para remoções em lote (já iniciado como administrador)
+    if len(sys.argv) > 1 and sys.argv[1] in ("--delete-batch", "--delete"):
+        from deleter import run_delete_helper
+        sys.exit(run_delete_helper(sys.argv[1:]))
+
+    # Garante que a interface só abra em modo administrador (antes de carregar o Qt)
+    relaunch_as_admin()
+
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QIcon
+    from ui import FileScannerWindow
+
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("coloeus.ico"))  # Adicione um ícone se desejar
     
     window = FileScannerWindow()
     window.show()
-    
+
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Processos de varredura por disco (ProcessWalker) no executável do PyInstaller
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,400 @@
+"""
+Varredura de várias raízes em processos separados.
+
+O ParallelWalker divide as pastas entre threads, mas os filtros e a criação
+das linhas disputam o GIL: ao varrer vários discos de uma vez, um único
+processo vira o gargalo antes dos discos. O ProcessWalker agrupa as raízes
+por volume (st_dev) e entrega cada grupo a um processo com seu próprio
+ParallelWalker. Os processos devolvem lotes ScanResult serializados com
+pack (arrays e nomes unidos em um texto), não um objeto por arquivo, e o
+processo principal só concatena as colunas.
+"""
+import os
+import heapq
+import queue
+import threading
+import time
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from scanner_engine import Batch, CancellationToken, ParallelWalker, ScanProgress, ScanStats
+from scan_index import ScanIndex
+from scan_result import ScanResult
+
+logger = logging.getLogger(__name__)
+
+# Linhas acumuladas por lote enviado ao processo principal
+BATCH_SIZE = 5000
+# Tempo máximo em segundos antes de enviar um lote parcial
+BATCH_INTERVAL = 0.1
+
+
+def group_roots(directories: Iterable[str], per_root: bool = False) -> List[List[str]]:
+    """
+    Agrupa as raízes por volume (st_dev, o número de série do volume no
+    Windows): pastas do mesmo disco ficam no mesmo processo, cujas threads
+    já dividem o disco entre si. Com per_root, cada raiz forma seu próprio
+    grupo. Raízes repetidas ou inexistentes ficam de fora.
+    """
+    groups: Dict[object, List[str]] = {}
+    seen = set()
+    for directory in directories:
+        norm_dir = os.path.normpath(directory)
+        if norm_dir in seen:
+            continue
+        seen.add(norm_dir)
+        try:
+            if not os.path.isdir(norm_dir):
+                logger.warning(f"Directory not found: {norm_dir}")
+                continue
+            key = norm_dir if per_root else os.stat(norm_dir).st_dev
+            groups.setdefault(key, []).append(norm_dir)
+        except OSError as e:
+            logger.error(f"Error scanning directory {norm_dir}: {e}")
+    return list(groups.values())
+
+
+def collect_batches(batches: Iterable[Batch], batch_size: int, batch_interval: float) -> Iterator[ScanResult]:
+    """
+    Junta os lotes (diretório, linhas) do walker em lotes ScanResult de até
+    batch_size linhas, entregando um lote parcial a cada batch_interval segundos
+    """
+    batch = ScanResult()
+    # O primeiro resultado é entregue imediatamente
+    last_flush = 0.0
+    for dirpath, rows in batches:
+        if rows:
+            batch.add_rows(dirpath, rows)
+        if batch and (len(batch) >= batch_size or time.monotonic() - last_flush >= batch_interval):
+            yield batch
+            batch = ScanResult()
+            last_flush = time.monotonic()
+    if batch:
+        yield batch
+
+
+def _top_key(item):
+    # Mesma ordem de SystemScanner.scan_files: maiores primeiro e depois caminho
+    return -item[1][1], os.path.join(item[0], item[1][0]).lower()
+
+
+def _mirror_token(token: CancellationToken, cancelled, resumed):
+    """Repassa ao token local a pausa e o cancelamento pedidos pelo processo principal"""
+    # Consulta em vez de wait: um processo que termina esperando em um Event
+    # deixaria o set() do processo principal bloqueado para sempre
+    while not cancelled.is_set():
+        time.sleep(ParallelWalker.CANCEL_POLL)
+        if resumed.is_set():
+            token.resume()
+        else:
+            token.pause()
+    token.cancel()
+
+
+def _scan_group(group: int, roots: List[str], config: dict, messages, cancelled, resumed):
+    """
+    Corpo de cada processo: percorre as raízes do grupo e envia mensagens
+    (tipo, grupo, conteúdo): "rows" com um ScanResult.pack, "index" com
+    alterações do índice (ScanIndex.add_forwarded), "progress" com um
+    ScanProgress, "error" com o texto da exceção e, sempre por último,
+    "done" com o ScanStats do grupo
+    """
+    # O aviso com os erros agrupados é emitido uma vez, pelo processo principal
+    logging.getLogger("scanner_engine").setLevel(logging.ERROR)
+    token = CancellationToken()
+    threading.Thread(target=_mirror_token, args=(token, cancelled, resumed), daemon=True).start()
+
+    progress = None
+    if config["progress"]:
+        def progress(snapshot: ScanProgress):
+            messages.put(("progress", group, snapshot))
+
+    def forward_index(data: bytes):
+        messages.put(("index", group, data))
+
+    stats = ScanStats()
+    try:
+        walker = ParallelWalker(
+            config["scan_filter"],
+            workers=config["workers"],
+            # Só consulta o índice: as pastas lidas do disco vão para o processo principal, o único que grava
+            index=ScanIndex(config["index_path"], forward=forward_index) if config["index_path"] else None,
+            force_rescan=config["force_rescan"],
+            cancel_token=token,
+            progress=progress,
+            progress_interval=config["progress_interval"],
+            recursive=config["recursive"],
+            include_roots=config["include_roots"]
+        )
+        batches = walker.walk(roots, stats, heartbeat=BATCH_INTERVAL)
+        if config["top_n"]:
+            # Só os N maiores de cada grupo atravessam para o processo principal
+            top = ScanResult()
+            rows = ((dirpath, row) for dirpath, rows in batches for row in rows)
+            for dirpath, row in heapq.nsmallest(config["top_n"], rows, key=_top_key):
+                top.add_rows(dirpath, (row,))
+            results: Iterable[ScanResult] = (top,)
+        else:
+            results = collect_batches(batches, BATCH_SIZE, BATCH_INTERVAL)
+        for result in results:
+            if result:
+                messages.put(("rows", group, result.pack()))
+    except Exception as e:
+        messages.put(("error", group, f"{type(e).__name__}: {e}"))
+    finally:
+        messages.put(("done", group, stats))
+
+
+class ProcessWalker:
+    """
+    Percorre várias raízes com um processo por volume, cada um com um
+    ParallelWalker configurado como o walker informado (filtros, threads,
+    índice, cancelamento e progresso). O processo principal recebe os lotes
+    já filtrados e serializados, soma os ScanStats e publica um ScanProgress
+    com os totais de todos os processos. Os processos só consultam o índice:
+    as pastas que leem do disco voltam junto com os lotes e o processo
+    principal é o único que grava no arquivo, uma vez no fim.
+
+    Os processos são iniciados com "spawn" (o único modo do Windows), o que
+    custa de 0,1 a 0,2 s por busca para importar o motor em cada um. Por
+    isso, com uma única raiz ou volume, ou quando o walker tem DirTree ou
+    Instrumentation (que vivem neste processo), a varredura roda no próprio
+    walker. Com mais volumes que processes, cada processo recebe mais de um.
+
+    Com top_n, cada processo envia só os N maiores do seu grupo. Com
+    per_root, cada raiz ganha um processo mesmo que divida o volume com
+    outra (útil quando o disco não é o limite, como em SSDs NVMe).
+    """
+
+    def __init__(
+        self,
+        walker: ParallelWalker,
+        processes: Optional[int] = None,
+        top_n: Optional[int] = None,
+        per_root: bool = False
+    ):
+        self.walker = walker
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.top_n = top_n
+        self.per_root = per_root
+
+    def _local(self, groups: List[List[str]]) -> bool:
+        """Se a varredura deve rodar neste processo"""
+        walker = self.walker
+        return (
+            len(groups) < 2 or self.processes < 2
+            or walker.dir_tree is not None or walker.instrumentation is not None
+        )
+
+    def walk(
+        self,
+        directories: Iterable[str],
+        stats: Optional[ScanStats] = None,
+        heartbeat: Optional[float] = None
+    ) -> Iterator[Batch]:
+        """Mesmos lotes (diretório, linhas) de ParallelWalker.walk"""
+        groups = group_roots(directories, self.per_root)
+        if self._local(groups):
+            yield from self.walker.walk([root for group in groups for root in group], stats, heartbeat)
+            return
+        for result in self._walk_processes(groups, stats, heartbeat):
+            if not result:
+                yield "", []
+                continue
+            # As linhas de cada pasta chegam contíguas, na ordem em que o walker as emitiu
+            parents = result.parents
+            start = 0
+            for end in range(1, len(parents) + 1):
+                if end == len(parents) or parents[end] != parents[start]:
+                    yield result.dirs[parents[start]], [
+                        (result.names[i], result.sizes[i], result.atimes[i], result.mtimes[i],
+                         result.exts[result.ext_ids[i]], bool(result.is_dirs[i]))
+                        for i in range(start, end)
+                    ]
+                    start = end
+
+    def walk_results(
+        self,
+        directories: Iterable[str],
+        stats: Optional[ScanStats] = None,
+        batch_size: int = 1000,
+        batch_interval: float = 0.1
+    ) -> Iterator[ScanResult]:
+        """
+        Gera lotes ScanResult (sem ordenação) à medida que chegam, sem criar
+        uma tupla por linha neste processo
+        """
+        groups = group_roots(directories, self.per_root)
+        if self._local(groups):
+            batches = self.walker.walk([root for group in groups for root in group], stats, heartbeat=batch_interval)
+            yield from collect_batches(batches, batch_size, batch_interval)
+            return
+        for result in self._walk_processes(groups, stats, batch_interval):
+            if result:
+                yield result
+
+    def _walk_processes(
+        self,
+        groups: List[List[str]],
+        stats: Optional[ScanStats],
+        heartbeat: Optional[float]
+    ) -> Iterator[ScanResult]:
+        """Lotes recebidos dos processos; um ScanResult vazio quando nada chega em heartbeat segundos"""
+        start = time.perf_counter()
+        walker = self.walker
+        token = walker.cancel_token
+        progress = walker.progress
+        heartbeat = min(heartbeat or ParallelWalker.CANCEL_POLL, ParallelWalker.CANCEL_POLL)
+
+        # Volumes além do número de processos são distribuídos entre eles
+        if len(groups) > self.processes:
+            merged: List[List[str]] = [[] for _ in range(self.processes)]
+            for i, group in enumerate(groups):
+                merged[i % self.processes].extend(group)
+            groups = merged
+
+        # Importado só aqui: a maioria das buscas nunca cria processos
+        import multiprocessing
+        context = multiprocessing.get_context("spawn")
+        messages = context.Queue()
+        cancelled = context.Event()
+        resumed = context.Event()
+        resumed.set()
+        config = {
+            "scan_filter": walker.scan_filter,
+            # As threads de cada processo dividem os núcleos entre os grupos
+            "workers": max(1, walker.workers // len(groups)),
+            "index_path": walker.index.path if walker.index is not None else None,
+            "force_rescan": walker.force_rescan,
+            "progress": progress is not None,
+            "progress_interval": walker.progress_interval,
+            "recursive": walker.recursive,
+            "include_roots": walker.include_roots,
+            "top_n": self.top_n,
+        }
+        processes = [
+            context.Process(
+                target=_scan_group, args=(group, roots, config, messages, cancelled, resumed), daemon=True
+            )
+            for group, roots in enumerate(groups)
+        ]
+        for process in processes:
+            process.start()
+
+        snapshots: Dict[int, ScanProgress] = {}
+        finished: Dict[int, ScanStats] = {}
+        current_dir = ""
+        next_report = 0.0
+
+        def receive(timeout: float) -> Optional[tuple]:
+            try:
+                return messages.get(timeout=timeout)
+            except queue.Empty:
+                # Processo encerrado sem "done" (ex.: morto pelo sistema): conta como concluído
+                for group, process in enumerate(processes):
+                    if group not in finished and process.exitcode not in (None, 0):
+                        logger.error(f"Scan process for {groups[group]} exited with code {process.exitcode}")
+                        finished[group] = ScanStats()
+                return None
+
+        try:
+            while len(finished) < len(processes):
+                if token is not None:
+                    if token.cancelled:
+                        break
+                    if token.paused:
+                        resumed.clear()
+                    else:
+                        resumed.set()
+                message = receive(heartbeat)
+                if message is None:
+                    yield ScanResult()
+                    continue
+                kind, group, payload = message
+                if kind == "rows":
+                    yield ScanResult.unpack(payload)
+                elif kind == "progress":
+                    snapshots[group] = payload
+                    current_dir = payload.current_dir or current_dir
+                    now = time.monotonic()
+                    if now >= next_report:
+                        progress(self._snapshot(snapshots, current_dir, start))
+                        next_report = now + walker.progress_interval
+                elif kind == "index":
+                    walker.index.add_forwarded(payload)
+                elif kind == "error":
+                    logger.error(f"Error scanning {groups[group]}: {payload}")
+                else:
+                    finished[group] = payload
+        finally:
+            # Se o consumidor parar antes do fim, os processos descartam o trabalho
+            # restante; a fila é esvaziada para eles poderem terminar de escrever nela
+            cancelled.set()
+            while len(finished) < len(processes):
+                message = receive(ParallelWalker.CANCEL_POLL)
+                if message is None:
+                    continue
+                if message[0] == "done":
+                    finished[message[1]] = message[2]
+                elif message[0] == "index":
+                    # Pastas já lidas continuam valendo para o índice
+                    walker.index.add_forwarded(message[2])
+            for process in processes:
+                process.join()
+            if walker.index is not None:
+                # Grava de uma vez o que os processos leram do disco
+                walker.index.flush()
+            total = self._merge_stats(list(finished.values()), start, token)
+            if stats is not None:
+                vars(stats).update(vars(total))
+            self._log_errors(total)
+            if progress is not None:
+                final = self._snapshot(snapshots, current_dir, start)
+                final.finished = not total.cancelled
+                progress(final)
+
+    @staticmethod
+    def _snapshot(snapshots: Dict[int, ScanProgress], current_dir: str, start: float) -> ScanProgress:
+        """Soma o último ScanProgress de cada processo"""
+        values = list(snapshots.values())
+
+        def total(attr: str) -> Optional[int]:
+            estimates = [getattr(snapshot, attr) for snapshot in values]
+            return sum(estimates) if estimates and None not in estimates else None
+
+        return ScanProgress(
+            dirs_visited=sum(s.dirs_visited for s in values),
+            files_examined=sum(s.files_examined for s in values),
+            files_matched=sum(s.files_matched for s in values),
+            bytes_examined=sum(s.bytes_examined for s in values),
+            bytes_matched=sum(s.bytes_matched for s in values),
+            current_dir=current_dir,
+            estimated_dirs=total("estimated_dirs"),
+            estimated_bytes=total("estimated_bytes"),
+            elapsed=time.perf_counter() - start
+        )
+
+    @staticmethod
+    def _merge_stats(group_stats: List[ScanStats], start: float, token: Optional[CancellationToken]) -> ScanStats:
+        codes: Counter = Counter()
+        for s in group_stats:
+            codes.update(s.error_codes)
+        return ScanStats(
+            workers=sum(s.workers for s in group_stats),
+            dirs_visited=sum(s.dirs_visited for s in group_stats),
+            files_examined=sum(s.files_examined for s in group_stats),
+            files_matched=sum(s.files_matched for s in group_stats),
+            dirs_from_index=sum(s.dirs_from_index for s in group_stats),
+            dirs_pruned=sum(s.dirs_pruned for s in group_stats),
+            errors=sum(s.errors for s in group_stats),
+            error_codes=dict(codes.most_common()),
+            elapsed=time.perf_counter() - start,
+            cancelled=token is not None and token.cancelled
+        )
+
+    @staticmethod
+    def _log_errors(stats: ScanStats):
+        if stats.error_codes:
+            summary = ", ".join(f"{code}: {count}" for code, count in stats.error_codes.items())
+            logger.warning(f"{sum(stats.error_codes.values())} entries could not be read ({summary})")
@@ -0,0 +1,352 @@
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tipos de valor (mesmos números do winreg, para o backend falso não depender dele)
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+HKLM = "HKEY_LOCAL_MACHINE"
+HKCU = "HKEY_CURRENT_USER"
+
+# Chaves de onde vem a lista de programas instalados
+UNINSTALL_KEYS = [
+    (HKLM, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (HKLM, r"SOFTWARE\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (HKCU, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
+]
+
+# Valores de uma chave: nome -> (dado, tipo)
+Values = Dict[str, Tuple[object, int]]
+
+# Subchaves lidas por tarefa do pool em read_uninstall_entries
+CHUNK_SIZE = 64
+
+
+class RegistryBackend:
+    """Acesso ao registro usado pelo scanner de programas (real ou falso)"""
+
+    def list_subkeys(self, hive: str, path: str) -> List[str]:
+        """Nomes das subchaves de hive\\path (OSError se a chave não existir)"""
+        raise NotImplementedError
+
+    def read_values(self, hive: str, path: str) -> Values:
+        """Todos os valores de uma chave em uma única passada"""
+        raise NotImplementedError
+
+    def query_value(self, hive: str, path: str, name: str) -> Tuple[object, int]:
+        """Um único valor (FileNotFoundError se não existir), como QueryValueEx"""
+        raise NotImplementedError
+
+    def key_last_write(self, hive: str, path: str) -> int:
+        """Última gravação da chave (QueryInfoKey, em intervalos de 100 ns)"""
+        raise NotImplementedError
+
+    def read_subkey_values(self, hive: str, path: str, names: Iterable[str]) -> List[Tuple[str, int, Values]]:
+        """(nome, última gravação, valores) de várias subchaves de hive\\path, ignorando as ilegíveis"""
+        entries = []
+        for name in names:
+            subkey = f"{path}\\{name}"
+            try:
+                entries.append((name, self.key_last_write(hive, subkey), self.read_values(hive, subkey)))
+            except OSError as e:
+                logger.debug(f"Error reading registry subkey {name}: {e}")
+        return entries
+
+    def subkey_last_writes(self, hive: str, path: str, names: Iterable[str]) -> List[Tuple[str, int]]:
+        """(nome, última gravação) de várias subchaves, sem ler os valores"""
+        entries = []
+        for name in names:
+            try:
+                entries.append((name, self.key_last_write(hive, f"{path}\\{name}")))
+            except OSError as e:
+                logger.debug(f"Error reading registry subkey {name}: {e}")
+        return entries
+
+
+class WinRegBackend(RegistryBackend):
+    """Registro real do Windows via winreg"""
+
+    def __init__(self):
+        import winreg
+        self._winreg = winreg
+
+    def _open(self, hive: str, path: str):
+        return self._winreg.OpenKey(getattr(self._winreg, hive), path)
+
+    def list_subkeys(self, hive: str, path: str) -> List[str]:
+        winreg = self._winreg
+        with self._open(hive, path) as key:
+            return [winreg.EnumKey(key, i) for i in range(winreg.QueryInfoKey(key)[0])]
+
+    def _enum_values(self, key) -> Tuple[int, Values]:
+        winreg = self._winreg
+        _, count, last_write = winreg.QueryInfoKey(key)
+        values = {}
+        for i in range(count):
+            name, data, reg_type = winreg.EnumValue(key, i)
+            values[name] = (data, reg_type)
+        return last_write, values
+
+    def read_values(self, hive: str, path: str) -> Values:
+        with self._open(hive, path) as key:
+            return self._enum_values(key)[1]
+
+    def query_value(self, hive: str, path: str, name: str) -> Tuple[object, int]:
+        with self._open(hive, path) as key:
+            return self._winreg.QueryValueEx(key, name)
+
+    def key_last_write(self, hive: str, path: str) -> int:
+        with self._open(hive, path) as key:
+            return self._winreg.QueryInfoKey(key)[2]
+
+    def read_subkey_values(self, hive: str, path: str, names: Iterable[str]) -> List[Tuple[str, int, Values]]:
+        # Abre a chave pai uma vez e as subchaves relativas a ela
+        winreg = self._winreg
+        entries = []
+        with self._open(hive, path) as parent:
+            for name in names:
+                try:
+                    with winreg.OpenKey(parent, name) as key:
+                        entries.append((name, *self._enum_values(key)))
+                except OSError as e:
+                    logger.debug(f"Error reading registry subkey {name}: {e}")
+        return entries
+
+    def subkey_last_writes(self, hive: str, path: str, names: Iterable[str]) -> List[Tuple[str, int]]:
+        winreg = self._winreg
+        entries = []
+        with self._open(hive, path) as parent:
+            for name in names:
+                try:
+                    with winreg.OpenKey(parent, name) as key:
+                        entries.append((name, winreg.QueryInfoKey(key)[2]))
+                except OSError as e:
+                    logger.debug(f"Error reading registry subkey {name}: {e}")
+        return entries
+
+
+class FakeRegistryBackend(RegistryBackend):
+    """
+    Registro em memória (carregável de JSON) para testes e benchmarks fora
+    do Windows. latency simula o custo de cada chamada ao registro e calls
+    conta quantas foram feitas. A "última gravação" de cada chave é um
+    contador que avança a cada alteração.
+    """
+
+    def __init__(self, keys: Optional[Dict[str, Dict]] = None, latency: float = 0.0):
+        # "HIVE\\caminho" em minúsculas -> {"name", "values", "subkeys"}
+        self._keys: Dict[str, Dict] = {}
+        self.latency = latency
+        self.calls = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+        for full_path, values in (keys or {}).items():
+            hive, _, path = full_path.partition("\\")
+            self.set_values(hive, path, values)
+
+    @staticmethod
+    def _key_id(hive: str, path: str) -> str:
+        return f"{hive}\\{path}".rstrip("\\").lower()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _node(self, hive: str, path: str) -> Dict:
+        node = self._keys.get(self._key_id(hive, path))
+        if node is None:
+            raise FileNotFoundError(f"Registry key not found: {hive}\\{path}")
+        return node
+
+    def _touch(self, node: Dict):
+        self._clock += 1
+        node["last_write"] = self._clock
+
+    def set_values(self, hive: str, path: str, values: Dict[str, Tuple[object, int]]):
+        """Cria a chave (e as chaves pai) com os valores informados"""
+        parts = path.split("\\")
+        for depth in range(len(parts) + 1):
+            key_id = self._key_id(hive, "\\".join(parts[:depth]))
+            if key_id not in self._keys:
+                self._keys[key_id] = {"name": parts[depth - 1] if depth else hive, "values": {}, "subkeys": []}
+                self._touch(self._keys[key_id])
+                if depth:
+                    parent = self._keys[self._key_id(hive, "\\".join(parts[:depth - 1]))]
+                    parent["subkeys"].append(parts[depth - 1])
+                    self._touch(parent)
+        node = self._keys[self._key_id(hive, path)]
+        node["values"].update({name: tuple(value) for name, value in values.items()})
+        self._touch(node)
+
+    def delete_key(self, hive: str, path: str):
+        """Remove a chave e suas subchaves"""
+        key_id = self._key_id(hive, path)
+        node = self._node(hive, path)
+        for other in [k for k in self._keys if k == key_id or k.startswith(key_id + "\\")]:
+            del self._keys[other]
+        parent_path = path.rpartition("\\")[0]
+        parent = self._keys.get(self._key_id(hive, parent_path))
+        if parent is not None:
+            parent["subkeys"].remove(node["name"])
+            self._touch(parent)
+
+    def list_subkeys(self, hive: str, path: str) -> List[str]:
+        self._call()
+        return list(self._node(hive, path)["subkeys"])
+
+    def read_values(self, hive: str, path: str) -> Values:
+        node = self._node(hive, path)
+        # Uma chamada para abrir a chave e uma por valor enumerado
+        for _ in range(len(node["values"]) + 1):
+            self._call()
+        return dict(node["values"])
+
+    def key_last_write(self, hive: str, path: str) -> int:
+        self._call()
+        return self._node(hive, path)["last_write"]
+
+    def query_value(self, hive: str, path: str, name: str) -> Tuple[object, int]:
+        self._call()
+        values = self._node(hive, path)["values"]
+        for value_name, value in values.items():
+            if value_name.lower() == name.lower():
+                return value
+        raise FileNotFoundError(f"Registry value not found: {name}")
+
+    @classmethod
+    def from_json(cls, path: str, latency: float = 0.0) -> "FakeRegistryBackend":
+        """Carrega um registro salvo com to_json"""
+        with open(path, "r", encoding="utf-8") as fh:
+            return cls(json.load(fh), latency)
+
+    def to_json(self, path: str):
+        """Salva as chaves com valores como {"HIVE\\\\caminho": {nome: [dado, tipo]}}"""
+        keys = {}
+        for node_id, node in self._keys.items():
+            if node["values"]:
+                keys[self._original_path(node_id)] = {
+                    name: list(value) for name, value in node["values"].items()
+                }
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(keys, fh)
+
+    def _original_path(self, node_id: str) -> str:
+        """Reconstrói o caminho com a grafia original de cada parte"""
+        parts = node_id.split("\\")
+        names = [parts[0].upper()]
+        for depth in range(1, len(parts)):
+            names.append(self._keys["\\".join(parts[:depth + 1])]["name"])
+        return "\\".join(names)
+
+
+def _list_subkeys(backend: RegistryBackend, key: Tuple[str, str]) -> List[str]:
+    try:
+        return backend.list_subkeys(*key)
+    except OSError as e:
+        logger.debug(f"Error opening registry key {key[1]}: {e}")
+        return []
+
+
+def _map_chunks(
+    pool: ThreadPoolExecutor,
+    function: Callable[[str, str, List[str]], List],
+    keys: List[Tuple[str, str]],
+    names_per_key: List[List[str]]
+) -> List[List]:
+    """Aplica function(hive, caminho, nomes) a blocos de subchaves no pool, agrupando o resultado por chave"""
+    def run(hive: str, path: str, names: List[str]) -> List:
+        try:
+            return function(hive, path, names)
+        except OSError as e:
+            logger.debug(f"Error opening registry key {path}: {e}")
+            return []
+
+    tasks = [
+        [pool.submit(run, hive, path, names[start:start + CHUNK_SIZE]) for start in range(0, len(names), CHUNK_SIZE)]
+        for (hive, path), names in zip(keys, names_per_key)
+    ]
+    return [[item for task in key_tasks for item in task.result()] for key_tasks in tasks]
+
+
+class RegistrySnapshot:
+    """
+    Cópia em memória das entradas de desinstalação. Depois da primeira
+    leitura, refresh() consulta só a última gravação (QueryInfoKey) de cada
+    subchave e relê os valores apenas das que mudaram ou surgiram; as que
+    sumiram saem da cópia.
+    """
+
+    def __init__(self, keys: List[Tuple[str, str]] = UNINSTALL_KEYS, workers: int = 8):
+        self.keys = list(keys)
+        self.workers = workers
+        # (hive, caminho, subchave) -> (última gravação, valores)
+        self._entries: Dict[Tuple[str, str, str], Tuple[int, Values]] = {}
+        self._loaded = False
+        # Subchaves relidas no último refresh
+        self.reread = 0
+
+    def invalidate(self):
+        """Descarta a cópia: o próximo refresh relê tudo"""
+        self._entries = {}
+        self._loaded = False
+
+    def refresh(self, backend: RegistryBackend) -> List[Tuple[str, Values]]:
+        """
+        Atualiza a cópia e retorna (nome da subchave, valores) de todas as
+        entradas, na ordem de keys e, dentro de cada chave, das subchaves
+        """
+        keys = self.keys
+        old = self._entries
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            listings = list(pool.map(lambda key: _list_subkeys(backend, key), keys))
+            if self._loaded:
+                times = _map_chunks(pool, backend.subkey_last_writes, keys, listings)
+                changed = [
+                    [name for name, last_write in key_times if old.get((hive, path, name), (None,))[0] != last_write]
+                    for (hive, path), key_times in zip(keys, times)
+                ]
+                readable = [{name for name, _ in key_times} for key_times in times]
+            else:
+                changed = listings
+                readable = [set(names) for names in listings]
+            fresh = _map_chunks(pool, backend.read_subkey_values, keys, changed)
+
+        entries = {}
+        for (hive, path), names, alive, key_fresh in zip(keys, listings, readable, fresh):
+            fresh_by_name = {name: (last_write, values) for name, last_write, values in key_fresh}
+            for name in names:
+                entry_key = (hive, path, name)
+                if name in fresh_by_name:
+                    entries[entry_key] = fresh_by_name[name]
+                elif name in alive and entry_key in old:
+                    entries[entry_key] = old[entry_key]
+        self._entries = entries
+        self._loaded = True
+        self.reread = sum(len(names) for names in changed)
+        return [(name, values) for (_, _, name), (_, values) in entries.items()]
+
+
+def read_uninstall_entries(
+    backend: RegistryBackend,
+    keys: List[Tuple[str, str]] = UNINSTALL_KEYS,
+    workers: int = 8
+) -> List[Tuple[str, Values]]:
+    """
+    Lê (nome da subchave, valores) de todas as entradas das chaves de
+    desinstalação. As hives são listadas em paralelo e as subchaves lidas
+    em blocos por um pool de threads (as chamadas do winreg liberam o GIL).
+    A ordem do resultado segue keys e, dentro de cada chave, as subchaves.
+    """
+    return RegistrySnapshot(keys, workers).refresh(backend)
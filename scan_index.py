@@ -0,0 +1,197 @@
+import os
+import marshal
+import sqlite3
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Filho de um diretório: (nome, é diretório, é link, tamanho, último acesso, última modificação)
+Child = Tuple[str, bool, bool, int, float, float]
+
+# Espera máxima em segundos por outra conexão que esteja gravando o arquivo
+BUSY_TIMEOUT = 30.0
+# Pastas acumuladas antes de repassar as alterações (índice com forward)
+FORWARD_BATCH = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime REAL NOT NULL,
+    children BLOB NOT NULL
+);
+"""
+
+
+def default_index_path() -> str:
+    """Local padrão do índice (%LOCALAPPDATA%\\Coloeus no Windows, ~/.cache/coloeus nos demais)"""
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "Coloeus" if os.name == "nt" else "coloeus", "scan_index.db")
+
+
+class ScanIndex:
+    """
+    Índice persistente (SQLite) com o mtime e os filhos de cada diretório
+    visto na última varredura.
+
+    Os filhos de cada diretório ficam serializados (marshal) em uma única
+    linha, para que a consulta custe uma leitura por diretório.
+
+    Um diretório cujo mtime não mudou é respondido a partir do índice, sem
+    scandir nem stat dos arquivos. O mtime de um diretório só muda quando
+    entradas são criadas, removidas ou renomeadas, então alterações no
+    conteúdo de arquivos existentes só aparecem com uma varredura completa
+    (force_rescan).
+
+    Com forward, o índice só lê o arquivo: flush entrega as alterações
+    pendentes (serializadas com marshal) a essa função, em lotes de
+    FORWARD_BATCH pastas, e quem as recebe as aplica com add_forwarded.
+    Assim os processos do ProcessWalker consultam o mesmo índice, mas só o
+    processo principal grava nele.
+    """
+
+    def __init__(self, path: Optional[str] = None, forward: Optional[Callable[[bytes], None]] = None):
+        self.path = path or default_index_path()
+        self.forward = forward
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._pool: List[sqlite3.Connection] = []
+        self._dirs: Optional[Dict[str, Tuple[int, float]]] = None
+        self._pending: List[Tuple[str, float, List[Child]]] = []
+
+        conn = self._acquire()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self._release(conn)
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Pega uma conexão livre do pool (cada conexão é usada por uma thread por vez)"""
+        with self._lock:
+            if self._pool:
+                return self._pool.pop()
+        return sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+
+    def _release(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._pool.append(conn)
+
+    def _load_dirs(self) -> Dict[str, Tuple[int, float]]:
+        dirs = self._dirs
+        if dirs is not None:
+            return dirs
+        conn = self._acquire()
+        try:
+            with self._lock:
+                if self._dirs is None:
+                    rows = conn.execute("SELECT path, id, mtime FROM dirs")
+                    self._dirs = {path: (dir_id, mtime) for path, dir_id, mtime in rows}
+                return self._dirs
+        finally:
+            self._release(conn)
+
+    def lookup(self, dirpath: str, mtime: Optional[float]) -> Optional[List[Child]]:
+        """Retorna os filhos em cache se o mtime do diretório não mudou, senão None"""
+        if mtime is None:
+            return None
+        cached = self._load_dirs().get(dirpath)
+        if cached is None or cached[1] != mtime:
+            return None
+        conn = self._acquire()
+        try:
+            row = conn.execute("SELECT children FROM dirs WHERE id = ?", (cached[0],)).fetchone()
+        finally:
+            self._release(conn)
+        return marshal.loads(row[0]) if row else None
+
+    def count_dirs(self, roots: List[str]) -> int:
+        """Quantas pastas sob as raízes o índice conhece (0 se alguma raiz nunca foi varrida)"""
+        dirs = self._load_dirs()
+        if not roots or any(root not in dirs for root in roots):
+            return 0
+        root_set = set(roots)
+        prefixes = tuple(root.rstrip(os.sep) + os.sep for root in roots)
+        return sum(1 for path in dirs if path in root_set or path.startswith(prefixes))
+
+    def record(self, dirpath: str, mtime: Optional[float], children: List[Child]):
+        """Agenda a gravação dos filhos lidos do disco (aplicada em flush)"""
+        if mtime is not None:
+            self._pending.append((dirpath, mtime, children))
+            if self.forward is not None and len(self._pending) >= FORWARD_BATCH:
+                self.flush()
+
+    def add_forwarded(self, data: bytes):
+        """Agenda as alterações repassadas por um índice com forward (aplicadas em flush)"""
+        self._pending.extend(marshal.loads(data))
+
+    def flush(self):
+        """
+        Grava as alterações pendentes em uma única transação (ou as repassa,
+        com forward). Se a gravação falhar, elas voltam para a fila e são
+        tentadas de novo no próximo flush.
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if self.forward is not None:
+            self.forward(marshal.dumps(pending))
+            return
+        conn = self._acquire()
+        try:
+            with conn:
+                for dirpath, mtime, children in pending:
+                    blob = marshal.dumps(children)
+                    row = conn.execute("SELECT id, children FROM dirs WHERE path = ?", (dirpath,)).fetchone()
+                    if row is None:
+                        conn.execute(
+                            "INSERT INTO dirs (path, mtime, children) VALUES (?, ?, ?)", (dirpath, mtime, blob)
+                        )
+                    else:
+                        self._forget_removed_subdirs(conn, dirpath, marshal.loads(row[1]), children)
+                        conn.execute(
+                            "UPDATE dirs SET mtime = ?, children = ? WHERE id = ?", (mtime, blob, row[0])
+                        )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing scan index {self.path} ({len(pending)} directories kept for retry): {e}")
+            self._pending[:0] = pending
+        finally:
+            self._release(conn)
+        with self._lock:
+            self._dirs = None
+
+    @staticmethod
+    def _forget_removed_subdirs(
+        conn: sqlite3.Connection, dirpath: str, previous: List[Child], children: List[Child]
+    ):
+        """Remove do índice subárvores de diretórios que deixaram de existir"""
+        current = {child[0] for child in children if child[1]}
+        for child in previous:
+            name = child[0]
+            if not child[1] or name in current:
+                continue
+            subdir = os.path.join(dirpath, name)
+            prefix = subdir.rstrip(os.sep) + os.sep
+            # substr em vez de LIKE: nomes podem conter % e _
+            conn.execute(
+                "DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?",
+                (subdir, len(prefix), prefix)
+            )
+
+    def clear(self):
+        """Descarta todo o conteúdo do índice"""
+        conn = self._acquire()
+        try:
+            with conn:
+                conn.execute("DELETE FROM dirs")
+        finally:
+            self._release(conn)
+        with self._lock:
+            self._dirs = None
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            pool, self._pool = self._pool, []
+        for conn in pool:
+            conn.close()
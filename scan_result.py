@@ -0,0 +1,389 @@
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from scanner_engine import Row
+
+
+def _join(values: List[str]) -> str:
+    # Nomes de arquivo não podem conter NUL; o terminador distingue [] de [""]
+    return "".join(value + "\0" for value in values)
+
+
+def _split(packed: str) -> List[str]:
+    return packed.split("\0")[:-1]
+
+
+class FileRow:
+    """Visão de uma linha de ScanResult com a mesma interface de FileInfo"""
+    __slots__ = ("_result", "_index")
+
+    def __init__(self, result: "ScanResult", index: int):
+        self._result = result
+        self._index = index
+
+    @property
+    def path(self) -> str:
+        return self._result.path_at(self._index)
+
+    @property
+    def size(self) -> int:
+        return self._result.sizes[self._index]
+
+    @property
+    def last_accessed(self) -> float:
+        return self._result.atimes[self._index]
+
+    @property
+    def last_modified(self) -> float:
+        return self._result.mtimes[self._index]
+
+    @property
+    def extension(self) -> str:
+        return self._result.extension_at(self._index)
+
+    @property
+    def is_directory(self) -> bool:
+        return bool(self._result.is_dirs[self._index])
+
+    def to_file_info(self):
+        """Materializa a linha como FileInfo"""
+        from script import FileInfo
+        return FileInfo(
+            path=self.path,
+            size=self.size,
+            last_accessed=self.last_accessed,
+            last_modified=self.last_modified,
+            extension=self.extension,
+            is_directory=self.is_directory
+        )
+
+    def __repr__(self):
+        return f"FileRow(path={self.path!r}, size={self.size})"
+
+
+class ScanResult:
+    """
+    Resultado de varredura em formato colunar.
+
+    Tamanhos e datas ficam em arrays compactos, extensões e diretórios pais
+    são internados (cada linha guarda só o id do pai e o próprio nome). A
+    ordem de exibição é uma permutação separada, então ordenar não move os
+    dados. Indexar ou iterar devolve visões FileRow com a interface de FileInfo.
+
+    Linhas removidas (ex.: arquivos excluídos) continuam nas colunas, marcadas
+    em _removed, e só saem da ordem de exibição; o total de bytes é um
+    contador mantido a cada inclusão e remoção.
+    """
+
+    def __init__(self):
+        self.dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self.exts: List[str] = []
+        self._ext_ids: Dict[str, int] = {}
+
+        self.parents = array("I")
+        self.names: List[str] = []
+        self.sizes = array("q")
+        self.atimes = array("d")
+        self.mtimes = array("d")
+        self.ext_ids = array("I")
+        self.is_dirs = bytearray()
+        self._removed = bytearray()
+        self._removed_count = 0
+        self._total_size = 0
+
+        # Permutação de exibição (None = ordem de inserção; sempre explícita
+        # depois de alguma remoção)
+        self._order: Optional[array] = None
+        # Permutações ascendentes já calculadas, por coluna
+        self._argsort_cache: Dict[str, array] = {}
+
+    def _dir_id(self, dirpath: str) -> int:
+        dir_id = self._dir_ids.get(dirpath)
+        if dir_id is None:
+            dir_id = self._dir_ids[dirpath] = len(self.dirs)
+            self.dirs.append(dirpath)
+        return dir_id
+
+    def _ext_id(self, ext: str) -> int:
+        ext_id = self._ext_ids.get(ext)
+        if ext_id is None:
+            ext_id = self._ext_ids[ext] = len(self.exts)
+            self.exts.append(ext)
+        return ext_id
+
+    def add_rows(self, dirpath: str, rows: Iterable[Row]):
+        """Acrescenta linhas do walker que pertencem ao diretório dirpath"""
+        dir_id = self._dir_id(dirpath)
+        ext_id = self._ext_id
+        for name, size, last_accessed, last_modified, ext, is_directory in rows:
+            self.parents.append(dir_id)
+            self.names.append(name)
+            self.sizes.append(size)
+            self.atimes.append(last_accessed)
+            self.mtimes.append(last_modified)
+            self.ext_ids.append(ext_id(ext))
+            self.is_dirs.append(is_directory)
+            self._total_size += size
+        start = len(self._removed)
+        self._removed.extend(bytes(len(self.sizes) - start))
+        self._append_order(start)
+        self._argsort_cache.clear()
+
+    def extend(self, other: "ScanResult"):
+        """Acrescenta as linhas de outro resultado (na ordem de inserção dele)"""
+        start = len(self.sizes)
+        dir_map = [self._dir_id(d) for d in other.dirs]
+        ext_map = [self._ext_id(e) for e in other.exts]
+        self.parents.extend(map(dir_map.__getitem__, other.parents))
+        self.names.extend(other.names)
+        self.sizes.extend(other.sizes)
+        self.atimes.extend(other.atimes)
+        self.mtimes.extend(other.mtimes)
+        self.ext_ids.extend(map(ext_map.__getitem__, other.ext_ids))
+        self.is_dirs.extend(other.is_dirs)
+        self._removed.extend(other._removed)
+        self._removed_count += other._removed_count
+        self._total_size += other._total_size
+        self._append_order(start)
+        self._argsort_cache.clear()
+
+    def pack(self) -> tuple:
+        """
+        Serializa as colunas em poucos objetos (bytes das arrays e textos unidos
+        por "\\0"), para enviar o resultado a outro processo sem um pickle por
+        linha. A ordem de exibição não é transferida.
+        """
+        return (
+            _join(self.dirs), _join(self.exts), _join(self.names),
+            self.parents.tobytes(), self.sizes.tobytes(), self.atimes.tobytes(), self.mtimes.tobytes(),
+            self.ext_ids.tobytes(), bytes(self.is_dirs), bytes(self._removed), self._total_size
+        )
+
+    @classmethod
+    def unpack(cls, packed: tuple) -> "ScanResult":
+        """Reconstrói um resultado gerado por pack (na ordem de inserção)"""
+        dirs, exts, names, parents, sizes, atimes, mtimes, ext_ids, is_dirs, removed, total_size = packed
+        result = cls()
+        result.dirs = _split(dirs)
+        result._dir_ids = {dirpath: dir_id for dir_id, dirpath in enumerate(result.dirs)}
+        result.exts = _split(exts)
+        result._ext_ids = {ext: ext_id for ext_id, ext in enumerate(result.exts)}
+        result.names = _split(names)
+        for column, data in ((result.parents, parents), (result.sizes, sizes), (result.atimes, atimes),
+                             (result.mtimes, mtimes), (result.ext_ids, ext_ids)):
+            column.frombytes(data)
+        result.is_dirs = bytearray(is_dirs)
+        result._removed = bytearray(removed)
+        result._removed_count = result._removed.count(1)
+        result._total_size = total_size
+        result._append_order(0)
+        return result
+
+    def _append_order(self, start: int):
+        """
+        Coloca as linhas armazenadas a partir de start no fim da exibição,
+        mantendo a ordem atual das anteriores
+        """
+        if self._order is None:
+            if not self._removed_count:
+                return
+            self._order = array("I", range(start))
+        removed = self._removed
+        self._order.extend(i for i in range(start, len(self.sizes)) if not removed[i])
+
+    def _present(self, order: array) -> array:
+        """Filtra as linhas removidas de uma permutação"""
+        if not self._removed_count:
+            return array("I", order)
+        removed = self._removed
+        return array("I", (i for i in order if not removed[i]))
+
+    def storage_indices(self) -> Iterator[int]:
+        """Índices de armazenamento das linhas presentes, na ordem de inserção"""
+        if not self._removed_count:
+            return iter(range(len(self.sizes)))
+        removed = self._removed
+        return (i for i in range(len(self.sizes)) if not removed[i])
+
+    def remove_positions(self, positions: Iterable[int]) -> List[int]:
+        """
+        Remove as linhas nas posições de exibição informadas, sem mover as
+        colunas. Trechos contíguos saem da permutação de uma vez, então o
+        custo em Python é proporcional às linhas removidas. Retorna os
+        índices de armazenamento removidos.
+        """
+        positions = sorted(set(positions), reverse=True)
+        if not positions:
+            return []
+        if self._order is None:
+            self._order = array("I", range(len(self.sizes)))
+        order = self._order
+        removed_indices = [order[position] for position in positions]
+        # Percorre do fim para o começo para as posições restantes não mudarem
+        start = 0
+        while start < len(positions):
+            end = start
+            while end + 1 < len(positions) and positions[end + 1] == positions[end] - 1:
+                end += 1
+            del order[positions[end]:positions[start] + 1]
+            start = end + 1
+
+        sizes = self.sizes
+        removed = self._removed
+        for index in removed_indices:
+            removed[index] = 1
+            self._total_size -= sizes[index]
+        self._removed_count += len(removed_indices)
+        return removed_indices
+
+    def remove(self, storage_indices: Iterable[int]) -> List[int]:
+        """Remove linhas pelo índice de armazenamento; retorna as posições de exibição que ocupavam"""
+        removed = self._removed
+        positions = list(self.positions(i for i in storage_indices if not removed[i]).values())
+        self.remove_positions(positions)
+        return sorted(positions, reverse=True)
+
+    def rows_under(self, dirpaths: Iterable[str]) -> List[int]:
+        """Índices de armazenamento das linhas presentes dentro das pastas informadas"""
+        prefixes = tuple(os.path.join(d, "") for d in dirpaths)
+        if not prefixes:
+            return []
+        dir_ids = {
+            dir_id for dir_id, dirpath in enumerate(self.dirs)
+            if os.path.join(dirpath, "").startswith(prefixes)
+        }
+        parents = self.parents
+        return [i for i in self.storage_indices() if parents[i] in dir_ids]
+
+    def set_directory_sizes(self, size_of: Callable[[str], int]):
+        """Preenche o tamanho das linhas de pasta (ex.: com DirTree.total_size)"""
+        is_dirs = self.is_dirs
+        index = is_dirs.find(1)
+        while index != -1:
+            size = size_of(self.path_at(index))
+            if not self._removed[index]:
+                self._total_size += size - self.sizes[index]
+            self.sizes[index] = size
+            index = is_dirs.find(1, index + 1)
+        self._argsort_cache.clear()
+
+    def path_at(self, index: int) -> str:
+        """Caminho completo da linha armazenada em index"""
+        return os.path.join(self.dirs[self.parents[index]], self.names[index])
+
+    def extension_at(self, index: int) -> str:
+        return self.exts[self.ext_ids[index]]
+
+    def storage_index(self, position: int) -> int:
+        """Converte a posição de exibição no índice de armazenamento"""
+        return self._order[position] if self._order is not None else position
+
+    def positions(self, storage_indices: Iterable[int]) -> Dict[int, int]:
+        """Posição de exibição atual de cada índice de armazenamento informado"""
+        wanted = set(storage_indices)
+        if self._order is None:
+            return {i: i for i in wanted}
+        found = {}
+        for position, index in enumerate(self._order):
+            if index in wanted:
+                found[index] = position
+        return found
+
+    def _sort_keys(self, column: str) -> Callable[[int], object]:
+        """Chave numérica (ou pré-calculada) de ordenação de uma coluna"""
+        if column == "size":
+            return self.sizes.__getitem__
+        if column == "mtime":
+            return self.mtimes.__getitem__
+        if column == "atime":
+            return self.atimes.__getitem__
+        if column == "name":
+            return [name.lower() for name in self.names].__getitem__
+        if column in ("extension", "directory"):
+            # Ordena só os valores internados e usa a posição deles como chave
+            values, ids = (self.exts, self.ext_ids) if column == "extension" else (self.dirs, self.parents)
+            rank = [0] * len(values)
+            for position, value_id in enumerate(sorted(range(len(values)), key=lambda v: values[v].lower())):
+                rank[value_id] = position
+            return [rank[value_id] for value_id in ids].__getitem__
+        raise ValueError(f"Unknown sort column: {column}")
+
+    def argsort(self, column: str) -> array:
+        """
+        Permutação ascendente (estável) dos índices de armazenamento pela
+        coluna. É calculada uma vez e reaproveitada até o resultado mudar.
+        """
+        order = self._argsort_cache.get(column)
+        if order is None:
+            order = array("I", sorted(range(len(self.sizes)), key=self._sort_keys(column)))
+            self._argsort_cache[column] = order
+        return order
+
+    def sort_by(self, column: str, descending: bool = False):
+        """Ordena a exibição por uma coluna usando a permutação em cache"""
+        order = self._present(self.argsort(column))
+        self._order = order[::-1] if descending else order
+
+    def sort(self, key: Optional[Callable[[int], object]] = None, reverse: bool = False):
+        """
+        Ordena a exibição. Sem key, usa a ordem padrão do scanner: tamanho
+        decrescente e depois caminho. key recebe o índice de armazenamento.
+        """
+        if key is not None:
+            self._order = array("I", sorted(self.storage_indices(), key=key, reverse=reverse))
+            return
+
+        # Ordena numericamente pelo tamanho e só compara caminhos dentro dos
+        # grupos de tamanhos repetidos (localizados por busca binária)
+        path_at = self.path_at
+        sizes = self.sizes
+        order = self._present(self.argsort("size"))
+        repeated = [size for size, count in Counter(sizes).items() if count > 1]
+        if repeated:
+            sorted_sizes = list(map(sizes.__getitem__, order))
+            for size in repeated:
+                lo = bisect_left(sorted_sizes, size)
+                hi = bisect_right(sorted_sizes, size)
+                # Decrescente aqui porque a permutação inteira é invertida no final
+                order[lo:hi] = array("I", sorted(order[lo:hi], key=lambda i: path_at(i).lower(), reverse=True))
+        self._order = order[::-1]
+
+    @property
+    def total_size(self) -> int:
+        """Bytes das linhas presentes (contador exato, sem percorrer as colunas)"""
+        return self._total_size
+
+    def nbytes(self) -> int:
+        """Estimativa da memória ocupada pelas colunas (sem o overhead do interpretador)"""
+        import sys
+        columns = (self.parents, self.sizes, self.atimes, self.mtimes, self.ext_ids)
+        total = sum(col.itemsize * len(col) for col in columns) + len(self.is_dirs) + len(self._removed)
+        total += sys.getsizeof(self.names) + sum(sys.getsizeof(name) for name in self.names)
+        total += sum(sys.getsizeof(d) for d in self.dirs) + sum(sys.getsizeof(e) for e in self.exts)
+        if self._order is not None:
+            total += self._order.itemsize * len(self._order)
+        return total
+
+    def __len__(self) -> int:
+        return len(self.sizes) - self._removed_count
+
+    def __getitem__(self, position: Union[int, slice]) -> Union[FileRow, List[FileRow]]:
+        if isinstance(position, slice):
+            return [FileRow(self, self.storage_index(p)) for p in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("ScanResult index out of range")
+        return FileRow(self, self.storage_index(position))
+
+    def __iter__(self) -> Iterator[FileRow]:
+        order = self._order if self._order is not None else range(len(self.sizes))
+        for index in order:
+            yield FileRow(self, index)
+
+    def __repr__(self):
+        return f"ScanResult({len(self)} rows, {len(self.dirs)} dirs)"
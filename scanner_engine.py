@@ -0,0 +1,726 @@
+import os
+import queue
+import shutil
+import stat
+import threading
+import time
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from scan_index import Child, ScanIndex
+from dir_tree import DirTree
+from volumes import VolumeMonitor
+from instrumentation import MAX_ERROR_SAMPLES, Instrumentation, error_code
+from filter_expr import FilterExpression
+from exclusions import ExclusionRules
+
+logger = logging.getLogger(__name__)
+
+# Linha emitida pelo motor: (nome, tamanho, último acesso, última modificação, extensão, é diretório)
+Row = Tuple[str, int, float, float, str, bool]
+# Lote emitido pelo motor: (diretório pai, linhas encontradas nele)
+Batch = Tuple[str, List[Row]]
+# Pasta na fila das threads: (caminho, mtime, profundidade a partir da raiz, st_dev ou None)
+WorkItem = Tuple[str, Optional[float], int, Optional[int]]
+
+# Atributo dos pontos de nova análise do Windows (junções, links simbólicos, pontos de montagem)
+FILE_ATTRIBUTE_REPARSE_POINT = getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0x400)
+# Tag das junções e dos volumes montados em pastas do NTFS
+IO_REPARSE_TAG_MOUNT_POINT = getattr(stat, "IO_REPARSE_TAG_MOUNT_POINT", 0xA0000003)
+
+
+def default_workers() -> int:
+    """Número padrão de threads, mesmo critério do ThreadPoolExecutor"""
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+@dataclass
+class ScanStats:
+    """Estatísticas de uma varredura, preenchidas pelo motor ao final do walk"""
+    workers: int = 0
+    dirs_visited: int = 0
+    files_examined: int = 0
+    files_matched: int = 0
+    dirs_from_index: int = 0
+    # Subpastas não percorridas (poda do filtro, exclusões, max_depth ou outro volume)
+    dirs_pruned: int = 0
+    errors: int = 0
+    # Erros por código (ex.: {"EACCES": 12}), registrados uma vez no fim em vez de um a um
+    error_codes: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    cancelled: bool = False
+
+    @property
+    def dirs_per_second(self) -> float:
+        return self.dirs_visited / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class ScanProgress:
+    """Instantâneo do andamento de uma varredura, publicado periodicamente pelo walker"""
+    dirs_visited: int = 0
+    files_examined: int = 0
+    files_matched: int = 0
+    bytes_examined: int = 0
+    bytes_matched: int = 0
+    current_dir: str = ""
+    # Estimativas do total: pastas do índice anterior ou bytes usados no volume
+    estimated_dirs: Optional[int] = None
+    estimated_bytes: Optional[int] = None
+    elapsed: float = 0.0
+    finished: bool = False
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Fração concluída estimada (None quando não há estimativa)"""
+        if self.finished:
+            return 1.0
+        # A estimativa pode ficar abaixo do real: não chega a 100% antes do fim
+        if self.estimated_dirs:
+            return min(self.dirs_visited / self.estimated_dirs, 0.99)
+        if self.estimated_bytes:
+            return min(self.bytes_examined / self.estimated_bytes, 0.99)
+        return None
+
+
+class CancellationToken:
+    """
+    Cancelamento e pausa cooperativos de uma varredura. As threads do walker
+    consultam o token entre diretórios (e a cada bloco de entradas em pastas
+    grandes), então cancelar leva no máximo algumas dezenas de milissegundos.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        # Acorda quem estiver esperando o fim de uma pausa
+        self._resumed.set()
+
+    def pause(self):
+        if not self._cancelled.is_set():
+            self._resumed.clear()
+
+    def resume(self):
+        self._resumed.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def wait_resumed(self, timeout: Optional[float] = None) -> bool:
+        """Espera o fim da pausa; retorna False se o timeout esgotar antes"""
+        return self._resumed.wait(timeout)
+
+
+@dataclass
+class ScanFilter:
+    """Filtros aplicados pelas threads durante o walk"""
+    min_size: int = 0
+    max_size: Optional[int] = None
+    extensions: Optional[Set[str]] = None
+    include_directories: bool = False
+    # False quando só interessam os totais por pasta (DirTree), sem linhas de arquivos
+    include_files: bool = True
+    # Expressão compilada (filter_expr), aplicada aos arquivos depois dos filtros acima;
+    # suas regras de poda evitam descer nas subpastas excluídas
+    expression: Optional[FilterExpression] = None
+    # Subárvores ignoradas por nome/caminho (globs, regex, presets de exclusions)
+    exclude: Optional[ExclusionRules] = None
+    # Níveis de subpastas percorridos abaixo de cada raiz (0 = só os arquivos da raiz)
+    max_depth: Optional[int] = None
+    # Não desce em pastas de outro volume (pontos de montagem)
+    same_filesystem: bool = False
+    # Não segue junções nem outros pontos de nova análise do Windows
+    # (links simbólicos nunca são seguidos)
+    skip_reparse_points: bool = False
+
+    def skips_subtree(self, path: str, name: str, depth: int) -> bool:
+        """Se a pasta path, depth níveis abaixo da raiz, está fora da varredura por nome ou profundidade"""
+        if self.max_depth is not None and depth > self.max_depth:
+            return True
+        if self.exclude is not None and self.exclude.matches(path, name):
+            return True
+        return self.expression is not None and self.expression.prune is not None and self.expression.prune(path)
+
+
+class _Counters:
+    """Contadores locais de cada thread (somados ao final, sem locks no loop)"""
+    __slots__ = (
+        "dirs", "files", "matched", "cached", "pruned", "errors", "bytes", "matched_bytes", "current",
+        "stat_calls", "skipped_dirs", "links", "errnos", "error_samples",
+        "scandir_time", "stat_time", "index_time", "filter_time"
+    )
+
+    def __init__(self):
+        self.dirs = 0
+        self.files = 0
+        self.matched = 0
+        self.cached = 0
+        self.pruned = 0
+        self.errors = 0
+        self.bytes = 0
+        self.matched_bytes = 0
+        self.current = ""
+        # Só para o diagnóstico (Instrumentation); os tempos ficam em zero sem ele
+        self.stat_calls = 0
+        self.skipped_dirs = 0
+        self.links = 0
+        self.errnos: Dict[str, int] = {}
+        self.error_samples: Dict[str, List[str]] = {}
+        self.scandir_time = 0.0
+        self.stat_time = 0.0
+        self.index_time = 0.0
+        self.filter_time = 0.0
+
+    def error(self, path: str, error: BaseException):
+        """Conta um erro pelo código (com alguns exemplos de caminho)"""
+        self.errors += 1
+        code = error_code(error)
+        self.errnos[code] = self.errnos.get(code, 0) + 1
+        samples = self.error_samples.setdefault(code, [])
+        if len(samples) < MAX_ERROR_SAMPLES:
+            samples.append(f"{path}: {error}")
+
+
+class ParallelWalker:
+    """
+    Percorre várias árvores de diretórios distribuindo subárvores entre um
+    pool limitado de threads. Usa os.scandir e reaproveita o stat em cache
+    de cada DirEntry, emitindo lotes (diretório, linhas) já filtrados.
+
+    Com um ScanIndex, diretórios cujo mtime não mudou desde a última
+    varredura são respondidos pelo índice sem tocar no disco; force_rescan
+    ignora o índice (mas o regrava).
+
+    Com um DirTree, cada thread registra também os totais diretos de todas
+    as pastas que lê (sem filtros) e a árvore é agregada ao final do walk.
+
+    Subpastas excluídas pelo ScanFilter (exclude, max_depth, outro volume,
+    pontos de nova análise ou a poda da expressão) nunca entram na fila:
+    não são lidas e ficam fora também dos totais do DirTree. Os erros de
+    acesso são contados por código e registrados em um único aviso no fim.
+
+    Com um CancellationToken, o walk pode ser pausado ou interrompido; ao
+    ser cancelado ele simplesmente termina, com os lotes já emitidos.
+
+    Com um callback de progresso, o consumidor do walk soma os contadores
+    das threads no máximo a cada progress_interval segundos e publica um
+    ScanProgress (o loop das threads só incrementa contadores locais).
+
+    Com recursive=False, só os diretórios informados são lidos (sem descer
+    nas subpastas), como ao reler as pastas alteradas em um FileWatcher.
+    include_roots=False omite a linha dos próprios diretórios informados
+    (que pertence à pasta pai) mesmo com include_directories.
+
+    Com uma Instrumentation, as threads também cronometram scandir, stat,
+    consulta ao índice e filtros, contam erros por errno e (com profile)
+    são perfiladas; os totais entram nela ao fim do walk.
+    """
+
+    _DONE = object()
+    # Intervalo máximo entre consultas ao token de cancelamento
+    CANCEL_POLL = 0.05
+    # Entradas lidas de uma pasta entre consultas ao token
+    CANCEL_CHECK_ENTRIES = 256
+
+    def __init__(
+        self,
+        scan_filter: Optional[ScanFilter] = None,
+        workers: Optional[int] = None,
+        index: Optional[ScanIndex] = None,
+        force_rescan: bool = False,
+        dir_tree: Optional[DirTree] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        progress: Optional[Callable[[ScanProgress], None]] = None,
+        progress_interval: float = 0.25,
+        recursive: bool = True,
+        include_roots: bool = True,
+        volume_monitor: Optional[VolumeMonitor] = None,
+        instrumentation: Optional[Instrumentation] = None
+    ):
+        self.scan_filter = scan_filter or ScanFilter()
+        self.workers = max(1, workers or default_workers())
+        self.index = index
+        self.force_rescan = force_rescan
+        self.dir_tree = dir_tree
+        self.cancel_token = cancel_token
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.recursive = recursive
+        self.include_roots = include_roots
+        self.volume_monitor = volume_monitor
+        self.instrumentation = instrumentation
+
+    def walk(
+        self,
+        directories: Iterable[str],
+        stats: Optional[ScanStats] = None,
+        heartbeat: Optional[float] = None
+    ) -> Iterator[Batch]:
+        """
+        Gera lotes (diretório, linhas) à medida que as threads os encontram.
+        Com heartbeat, emite um lote vazio ("", []) sempre que nenhum resultado
+        chegar nesse intervalo (em segundos), para o consumidor poder reagir.
+        """
+        start = time.perf_counter()
+        token = self.cancel_token
+        if token is not None:
+            # Acorda o consumidor periodicamente para ele perceber o cancelamento
+            heartbeat = min(heartbeat or self.CANCEL_POLL, self.CANCEL_POLL)
+        progress = self.progress
+        if progress is not None:
+            heartbeat = min(heartbeat or self.progress_interval, self.progress_interval)
+        roots: List[str] = []
+        work: "queue.Queue[Optional[WorkItem]]" = queue.Queue()
+        results: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        counters = [_Counters() for _ in range(self.workers)]
+
+        processed_dirs = set()
+        for directory in directories:
+            # Normaliza o caminho para evitar duplicatas
+            norm_dir = os.path.normpath(directory)
+            if norm_dir in processed_dirs:
+                continue
+            processed_dirs.add(norm_dir)
+
+            try:
+                if not os.path.isdir(norm_dir):
+                    logger.warning(f"Directory not found: {norm_dir}")
+                    continue
+
+                dir_stat = os.stat(norm_dir)
+                # Adiciona o próprio diretório se solicitado
+                if self.scan_filter.include_directories and self.include_roots:
+                    results.put((os.path.dirname(norm_dir), [(
+                        os.path.basename(norm_dir), 0, dir_stat.st_atime, dir_stat.st_mtime, "", True
+                    )]))
+                work.put((norm_dir, dir_stat.st_mtime, 0, dir_stat.st_dev))
+                roots.append(norm_dir)
+            except Exception as e:
+                logger.error(f"Error scanning directory {norm_dir}: {e}")
+                continue
+
+        threads = [
+            threading.Thread(target=self._worker, args=(work, results, stop, c), daemon=True)
+            for c in counters
+        ]
+        for thread in threads:
+            thread.start()
+
+        def coordinator():
+            # Quando não há mais diretórios pendentes, encerra as threads
+            work.join()
+            for _ in threads:
+                work.put(None)
+            results.put(self._DONE)
+
+        threading.Thread(target=coordinator, daemon=True).start()
+
+        estimate = self._estimate_totals(roots) if progress is not None else (None, None)
+        next_report = 0.0
+
+        try:
+            while True:
+                if token is not None and token.cancelled:
+                    break
+                if progress is not None:
+                    now = time.monotonic()
+                    if now >= next_report:
+                        progress(self._snapshot(counters, estimate, start))
+                        next_report = now + self.progress_interval
+                try:
+                    batch = results.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield "", []
+                    continue
+                if batch is self._DONE:
+                    break
+                yield batch
+        finally:
+            # Se o consumidor parar antes do fim, as threads descartam o trabalho restante
+            stop.set()
+            for thread in threads:
+                thread.join()
+            if self.index is not None:
+                self.index.flush()
+            if self.dir_tree is not None:
+                self.dir_tree.finalize()
+            if stats is not None:
+                stats.workers = self.workers
+                stats.dirs_visited = sum(c.dirs for c in counters)
+                stats.files_examined = sum(c.files for c in counters)
+                stats.files_matched = sum(c.matched for c in counters)
+                stats.dirs_from_index = sum(c.cached for c in counters)
+                stats.dirs_pruned = sum(c.pruned for c in counters)
+                stats.errors = sum(c.errors for c in counters)
+                stats.error_codes = self._error_codes(counters)
+                stats.elapsed = time.perf_counter() - start
+                stats.cancelled = token is not None and token.cancelled
+            self._log_errors(counters)
+            if self.instrumentation is not None:
+                self._record_instrumentation(counters)
+            if progress is not None:
+                final = self._snapshot(counters, estimate, start)
+                final.finished = not (token is not None and token.cancelled)
+                progress(final)
+
+    @staticmethod
+    def _error_codes(counters: List[_Counters]) -> Dict[str, int]:
+        codes: Counter = Counter()
+        for c in counters:
+            codes.update(c.errnos)
+        return dict(codes.most_common())
+
+    def _log_errors(self, counters: List[_Counters]):
+        """Um único aviso com os erros do walk agrupados por código (cada um só vai para o debug)"""
+        codes = self._error_codes(counters)
+        if not codes:
+            return
+        summary = ", ".join(f"{code}: {count}" for code, count in codes.items())
+        sample = next(samples[0] for c in counters for samples in c.error_samples.values() if samples)
+        logger.warning(f"{sum(codes.values())} entries could not be read ({summary}), e.g. {sample}")
+
+    def _record_instrumentation(self, counters: List[_Counters]):
+        """Soma os contadores das threads na Instrumentation"""
+        instrumentation = self.instrumentation
+        for name, attr in (("scandir", "scandir_time"), ("stat", "stat_time"),
+                           ("index_lookup", "index_time"), ("filter", "filter_time")):
+            seconds = sum(getattr(c, attr) for c in counters)
+            if seconds:
+                instrumentation.add_time(name, seconds, calls=sum(c.dirs for c in counters))
+        instrumentation.add_counts({
+            "dirs_visited": sum(c.dirs for c in counters),
+            "dirs_from_index": sum(c.cached for c in counters),
+            "dirs_pruned": sum(c.pruned for c in counters),
+            "files_examined": sum(c.files for c in counters),
+            "files_matched": sum(c.matched for c in counters),
+            "stat_calls": sum(c.stat_calls for c in counters),
+            "skipped_dirs": sum(c.skipped_dirs for c in counters),
+            "links_not_followed": sum(c.links for c in counters),
+        })
+        for c in counters:
+            instrumentation.add_errors(c.errnos, c.error_samples)
+
+    def _estimate_totals(self, roots: List[str]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Estima o tamanho da varredura: quantas pastas o índice viu sob as
+        raízes na última vez ou, para raízes de volume, os bytes em uso
+        """
+        estimated_dirs = None
+        if self.index is not None:
+            estimated_dirs = self.index.count_dirs(roots) or None
+        estimated_bytes = None
+        if roots and all(os.path.ismount(root) for root in roots):
+            if self.volume_monitor is not None:
+                # Amostra compartilhada com o painel de discos (sem nova consulta se ainda válida)
+                samples = [self.volume_monitor.sample(root) for root in roots]
+                if all(samples):
+                    estimated_bytes = sum(sample.used for sample in samples)
+            else:
+                try:
+                    estimated_bytes = sum(shutil.disk_usage(root).used for root in roots)
+                except OSError as e:
+                    logger.debug(f"Error reading disk usage: {e}")
+        return estimated_dirs, estimated_bytes
+
+    @staticmethod
+    def _snapshot(
+        counters: List[_Counters], estimate: Tuple[Optional[int], Optional[int]], start: float
+    ) -> ScanProgress:
+        """Soma os contadores das threads (leitura sem lock: valores aproximados durante o walk)"""
+        current = ""
+        for c in counters:
+            if c.current:
+                current = c.current
+        return ScanProgress(
+            dirs_visited=sum(c.dirs for c in counters),
+            files_examined=sum(c.files for c in counters),
+            files_matched=sum(c.matched for c in counters),
+            bytes_examined=sum(c.bytes for c in counters),
+            bytes_matched=sum(c.matched_bytes for c in counters),
+            current_dir=current,
+            estimated_dirs=estimate[0],
+            estimated_bytes=estimate[1],
+            elapsed=time.perf_counter() - start
+        )
+
+    def _worker(self, work: queue.Queue, results: queue.Queue, stop: threading.Event, counters: _Counters):
+        done = False
+        try:
+            if self.instrumentation is not None:
+                with self.instrumentation.profiling():
+                    done = self._work(work, results, stop, counters)
+            else:
+                done = self._work(work, results, stop, counters)
+        except Exception as e:
+            logger.error(f"Walker thread failed: {e}")
+            if not done:
+                self._drain(work, counters, e)
+
+    def _work(self, work: queue.Queue, results: queue.Queue, stop: threading.Event, counters: _Counters) -> bool:
+        """Lê as pastas da fila até receber a sentinela (retorna True)"""
+        while True:
+            item = work.get()
+            try:
+                if item is None:
+                    return True
+                if self._proceed(stop):
+                    self._scan_dir(item, work, results, counters)
+            except Exception as e:
+                counters.error(item[0], e)
+                logger.error(f"Error scanning directory {item[0]}: {e}")
+            finally:
+                work.task_done()
+
+    @staticmethod
+    def _drain(work: queue.Queue, counters: _Counters, error: BaseException):
+        """
+        Consome a fila até a sentinela sem ler as pastas (contadas como erro),
+        para uma thread que falhou fora de _work não travar o work.join()
+        """
+        while True:
+            item = work.get()
+            try:
+                if item is None:
+                    return
+                counters.error(item[0], error)
+            finally:
+                work.task_done()
+
+    def _proceed(self, stop: threading.Event) -> bool:
+        """Espera enquanto a varredura estiver pausada; False se ela deve parar"""
+        token = self.cancel_token
+        if token is None:
+            return not stop.is_set()
+        while not token.wait_resumed(self.CANCEL_POLL):
+            if stop.is_set():
+                return False
+        return not (stop.is_set() or token.cancelled)
+
+    def _read_dir(
+        self,
+        dirpath: str,
+        counters: _Counters,
+        foreign: Optional[Set[str]] = None,
+        dev: Optional[int] = None
+    ) -> Optional[List[Child]]:
+        """
+        Lista os filhos de um diretório com o stat em cache de cada DirEntry.
+        Com foreign, acrescenta a ele as subpastas que ficam em outro volume
+        ou são pontos de nova análise, decididas pelo mesmo stat em cache
+        """
+        timed = self.instrumentation is not None
+        if timed:
+            started = time.perf_counter()
+        try:
+            it = os.scandir(dirpath)
+        except OSError as e:
+            counters.error(dirpath, e)
+            counters.skipped_dirs += 1
+            logger.debug(f"Error accessing {e.filename}: {e.strerror}")
+            return None
+
+        token = self.cancel_token
+        check_every = self.CANCEL_CHECK_ENTRIES
+        children: List[Child] = []
+        failed = 0
+        stat_time = 0.0
+        with it:
+            for entry in it:
+                # Pastas enormes também respondem ao cancelamento (a listagem
+                # incompleta é descartada e não vai para o índice)
+                if token is not None and len(children) % check_every == 0 and token.cancelled:
+                    counters.skipped_dirs += 1
+                    return None
+                try:
+                    if timed:
+                        stat_started = time.perf_counter()
+                        stat = entry.stat()
+                        stat_time += time.perf_counter() - stat_started
+                    else:
+                        stat = entry.stat()
+                    child = (
+                        entry.name, entry.is_dir(), entry.is_symlink(),
+                        stat.st_size, stat.st_atime, stat.st_mtime
+                    )
+                    children.append(child)
+                    # Sem links, stat() e stat(follow_symlinks=False) são o mesmo cache
+                    if foreign is not None and child[1] and not child[2] and \
+                            self._leaves_volume(entry.stat(follow_symlinks=False), dev):
+                        foreign.add(entry.name)
+                except (PermissionError, OSError) as e:
+                    failed += 1
+                    counters.error(os.path.join(dirpath, entry.name), e)
+                    logger.debug(f"Error accessing file {entry.name}: {e}")
+                    continue
+        counters.stat_calls += len(children) + failed
+        if timed:
+            counters.stat_time += stat_time
+            counters.scandir_time += time.perf_counter() - started - stat_time
+        return children
+
+    def _scan_dir(
+        self,
+        item: WorkItem,
+        work: queue.Queue,
+        results: queue.Queue,
+        counters: _Counters
+    ):
+        dirpath, dir_mtime, depth, dir_dev = item
+        children = None
+        from_index = False
+        timed = self.instrumentation is not None
+        if timed:
+            dir_started = time.perf_counter()
+        if self.index is not None and not self.force_rescan:
+            if timed:
+                started = time.perf_counter()
+            children = self.index.lookup(dirpath, dir_mtime)
+            if timed:
+                counters.index_time += time.perf_counter() - started
+            if children is not None:
+                from_index = True
+                counters.cached += 1
+        # Subpastas em outro volume ou pontos de nova análise (só numa leitura do disco)
+        foreign = None
+        if children is None:
+            if self.scan_filter.same_filesystem or self.scan_filter.skip_reparse_points:
+                foreign = set()
+            children = self._read_dir(dirpath, counters, foreign, dir_dev)
+            if children is None:
+                return
+            if self.index is not None:
+                self.index.record(dirpath, dir_mtime, children)
+
+        scan_filter = self.scan_filter
+        min_size = scan_filter.min_size
+        max_size = scan_filter.max_size
+        extensions = scan_filter.extensions
+        include_directories = scan_filter.include_directories
+        include_files = scan_filter.include_files
+        expression = scan_filter.expression
+        match = expression.match if expression is not None else None
+        skips_subtree = scan_filter.skips_subtree
+        check_mounts = scan_filter.same_filesystem or scan_filter.skip_reparse_points
+        recursive = self.recursive
+        rows: List[Row] = []
+        seen_bytes = 0
+        matched_bytes = 0
+
+        counters.current = dirpath
+        counters.dirs += 1
+        if timed:
+            started = time.perf_counter()
+        if self.dir_tree is not None:
+            self._record_totals(dirpath, children)
+        for name, is_dir, is_link, size, last_accessed, last_modified in children:
+            if is_dir:
+                if from_index:
+                    # O mtime guardado de um subdiretório pode estar desatualizado:
+                    # consulta o disco (um stat por pasta, nenhum por arquivo)
+                    counters.stat_calls += 1
+                    try:
+                        stat = os.stat(os.path.join(dirpath, name))
+                        last_accessed, last_modified = stat.st_atime, stat.st_mtime
+                    except OSError as e:
+                        counters.error(os.path.join(dirpath, name), e)
+                        logger.debug(f"Error accessing directory {name}: {e}")
+                        continue
+                # Assim como os.walk(followlinks=False), links para diretórios
+                # são listados mas não percorridos
+                if is_link:
+                    counters.links += 1
+                elif recursive:
+                    subdir = os.path.join(dirpath, name)
+                    if skips_subtree(subdir, name, depth + 1):
+                        counters.pruned += 1
+                    elif check_mounts and (
+                        name in foreign if foreign is not None else self._mount_check(subdir, dir_dev, counters)
+                    ):
+                        counters.pruned += 1
+                    else:
+                        work.put((subdir, last_modified, depth + 1, dir_dev))
+                if include_directories:
+                    rows.append((name, 0, last_accessed, last_modified, "", True))
+                continue
+
+            counters.files += 1
+            seen_bytes += size
+
+            # Aplica filtros
+            if not include_files:
+                continue
+            if size < min_size:
+                continue
+            if max_size and size > max_size:
+                continue
+
+            ext = os.path.splitext(name)[1].lower()
+            if extensions and ext not in extensions:
+                continue
+            if match is not None and not match(dirpath, name, ext, size, last_accessed, last_modified):
+                continue
+
+            counters.matched += 1
+            matched_bytes += size
+            rows.append((name, size, last_accessed, last_modified, ext, False))
+
+        counters.bytes += seen_bytes
+        counters.matched_bytes += matched_bytes
+        if timed:
+            finished = time.perf_counter()
+            counters.filter_time += finished - started
+            if self.instrumentation.trace:
+                self.instrumentation.add_span("scan_dir", dir_started, finished, dirpath)
+        if rows:
+            results.put((dirpath, rows))
+
+    def _mount_check(self, subdir: str, parent_dev: Optional[int], counters: _Counters) -> bool:
+        """Verificação de _leaves_volume com um lstat, para as pastas vindas do índice"""
+        counters.stat_calls += 1
+        try:
+            st = os.lstat(subdir)
+        except OSError as e:
+            counters.error(subdir, e)
+            return True
+        return self._leaves_volume(st, parent_dev)
+
+    def _leaves_volume(self, st: os.stat_result, parent_dev: Optional[int]) -> bool:
+        """
+        Se a subpasta com este lstat não deve ser percorrida: ponto de nova
+        análise (com skip_reparse_points) ou outro volume (com same_filesystem;
+        no Windows, onde o DirEntry não traz st_dev, junções e volumes
+        montados em pastas)
+        """
+        scan_filter = self.scan_filter
+        if scan_filter.skip_reparse_points and getattr(st, "st_file_attributes", 0) & FILE_ATTRIBUTE_REPARSE_POINT:
+            return True
+        if scan_filter.same_filesystem:
+            if getattr(st, "st_reparse_tag", 0) == IO_REPARSE_TAG_MOUNT_POINT:
+                return True
+            return bool(st.st_dev) and parent_dev is not None and st.st_dev != parent_dev
+        return False
+
+    def _record_totals(self, dirpath: str, children: List[Child]):
+        """Registra no DirTree o tamanho e a contagem dos arquivos diretos da pasta"""
+        own_size = 0
+        own_files = 0
+        largest = ("", 0)
+        for name, is_dir, _, size, _, _ in children:
+            if is_dir:
+                continue
+            own_size += size
+            own_files += 1
+            if size > largest[1]:
+                largest = (name, size)
+        self.dir_tree.add_dir(dirpath, own_size, own_files, largest)
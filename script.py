@@ -1,24 +1,39 @@
 import os
-import winreg
-import subprocess
-import ctypes
-import shutil
-import time
-from typing import List, Dict, Tuple, Optional, Set
+import heapq
+from typing import List, Dict, Tuple, Optional, Set, Iterator, Callable, Union
 from dataclasses import dataclass
-from pathlib import Path
-from functools import lru_cache
 import logging
 import sys
+from scanner_engine import CancellationToken, ParallelWalker, ScanFilter, ScanProgress, ScanStats
+from process_scan import ProcessWalker, collect_batches
+from scan_index import ScanIndex, default_index_path
+from scan_result import ScanResult, FileRow
+from dir_tree import DirTree, DirNode
+from registry import REG_EXPAND_SZ, RegistryBackend, RegistrySnapshot, Values, WinRegBackend
+from icon_resolver import IconCache, IconResolver
+from deleter import (
+    DEFAULT_WORKERS, DeleteProgress, DeleteResult, delete_paths, remove_batch_files, wait_for_results, write_batch_file
+)
+from watcher import ChangeSet, FileWatcher
+from volumes import DiskSample, VolumeMonitor, VolumeStatus
+from instrumentation import Instrumentation, phase, profiling
+from filter_expr import FilterExpression, FilterSyntaxError, compile_filter
+from exclusions import PRESETS as EXCLUSION_PRESETS, ExclusionRules
+from duplicates import DuplicateGroup, DuplicateStats, HashCache, default_hash_cache_path, find_duplicates
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _shell32():
+    """shell32 do Windows, importando ctypes só quando necessário"""
+    import ctypes
+    return ctypes.windll.shell32
+
 def is_admin() -> bool:
     """Verifica se o programa está sendo executado como administrador"""
     try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
+        return _shell32().IsUserAnAdmin()
     except Exception as e:
         logger.error(f"Admin check failed: {e}")
         return False
@@ -28,7 +43,7 @@ def relaunch_as_admin():
     if not is_admin():
         try:
             params = " ".join([f'"{arg}"' if " " in arg else arg for arg in sys.argv])
-            ctypes.windll.shell32.ShellExecuteW(
+            _shell32().ShellExecuteW(
                 None, "runas", sys.executable, params, None, 1
             )
             sys.exit(0)
@@ -37,9 +52,6 @@ def relaunch_as_admin():
             print("Este programa precisa ser executado como administrador.")
             sys.exit(1)
 
-# Garante que o script só continue se estiver em modo administrador
-relaunch_as_admin()
-
 @dataclass
 class ProgramInfo:
     name: str
@@ -49,6 +61,7 @@ class ProgramInfo:
     install_location: Optional[str]
     publisher: Optional[str]
     icon_path: Optional[str] = None  # Novo campo para ícone do programa
+    display_icon: Optional[str] = None  # Valor bruto de DisplayIcon, resolvido depois pelo IconResolver
 
 @dataclass
 class FileInfo:
@@ -60,94 +73,137 @@ class FileInfo:
     is_directory: bool = False  # Novo campo para identificar diretórios
 
 class SystemScanner:
-    # Cache para resultados de disco para evitar chamadas repetidas
-    _disk_cache = {}
-    _last_disk_check = 0
+    # Amostras de uso de disco compartilhadas pela interface e pelos scanners
+    _volume_monitor: Optional[VolumeMonitor] = None
+    # Índices persistentes de varredura, por caminho do arquivo
+    _scan_indexes: Dict[str, ScanIndex] = {}
+    _hash_caches: Dict[str, HashCache] = {}
+    _registry_backend: Optional[RegistryBackend] = None
+    # Cópia das entradas de desinstalação, por backend
+    _registry_snapshots: Dict[RegistryBackend, RegistrySnapshot] = {}
+    _icon_resolver: Optional[IconResolver] = None
     
     @staticmethod
-    def get_installed_programs(include_updates: bool = False) -> List[ProgramInfo]:
-        """Retorna lista de programas instalados com opção para incluir atualizações"""
+    def get_registry_backend() -> RegistryBackend:
+        """Backend de registro usado na listagem de programas (winreg por padrão)"""
+        if SystemScanner._registry_backend is None:
+            SystemScanner._registry_backend = WinRegBackend()
+        return SystemScanner._registry_backend
+
+    @staticmethod
+    def set_registry_backend(backend: Optional[RegistryBackend]):
+        """Troca o backend de registro (ex.: FakeRegistryBackend em testes); None volta ao winreg"""
+        SystemScanner._registry_backend = backend
+        SystemScanner._registry_snapshots.clear()
+
+    @staticmethod
+    def get_registry_snapshot(backend: Optional[RegistryBackend] = None) -> RegistrySnapshot:
+        """Cópia incremental das entradas de desinstalação do backend (criada na primeira chamada)"""
+        backend = backend or SystemScanner.get_registry_backend()
+        snapshot = SystemScanner._registry_snapshots.get(backend)
+        if snapshot is None:
+            snapshot = SystemScanner._registry_snapshots[backend] = RegistrySnapshot()
+        return snapshot
+
+    @staticmethod
+    def get_installed_programs(
+        include_updates: bool = False,
+        backend: Optional[RegistryBackend] = None,
+        resolve_icons: bool = False,
+        full_refresh: bool = False
+    ) -> List[ProgramInfo]:
+        """
+        Retorna lista de programas instalados com opção para incluir atualizações.
+        Os ícones ficam para resolve_program_icons (a interface os preenche
+        depois), a menos que resolve_icons seja True. Depois da primeira
+        chamada só as entradas cuja chave mudou (última gravação) são relidas;
+        full_refresh descarta a cópia e relê tudo
+        """
         programs = []
         seen_programs = set()  # Para evitar duplicatas
-        
-        registry_keys = [
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-            (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
-        ]
+        backend = backend or SystemScanner.get_registry_backend()
+        snapshot = SystemScanner.get_registry_snapshot(backend)
+        if full_refresh:
+            snapshot.invalidate()
 
-        for key, subkey in registry_keys:
-            try:
-                with winreg.OpenKey(key, subkey) as registry_key:
-                    for i in range(0, winreg.QueryInfoKey(registry_key)[0]):
-                        try:
-                            subkey_name = winreg.EnumKey(registry_key, i)
-                            with winreg.OpenKey(registry_key, subkey_name) as subkey:
-                                name = SystemScanner._get_reg_value(subkey, "DisplayName")
-                                if not name or (not include_updates and "Update" in name):
-                                    continue
-                                
-                                # Verifica se já vimos este programa
-                                if name in seen_programs:
-                                    continue
-                                seen_programs.add(name)
-                                
-                                install_location = SystemScanner._get_reg_value(subkey, "InstallLocation")
-                                programs.append(ProgramInfo(
-                                    name=name,
-                                    version=SystemScanner._get_reg_value(subkey, "DisplayVersion") or "N/A",
-                                    size=int(SystemScanner._get_reg_value(subkey, "EstimatedSize") or 0),
-                                    uninstall_string=SystemScanner._get_reg_value(subkey, "UninstallString"),
-                                    install_location=install_location,
-                                    publisher=SystemScanner._get_reg_value(subkey, "Publisher"),
-                                    icon_path=SystemScanner._get_program_icon(subkey, install_location)
-                                ))
-                        except (WindowsError, OSError) as e:
-                            logger.debug(f"Error reading registry subkey {subkey_name}: {e}")
-                            continue
-            except (WindowsError, OSError) as e:
-                logger.debug(f"Error opening registry key {subkey}: {e}")
+        # Entradas lidas em paralelo, cada uma em uma única passada de EnumValue (só as alteradas)
+        for subkey_name, values in snapshot.refresh(backend):
+            name = SystemScanner._get_reg_value(values, "DisplayName")
+            if not name or (not include_updates and "Update" in name):
                 continue
-        
+
+            # Verifica se já vimos este programa
+            if name in seen_programs:
+                continue
+            seen_programs.add(name)
+
+            install_location = SystemScanner._get_reg_value(values, "InstallLocation")
+            try:
+                size = int(SystemScanner._get_reg_value(values, "EstimatedSize") or 0)
+            except ValueError:
+                size = 0
+            programs.append(ProgramInfo(
+                name=name,
+                version=SystemScanner._get_reg_value(values, "DisplayVersion") or "N/A",
+                size=size,
+                uninstall_string=SystemScanner._get_reg_value(values, "UninstallString"),
+                install_location=install_location,
+                publisher=SystemScanner._get_reg_value(values, "Publisher"),
+                display_icon=SystemScanner._get_reg_value(values, "DisplayIcon")
+            ))
+
         # Ordena por tamanho (maiores primeiro) e depois por nome
         programs.sort(key=lambda x: (-x.size, x.name.lower()))
+        logger.debug(f"Registry refresh re-read {snapshot.reread} uninstall entries")
+        if resolve_icons:
+            SystemScanner.resolve_program_icons(programs)
         return programs
 
     @staticmethod
-    def _get_program_icon(subkey, install_location: Optional[str]) -> Optional[str]:
-        """Tenta obter o caminho do ícone do programa"""
-        icon_path = SystemScanner._get_reg_value(subkey, "DisplayIcon")
-        if icon_path:
-            # Limpa o caminho do ícone (pode conter índices ou parâmetros)
-            if "," in icon_path:
-                icon_path = icon_path.split(",")[0]
-            if os.path.exists(icon_path):
-                return icon_path
-        
-        if install_location:
-            # Tenta encontrar um ícone padrão no diretório de instalação
-            for ext in ['.exe', '.ico']:
-                for root, _, files in os.walk(install_location):
-                    for file in files:
-                        if file.lower().endswith(ext):
-                            full_path = os.path.join(root, file)
-                            return full_path
-        return None
+    def get_icon_resolver() -> IconResolver:
+        """Resolvedor de ícones com cache persistente (criado na primeira chamada)"""
+        if SystemScanner._icon_resolver is None:
+            SystemScanner._icon_resolver = IconResolver(IconCache())
+        return SystemScanner._icon_resolver
 
     @staticmethod
-    def _get_reg_value(key, value_name: str) -> Optional[str]:
-        """Obtém um valor do registro com tratamento de erros"""
-        try:
-            value, reg_type = winreg.QueryValueEx(key, value_name)
-            if reg_type == winreg.REG_EXPAND_SZ:
-                return os.path.expandvars(value)
-            return str(value) if value is not None else None
-        except (WindowsError, ValueError):
-            return None
+    def resolve_program_icons(
+        programs: List[ProgramInfo],
+        callback: Optional[Callable[[int, Optional[str]], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        """
+        Preenche icon_path dos programas em paralelo, chamando callback(índice,
+        ícone) à medida que cada um é resolvido
+        """
+        def on_resolved(index: int, icon_path: Optional[str]):
+            programs[index].icon_path = icon_path
+            if callback is not None:
+                callback(index, icon_path)
+
+        SystemScanner.get_icon_resolver().resolve_many(
+            [(program.display_icon, program.install_location) for program in programs],
+            on_resolved, cancel_token
+        )
+
+    @staticmethod
+    def _get_reg_value(values: Values, value_name: str) -> Optional[str]:
+        """Obtém um valor já lido do registro (nomes sem diferenciar maiúsculas, como no winreg)"""
+        entry = values.get(value_name)
+        if entry is None:
+            lowered = value_name.lower()
+            entry = next((v for n, v in values.items() if n.lower() == lowered), None)
+            if entry is None:
+                return None
+        value, reg_type = entry
+        if reg_type == REG_EXPAND_SZ:
+            return os.path.expandvars(value)
+        return str(value) if value is not None else None
 
     @staticmethod
     def uninstall_program(uninstall_string: str) -> bool:
         """Executa o comando de desinstalação com tratamento aprimorado"""
+        import subprocess
         try:
             # Limpa a string de desinstalação (pode conter aspas ou parâmetros)
             if uninstall_string.lower().startswith(('msiexec', 'msexec')):
@@ -178,23 +234,157 @@ class SystemScanner:
                     exe_path = parts[0].strip('"')
                     args = parts[1] if len(parts) > 1 else ""
                 # Chama como administrador
-                ctypes.windll.shell32.ShellExecuteW(None, "runas", exe_path, args, None, 1)
+                _shell32().ShellExecuteW(None, "runas", exe_path, args, None, 1)
             
             return True
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError) as e:
             logger.error(f"Failed to uninstall program: {e}")
             return False
 
+    @staticmethod
+    def _make_walker(
+        min_size: int,
+        max_size: Optional[int],
+        extensions: Optional[List[str]],
+        include_directories: bool,
+        workers: Optional[int],
+        use_index: bool = False,
+        force_rescan: bool = False,
+        dir_tree: Optional[DirTree] = None,
+        include_files: bool = True,
+        cancel_token: Optional[CancellationToken] = None,
+        progress: Optional[Callable[[ScanProgress], None]] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        query: Union[str, FilterExpression, None] = None,
+        exclude: Optional[ExclusionRules] = None,
+        max_depth: Optional[int] = None,
+        same_filesystem: bool = False,
+        skip_reparse_points: bool = False,
+        processes: Optional[int] = None,
+        top_n: Optional[int] = None
+    ) -> Union[ParallelWalker, ProcessWalker]:
+        """
+        Cria o walker paralelo com os filtros de scan_files (com processes,
+        um ProcessWalker que distribui os volumes entre processos)
+        """
+        walker = ParallelWalker(
+            SystemScanner._make_filter(
+                min_size, max_size, extensions, include_directories, include_files, query,
+                exclude, max_depth, same_filesystem, skip_reparse_points
+            ),
+            workers=workers,
+            index=SystemScanner.get_scan_index() if use_index else None,
+            force_rescan=force_rescan,
+            dir_tree=dir_tree,
+            cancel_token=cancel_token,
+            progress=progress,
+            volume_monitor=SystemScanner.get_volume_monitor(),
+            instrumentation=instrumentation
+        )
+        return ProcessWalker(walker, processes, top_n) if processes else walker
+
+    @staticmethod
+    def _make_filter(
+        min_size: int,
+        max_size: Optional[int],
+        extensions: Optional[List[str]],
+        include_directories: bool,
+        include_files: bool = True,
+        query: Union[str, FilterExpression, None] = None,
+        exclude: Optional[ExclusionRules] = None,
+        max_depth: Optional[int] = None,
+        same_filesystem: bool = False,
+        skip_reparse_points: bool = False
+    ) -> ScanFilter:
+        """ScanFilter de scan_files, compilando a query se ela vier como texto"""
+        extensions_set = {ext.lower() for ext in extensions} if extensions else None
+        if isinstance(query, str):
+            query = compile_filter(query) if query.strip() else None
+        return ScanFilter(
+            min_size, max_size, extensions_set, include_directories, include_files, query,
+            exclude or None, max_depth, same_filesystem, skip_reparse_points
+        )
+
+    @staticmethod
+    def get_scan_index(path: Optional[str] = None) -> ScanIndex:
+        """Retorna o índice persistente de varreduras (um por arquivo, reutilizado)"""
+        path = path or default_index_path()
+        if path not in SystemScanner._scan_indexes:
+            SystemScanner._scan_indexes[path] = ScanIndex(path)
+        return SystemScanner._scan_indexes[path]
+
+    @staticmethod
+    def iter_scan_files(
+        directories: List[str],
+        min_size: int = 0,
+        max_size: Optional[int] = None,
+        extensions: Optional[List[str]] = None,
+        include_directories: bool = False,
+        workers: Optional[int] = None,
+        stats: Optional[ScanStats] = None,
+        batch_size: int = 1000,
+        batch_interval: float = 0.1,
+        use_index: bool = False,
+        force_rescan: bool = False,
+        dir_tree: Optional[DirTree] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        progress: Optional[Callable[[ScanProgress], None]] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        query: Union[str, FilterExpression, None] = None,
+        exclude: Optional[ExclusionRules] = None,
+        max_depth: Optional[int] = None,
+        same_filesystem: bool = False,
+        skip_reparse_points: bool = False,
+        processes: Optional[int] = None
+    ) -> Iterator[ScanResult]:
+        """
+        Versão incremental de scan_files: gera lotes ScanResult (sem ordenação)
+        à medida que os arquivos são encontrados
+        
+        Args:
+            batch_size: Quantidade máxima de itens por lote
+            batch_interval: Tempo máximo em segundos antes de entregar um lote parcial
+            (demais argumentos iguais aos de scan_files)
+        """
+        walker = SystemScanner._make_walker(
+            min_size, max_size, extensions, include_directories, workers, use_index, force_rescan, dir_tree,
+            cancel_token=cancel_token, progress=progress, instrumentation=instrumentation, query=query,
+            exclude=exclude, max_depth=max_depth, same_filesystem=same_filesystem,
+            skip_reparse_points=skip_reparse_points, processes=processes
+        )
+        if isinstance(walker, ProcessWalker):
+            # Os lotes já chegam dos processos como ScanResult
+            yield from walker.walk_results(directories, stats, batch_size, batch_interval)
+        else:
+            batches = walker.walk(directories, stats, heartbeat=batch_interval)
+            yield from collect_batches(batches, batch_size, batch_interval)
+
     @staticmethod
     def scan_files(
         directories: List[str],
         min_size: int = 0,
         max_size: Optional[int] = None,
         extensions: Optional[List[str]] = None,
-        include_directories: bool = False
-    ) -> List[FileInfo]:
+        include_directories: bool = False,
+        workers: Optional[int] = None,
+        stats: Optional[ScanStats] = None,
+        top_n: Optional[int] = None,
+        use_index: bool = False,
+        force_rescan: bool = False,
+        dir_tree: Optional[DirTree] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        progress: Optional[Callable[[ScanProgress], None]] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        query: Union[str, FilterExpression, None] = None,
+        exclude: Optional[ExclusionRules] = None,
+        max_depth: Optional[int] = None,
+        same_filesystem: bool = False,
+        skip_reparse_points: bool = False,
+        processes: Optional[int] = None
+    ) -> ScanResult:
         """
-        Encontra arquivos com base em critérios de tamanho e extensão
+        Encontra arquivos com base em critérios de tamanho e extensão.
+        Retorna um ScanResult colunar, cujas linhas têm a interface de FileInfo
         
         Args:
             directories: Lista de diretórios para escanear
@@ -202,121 +392,264 @@ class SystemScanner:
             max_size: Tamanho máximo em bytes (None para ilimitado)
             extensions: Lista de extensões para filtrar (None para todas)
             include_directories: Se deve incluir diretórios nos resultados
+            workers: Número de threads do walker (None para o padrão)
+            stats: ScanStats opcional preenchido com threads usadas e diretórios/s
+            top_n: Mantém apenas os N maiores itens (None para todos)
+            use_index: Reaproveita o índice persistente para diretórios sem mudança de mtime
+            force_rescan: Ignora o índice e relê todo o disco (regravando o índice)
+            dir_tree: DirTree opcional preenchido no mesmo walk com os totais por pasta
+                (com include_directories, as pastas listadas recebem seu tamanho recursivo)
+            cancel_token: CancellationToken opcional para pausar ou interromper a busca
+                (cancelada, ela retorna o que foi encontrado até então e marca stats.cancelled)
+            progress: Callback opcional chamado periodicamente (de 0,25 em 0,25 s) com um ScanProgress
+            instrumentation: Instrumentation opcional que recebe o tempo de cada fase, contadores
+                e erros por errno (None não mede nada)
+            query: Expressão de filtro (ex.: 'size > 1GB and mtime < 90d and path !~ "node_modules"'),
+                em texto ou já compilada com compile_filter; levanta FilterSyntaxError se inválida.
+                Condições "path !~ ..." obrigatórias também evitam descer nas pastas excluídas
+            exclude: ExclusionRules opcional com as subárvores a ignorar (globs, regex e presets
+                como "system" e "dev"), podadas antes de descer nelas
+            max_depth: Níveis de subpastas percorridos abaixo de cada diretório (None para todos)
+            same_filesystem: Não desce em pastas montadas de outro volume
+            skip_reparse_points: Não segue junções e outros pontos de nova análise do Windows
+            processes: Com mais de um volume entre os diretórios, varre cada volume em um processo
+                próprio, até esse número de processos (None para um só processo). Sem efeito com
+                dir_tree ou instrumentation
         """
-        file_list = []
-        extensions_set = {ext.lower() for ext in extensions} if extensions else None
-        processed_dirs = set()
+        stats = stats if stats is not None else ScanStats()
 
-        for directory in directories:
-            # Normaliza o caminho para evitar duplicatas
-            norm_dir = os.path.normpath(directory)
-            if norm_dir in processed_dirs:
-                continue
-            processed_dirs.add(norm_dir)
+        walker = SystemScanner._make_walker(
+            min_size, max_size, extensions, include_directories, workers, use_index, force_rescan, dir_tree,
+            cancel_token=cancel_token, progress=progress, instrumentation=instrumentation, query=query,
+            exclude=exclude, max_depth=max_depth, same_filesystem=same_filesystem,
+            skip_reparse_points=skip_reparse_points, processes=processes, top_n=top_n
+        )
+        result = ScanResult()
 
-            try:
-                # Verifica se o diretório existe
-                if not os.path.isdir(norm_dir):
-                    logger.warning(f"Directory not found: {norm_dir}")
-                    continue
-
-                # Adiciona o próprio diretório se solicitado
-                if include_directories:
-                    dir_stat = os.stat(norm_dir)
-                    file_list.append(FileInfo(
-                        path=norm_dir,
-                        size=0,
-                        last_accessed=dir_stat.st_atime,
-                        last_modified=dir_stat.st_mtime,
-                        extension="",
-                        is_directory=True
-                    ))
-
-                # Percorre o diretório
-                for root, dirs, files in os.walk(norm_dir, onerror=lambda e: logger.warning(f"Error accessing {e.filename}: {e.strerror}")):
-                    # Processa arquivos
-                    for file in files:
-                        try:
-                            file_path = os.path.join(root, file)
-                            stat = os.stat(file_path)
-                            size = stat.st_size
-                            
-                            # Aplica filtros
-                            if size < min_size:
-                                continue
-                            if max_size and size > max_size:
-                                continue
-                            
-                            ext = os.path.splitext(file)[1].lower()
-                            if extensions_set and ext not in extensions_set:
-                                continue
-                            
-                            file_list.append(FileInfo(
-                                path=file_path,
-                                size=size,
-                                last_accessed=stat.st_atime,
-                                last_modified=stat.st_mtime,
-                                extension=ext
-                            ))
-                        except (PermissionError, OSError) as e:
-                            logger.debug(f"Error accessing file {file}: {e}")
-                            continue
-
-                    # Adiciona subdiretórios se solicitado
-                    if include_directories:
-                        for dir_name in dirs:
-                            try:
-                                dir_path = os.path.join(root, dir_name)
-                                dir_stat = os.stat(dir_path)
-                                file_list.append(FileInfo(
-                                    path=dir_path,
-                                    size=0,
-                                    last_accessed=dir_stat.st_atime,
-                                    last_modified=dir_stat.st_mtime,
-                                    extension="",
-                                    is_directory=True
-                                ))
-                            except (PermissionError, OSError) as e:
-                                logger.debug(f"Error accessing directory {dir_name}: {e}")
-                                continue
-
-            except Exception as e:
-                logger.error(f"Error scanning directory {norm_dir}: {e}")
-                continue
+        with profiling(instrumentation):
+            if top_n:
+                # Heap limitado a N itens durante o walk: memória O(N) e só os
+                # vencedores são armazenados. nsmallest já devolve a lista ordenada.
+                with phase(instrumentation, "walk"):
+                    rows = ((dirpath, row) for dirpath, batch in walker.walk(directories, stats) for row in batch)
+                    top = heapq.nsmallest(
+                        top_n, rows,
+                        key=lambda item: (-item[1][1], os.path.join(item[0], item[1][0]).lower())
+                    )
+                    for dirpath, row in top:
+                        result.add_rows(dirpath, (row,))
+            else:
+                with phase(instrumentation, "walk"):
+                    if isinstance(walker, ProcessWalker):
+                        # Concatena as colunas enviadas pelos processos, sem uma tupla por linha
+                        for batch in walker.walk_results(directories, stats):
+                            result.extend(batch)
+                    else:
+                        for dirpath, rows in walker.walk(directories, stats):
+                            if rows:
+                                result.add_rows(dirpath, rows)
+                if dir_tree is not None and include_directories:
+                    with phase(instrumentation, "directory_sizes"):
+                        result.set_directory_sizes(dir_tree.total_size)
+
+                # Ordena por tamanho (maiores primeiro) e depois por caminho
+                with phase(instrumentation, "sort"):
+                    result.sort()
+
+        if stats.cancelled:
+            logger.info(f"Scan cancelled, returning {len(result)} items found so far")
+        logger.info(
+            f"Scanned {stats.dirs_visited} directories in {stats.elapsed:.2f}s "
+            f"({stats.dirs_per_second:.0f} dirs/s, {stats.workers} workers, "
+            f"{stats.dirs_from_index} from index)"
+        )
+        return result
+
+    @staticmethod
+    def scan_directory_tree(
+        directories: List[str],
+        workers: Optional[int] = None,
+        stats: Optional[ScanStats] = None,
+        use_index: bool = False,
+        force_rescan: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+        progress: Optional[Callable[[ScanProgress], None]] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        exclude: Optional[ExclusionRules] = None,
+        same_filesystem: bool = False,
+        skip_reparse_points: bool = False
+    ) -> DirTree:
+        """
+        Calcula, em uma única passada, o tamanho total, a quantidade de arquivos
+        e o maior item de cada pasta (estilo du)
+        
+        Args:
+            directories: Lista de diretórios para escanear
+            workers: Número de threads do walker (None para o padrão)
+            stats: ScanStats opcional preenchido com threads usadas e diretórios/s
+            use_index: Reaproveita o índice persistente para diretórios sem mudança de mtime
+            force_rescan: Ignora o índice e relê todo o disco (regravando o índice)
+            cancel_token: CancellationToken opcional para pausar ou interromper a análise
+            progress: Callback opcional chamado periodicamente com um ScanProgress
+            instrumentation: Instrumentation opcional (como em scan_files)
+            exclude, same_filesystem, skip_reparse_points: Como em scan_files (as subárvores
+                ignoradas ficam fora dos totais)
+        """
+        stats = stats if stats is not None else ScanStats()
+        tree = DirTree()
+        walker = SystemScanner._make_walker(
+            0, None, None, False, workers, use_index, force_rescan, tree,
+            include_files=False, cancel_token=cancel_token, progress=progress, instrumentation=instrumentation,
+            exclude=exclude, same_filesystem=same_filesystem, skip_reparse_points=skip_reparse_points
+        )
+        with profiling(instrumentation), phase(instrumentation, "walk"):
+            for _ in walker.walk(directories, stats):
+                pass
+
+        logger.info(
+            f"Aggregated {len(tree)} directories ({stats.files_examined} files) in {stats.elapsed:.2f}s "
+            f"({stats.dirs_per_second:.0f} dirs/s, {stats.workers} workers, "
+            f"{stats.dirs_from_index} from index)"
+        )
+        return tree
+
+    @staticmethod
+    def watch_files(
+        directories: List[str],
+        callback: Callable[[ChangeSet], None],
+        min_size: int = 0,
+        max_size: Optional[int] = None,
+        extensions: Optional[List[str]] = None,
+        include_directories: bool = False,
+        workers: Optional[int] = None,
+        backend: Optional[str] = None,
+        debounce: float = 0.5,
+        query: Union[str, FilterExpression, None] = None,
+        exclude: Optional[ExclusionRules] = None,
+        max_depth: Optional[int] = None,
+        same_filesystem: bool = False,
+        skip_reparse_points: bool = False
+    ) -> FileWatcher:
+        """
+        Mantém o resultado de scan_files atualizado: observa as pastas e
+        entrega ao callback (na thread do watcher) um ChangeSet por lote de
+        alterações, com as linhas atuais das pastas afetadas
+
+        Args:
+            directories: Mesmos diretórios passados a scan_files
+            callback: Recebe cada ChangeSet (use ChangeSet.stale_rows para saber o que substituir)
+            min_size, max_size, extensions, include_directories, query, exclude, max_depth,
+                same_filesystem, skip_reparse_points: Mesmos filtros de scan_files
+            workers: Número de threads usadas para reler as pastas alteradas
+            backend: "inotify", "windows" ou "polling" (None escolhe pelo sistema)
+            debounce: Segundos sem novos eventos antes de entregar um lote
+        """
+        watcher = FileWatcher(
+            directories, callback,
+            scan_filter=SystemScanner._make_filter(
+                min_size, max_size, extensions, include_directories, query=query, exclude=exclude,
+                max_depth=max_depth, same_filesystem=same_filesystem, skip_reparse_points=skip_reparse_points
+            ),
+            workers=workers,
+            backend=backend,
+            debounce=debounce
+        )
+        watcher.start()
+        return watcher
+
+    @staticmethod
+    def get_hash_cache(path: Optional[str] = None) -> HashCache:
+        """Retorna o cache persistente de hashes de duplicatas (um por arquivo, reutilizado)"""
+        path = path or default_hash_cache_path()
+        if path not in SystemScanner._hash_caches:
+            SystemScanner._hash_caches[path] = HashCache(path)
+        return SystemScanner._hash_caches[path]
+
+    @staticmethod
+    def find_duplicates(
+        directories: List[str],
+        min_size: int = 1,
+        extensions: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        stats: Optional[DuplicateStats] = None,
+        use_cache: bool = True,
+        use_index: bool = False,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[DuplicateGroup]:
+        """
+        Procura arquivos duplicados: varre com scan_files e compara tamanho,
+        hash parcial e, só para quem ainda colide, hash completo
         
-        # Ordena por tamanho (maiores primeiro) e depois por caminho
-        file_list.sort(key=lambda x: (-x.size, x.path.lower()))
-        return file_list
+        Args:
+            directories: Lista de diretórios para escanear
+            min_size: Tamanho mínimo em bytes
+            extensions: Lista de extensões para filtrar (None para todas)
+            workers: Número de threads de varredura e de leitura (None para o padrão)
+            stats: DuplicateStats opcional preenchido com os bytes lidos e acertos de cache
+            use_cache: Reaproveita hashes de arquivos sem mudança de tamanho e mtime
+            use_index: Reaproveita o índice persistente na varredura
+            cancel_token: CancellationToken opcional para pausar ou interromper a busca
+        """
+        files = SystemScanner.scan_files(
+            directories, min_size=max(min_size, 1), extensions=extensions, workers=workers,
+            use_index=use_index, cancel_token=cancel_token
+        )
+        cache = SystemScanner.get_hash_cache() if use_cache else None
+        return find_duplicates(files, min_size, workers, cache, stats, cancel_token)
 
     @staticmethod
     def delete_file(file_path: str) -> bool:
         """Remove um arquivo ou diretório do sistema"""
+        return SystemScanner.delete_files([file_path], workers=1)[0].deleted
+
+    @staticmethod
+    def delete_files(
+        file_paths: List[str],
+        workers: int = DEFAULT_WORKERS,
+        progress: Optional[Callable[[DeleteProgress], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[DeleteResult]:
+        """
+        Remove arquivos e diretórios em paralelo, retornando um DeleteResult por
+        caminho (na ordem recebida). Sem privilégios de administrador, os que
+        falham por permissão são removidos juntos por um único processo elevado.
+        
+        Args:
+            file_paths: Caminhos a remover
+            workers: Remoções simultâneas
+            progress: Callback opcional chamado periodicamente com um DeleteProgress
+            cancel_token: CancellationToken opcional para pausar ou interromper a remoção
+        """
+        def elevate(denied: List[str]) -> List[DeleteResult]:
+            return SystemScanner._delete_elevated(denied, cancel_token)
+
+        results = delete_paths(file_paths, workers, progress, cancel_token, None if is_admin() else elevate)
+        deleted = sum(1 for result in results if result.deleted)
+        logger.info(f"Deleted {deleted}/{len(results)} paths")
+        return results
+
+    @staticmethod
+    def _delete_elevated(
+        file_paths: List[str], cancel_token: Optional[CancellationToken] = None
+    ) -> List[DeleteResult]:
+        """Remove os caminhos em um único processo elevado (main.py --delete-batch), esperando o resultado"""
+        batch_path, digest = write_batch_file(file_paths)
+        results_path = batch_path + ".json"
+        # No executável empacotado o próprio executável é o main.py
+        args = [] if getattr(sys, "frozen", False) else [os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")]
+        # O SHA-256 vai na linha de comando elevada, que outro processo do usuário não consegue alterar
+        args += ["--delete-batch", batch_path, digest, results_path]
+        params = " ".join(f'"{arg}"' for arg in args)
         try:
-            if os.path.isdir(file_path):
-                shutil.rmtree(file_path, ignore_errors=False)
-            else:
-                os.remove(file_path)
-            return True
-        except PermissionError:
-            # Tenta com elevação de privilégios
-            try:
-                if is_admin():
-                    if os.path.isdir(file_path):
-                        shutil.rmtree(file_path, ignore_errors=False)
-                    else:
-                        os.remove(file_path)
-                    return True
-                else:
-                    # Relança o script como administrador para deletar o arquivo/diretório
-                    params = f'"{sys.argv[0]}" --delete "{file_path}"'
-                    ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, params, None, 1)
-                    return True
-            except Exception as e:
-                logger.error(f"Failed to delete with admin rights: {e}")
-                return False
+            code = _shell32().ShellExecuteW(None, "runas", sys.executable, params, None, 0)
         except Exception as e:
-            logger.error(f"Failed to delete {file_path}: {e}")
-            return False
+            logger.error(f"Failed to start elevated delete: {e}")
+            code = 0
+        # ShellExecuteW retorna um valor > 32 quando o processo foi iniciado (UAC aceito)
+        if code <= 32:
+            remove_batch_files(batch_path, results_path)
+            return [DeleteResult(path, False, "elevação não concedida") for path in file_paths]
+        return wait_for_results(batch_path, results_path, file_paths, cancel_token=cancel_token)
 
     @staticmethod
     def is_admin() -> bool:
@@ -324,39 +657,22 @@ class SystemScanner:
         # Agora utiliza a função global is_admin()
         return is_admin()
 
+    @staticmethod
+    def get_volume_monitor() -> VolumeMonitor:
+        """Retorna o monitor de volumes compartilhado (criado na primeira chamada)"""
+        if SystemScanner._volume_monitor is None:
+            SystemScanner._volume_monitor = VolumeMonitor()
+        return SystemScanner._volume_monitor
+
+    @staticmethod
+    def list_volumes() -> List[str]:
+        """Volumes montados (letras de unidade no Windows)"""
+        return SystemScanner.get_volume_monitor().volumes()
+
     @staticmethod
     def get_disk_usage(path: str = "C:\\") -> Dict[str, float]:
-        """Retorna estatísticas de uso do disco com cache de 5 segundos"""
-        current_time = time.time()
-        
-        # Usa cache se disponível e não expirado
-        if path in SystemScanner._disk_cache:
-            cached_data, timestamp = SystemScanner._disk_cache[path]
-            if current_time - timestamp < 5:  # 5 segundos de cache
-                return cached_data
-        
-        try:
-            total, used, free = shutil.disk_usage(path)
-            result = {
-                "total": total,
-                "used": used,
-                "free": free,
-                "percent_used": (used / total) * 100 if total > 0 else 0,
-                "path": path
-            }
-            
-            # Atualiza cache
-            SystemScanner._disk_cache[path] = (result, current_time)
-            return result
-        except Exception as e:
-            logger.error(f"Error getting disk usage for {path}: {e}")
-            return {
-                "total": 0,
-                "used": 0,
-                "free": 0,
-                "percent_used": 0,
-                "path": path
-            }
+        """Retorna estatísticas de uso do disco (amostras reaproveitadas por 5 segundos)"""
+        return SystemScanner.get_volume_monitor().usage(path)
 
     @staticmethod
     def open_file_location(file_path: str) -> bool:
@@ -366,7 +682,7 @@ class SystemScanner:
                 # Abre o explorer como administrador e seleciona o arquivo
                 explorer_path = os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "explorer.exe")
                 args = f'/select,"{os.path.normpath(file_path)}"'
-                ctypes.windll.shell32.ShellExecuteW(None, "runas", explorer_path, args, None, 1)
+                _shell32().ShellExecuteW(None, "runas", explorer_path, args, None, 1)
                 return True
             return False
         except Exception as e:
@@ -3,12 +3,18 @@ import os
 import time
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QTabWidget, QMessageBox, QHeaderView,
-    QProgressBar, QGroupBox, QLineEdit, QFileDialog, QDoubleSpinBox, QApplication
+    QTableWidget, QTableWidgetItem, QTableView, QTreeView, QTabWidget, QMessageBox, QHeaderView,
+    QProgressBar, QGroupBox, QLineEdit, QFileDialog, QDoubleSpinBox, QSpinBox, QCheckBox, QApplication,
+    QFileIconProvider, QPlainTextEdit
 )
-from PySide6.QtCore import Qt, QThread, Signal, QSize, QTimer
-from PySide6.QtGui import QIcon, QColor, QPalette, QPixmap, QPainter
-from script import SystemScanner, FileInfo, ProgramInfo
+from PySide6.QtCore import Qt, QObject, QThread, Signal, QSize, QTimer, QFileInfo, QPersistentModelIndex
+from PySide6.QtGui import QIcon, QColor, QPalette, QPixmap, QPainter, QFontDatabase
+from script import (
+    SystemScanner, FileInfo, ProgramInfo, ScanStats, ScanResult, ScanProgress, DirTree, CancellationToken,
+    DeleteProgress, DeleteResult, Instrumentation, phase, profiling, FilterSyntaxError, compile_filter,
+    ExclusionRules
+)
+from ui_models import FilesTableModel, DirTreeModel, format_duration, format_size
 
 def white_icon_from_theme(name, fallback=None):
     """
@@ -56,6 +62,9 @@ def deep_blue_icon_from_theme(name, fallback=None):
 
 class ScannerThread(QThread):
     scan_complete = Signal(object)
+    scan_batch = Signal(object)
+    scan_progress = Signal(object)
+    scan_cancelled = Signal(object)
     scan_error = Signal(str)
 
     def __init__(self, scan_type, *args, **kwargs):
@@ -63,17 +72,109 @@ class ScannerThread(QThread):
         self.scan_type = scan_type
         self.args = args
         self.kwargs = kwargs
+        self.stats = ScanStats()
+        # Resultado da busca incremental, compartilhado com o modelo da tabela
+        self.result = ScanResult()
+        self.cancel_token = CancellationToken()
+        # Diagnóstico opcional (painel Diagnóstico); None não mede nada
+        self.instrumentation = None
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+    def pause(self):
+        self.cancel_token.pause()
+
+    def resume(self):
+        self.cancel_token.resume()
 
     def run(self):
         try:
+            token = self.cancel_token
+            instrumentation = self.instrumentation
             if self.scan_type == "programs":
-                result = SystemScanner.get_installed_programs()
+                with profiling(instrumentation), phase(instrumentation, "registry"):
+                    result = SystemScanner.get_installed_programs()
+            elif self.scan_type == "files" and self.kwargs.get("top_n"):
+                # No modo "maiores N" só o resultado final interessa
+                result = SystemScanner.scan_files(
+                    *self.args, stats=self.stats, cancel_token=token, progress=self.scan_progress.emit,
+                    instrumentation=instrumentation, **self.kwargs
+                )
             elif self.scan_type == "files":
-                result = SystemScanner.scan_files(*self.args, **self.kwargs)
-            self.scan_complete.emit(result)
+                # Encaminha os lotes parciais enquanto a busca ainda está em andamento.
+                # O lote só é emitido depois de incorporado a self.result, então
+                # as linhas anunciadas já podem ser lidas pela thread da interface
+                result = self.result
+                with profiling(instrumentation):
+                    with phase(instrumentation, "walk"):
+                        for batch in SystemScanner.iter_scan_files(
+                            *self.args, stats=self.stats, cancel_token=token, progress=self.scan_progress.emit,
+                            instrumentation=instrumentation, **self.kwargs
+                        ):
+                            result.extend(batch)
+                            self.scan_batch.emit(batch)
+                    with phase(instrumentation, "sort"):
+                        result.sort()
+            elif self.scan_type == "folders":
+                result = SystemScanner.scan_directory_tree(
+                    *self.args, stats=self.stats, cancel_token=token, progress=self.scan_progress.emit,
+                    instrumentation=instrumentation, **self.kwargs
+                )
+            if token.cancelled:
+                # Entrega o que já foi encontrado
+                self.scan_cancelled.emit(result)
+            else:
+                self.scan_complete.emit(result)
         except Exception as e:
             self.scan_error.emit(str(e))
 
+class IconThread(QThread):
+    """Resolve os ícones dos programas depois que a lista já foi exibida"""
+    icon_resolved = Signal(int, str)
+
+    def __init__(self, programs: List[ProgramInfo]):
+        super().__init__()
+        self.programs = programs
+        self.cancel_token = CancellationToken()
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+    def run(self):
+        def on_resolved(index, icon_path):
+            if icon_path:
+                self.icon_resolved.emit(index, icon_path)
+
+        SystemScanner.resolve_program_icons(self.programs, on_resolved, self.cancel_token)
+
+class DeleteThread(QThread):
+    """Remove os arquivos selecionados fora da thread da interface"""
+    delete_progress = Signal(object)
+    delete_complete = Signal(object)
+    delete_error = Signal(str)
+
+    def __init__(self, file_paths: List[str]):
+        super().__init__()
+        self.file_paths = file_paths
+        self.cancel_token = CancellationToken()
+
+    def cancel(self):
+        self.cancel_token.cancel()
+
+    def run(self):
+        try:
+            results = SystemScanner.delete_files(
+                self.file_paths, progress=self.delete_progress.emit, cancel_token=self.cancel_token
+            )
+            self.delete_complete.emit(results)
+        except Exception as e:
+            self.delete_error.emit(str(e))
+
+class FileWatchBridge(QObject):
+    """Leva os lotes do FileWatcher (entregues na thread dele) para a thread da interface"""
+    changes_ready = Signal(object)
+
 class FileScannerWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -88,11 +189,11 @@ class FileScannerWindow(QMainWindow):
             QGroupBox::title {
                 subcontrol-origin: margin; left: 10px; padding: 0 5px; color: #000000; font-weight: bold;
             }
-            QTableWidget {
+            QTableWidget, QTableView, QTreeView {
                 border: 1px solid #d1d5db; background-color: white; border-radius: 4px; gridline-color: #e5e7eb;
                 selection-background-color: #1e3a8a; selection-color: white; color: #000000;
             }
-            QTableWidget::item:selected {
+            QTableWidget::item:selected, QTableView::item:selected, QTreeView::item:selected {
                 background-color: #2563eb !important; color: #fff !important;
             }
             QHeaderView::section {
@@ -134,19 +235,34 @@ class FileScannerWindow(QMainWindow):
                 border: 1px solid #d1d5db; border-radius: 4px; text-align: center; background: white; color: #000000;
             }
             QProgressBar::chunk { background-color: #1e3a8a; width: 10px; }
-            QLineEdit, QDoubleSpinBox {
+            QLineEdit, QDoubleSpinBox, QSpinBox {
                 border: 1px solid #d1d5db; border-radius: 4px; padding: 5px; background: white; min-height: 25px; color: #000000;
             }
-            QLineEdit:focus, QDoubleSpinBox:focus { border: 1px solid #1e3a8a; }
-            QLabel { color: #000000; }
+            QLineEdit:focus, QDoubleSpinBox:focus, QSpinBox:focus { border: 1px solid #1e3a8a; }
+            QLabel, QCheckBox { color: #000000; }
             .status-label {
                 color: #000000; font-style: italic; padding: 5px; border-top: 1px solid #e5e7eb; background-color: #f9fafb;
             }
             QPushButton#browse-btn { padding: 5px; min-width: 0; }
         """)
+        # Threads canceladas que ainda não terminaram (destruir uma QThread em
+        # execução encerra o programa)
+        self.stopping_threads = set()
+        self.scanner_thread = None
+        self.programs_thread = None
+        self.icon_thread = None
+        # Itens da coluna de nome de cada programa (acompanham a linha ao ordenar)
+        self.program_items = []
+        self.icon_provider = QFileIconProvider()
+        self.folders_thread = None
+        self.delete_thread = None
+        self.file_watcher = None
+        self.watch_bridge = None
+        # Diagnóstico da última operação medida
+        self.last_instrumentation = None
         self.init_ui()
-        self.show_admin_warning()
-        self.show_developer_mode_warning()
+        # Abas adiadas e avisos só depois que a janela aparecer
+        QTimer.singleShot(0, self.finish_startup)
 
     def setup_palette(self):
         palette = self.palette()
@@ -240,14 +356,46 @@ class FileScannerWindow(QMainWindow):
         self.init_programs_tab()
         self.tabs.addTab(self.programs_tab, " Programas ")
 
+        # As demais abas são montadas com a janela já visível (ou ao serem abertas)
         self.files_tab = QWidget()
-        self.init_files_tab()
         self.tabs.addTab(self.files_tab, " Scanner de Arquivos ")
 
+        self.folders_tab = QWidget()
+        self.tabs.addTab(self.folders_tab, " Pastas ")
+
+        self.disks_tab = QWidget()
+        self.tabs.addTab(self.disks_tab, " Discos ")
+
+        self.diagnostics_tab = QWidget()
+        self.tabs.addTab(self.diagnostics_tab, " Diagnóstico ")
+
+        self.pending_tabs = {
+            self.files_tab: self.init_files_tab,
+            self.folders_tab: self.init_folders_tab,
+            self.disks_tab: self.init_disks_tab,
+            self.diagnostics_tab: self.init_diagnostics_tab,
+        }
+        self.tabs.currentChanged.connect(self.ensure_tab_ready)
+
         main_layout.addWidget(self.tabs)
         main_widget.setLayout(main_layout)
         self.setCentralWidget(main_widget)
 
+    def ensure_tab_ready(self, index: int):
+        """Monta a aba do índice se ela ainda estiver pendente"""
+        init_tab = self.pending_tabs.pop(self.tabs.widget(index), None)
+        if init_tab is not None:
+            init_tab()
+
+    def build_pending_tabs(self):
+        for index in range(self.tabs.count()):
+            self.ensure_tab_ready(index)
+
+    def finish_startup(self):
+        self.build_pending_tabs()
+        self.show_admin_warning()
+        self.show_developer_mode_warning()
+
     def init_programs_tab(self):
         layout = QVBoxLayout()
         layout.setContentsMargins(10, 10, 10, 10)
@@ -373,6 +521,107 @@ class FileScannerWindow(QMainWindow):
         ext_layout.addWidget(self.ext_input)
 
         settings_layout.addLayout(ext_layout)
+
+        query_layout = QHBoxLayout()
+        query_layout.setSpacing(10)
+        query_layout.addWidget(QLabel("Filtro:"))
+
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText('Ex: size > 1GB and mtime < 90d and path !~ "node_modules"')
+        self.query_input.setToolTip(
+            "Campos: size, name, ext, path, mtime, atime. Operadores: > >= < <= == != "
+            "~ (regex) !~ in, combinados com and, or, not e parênteses.\n"
+            "Tamanhos em KB/MB/GB/TB; datas como AAAA-MM-DD ou idades (12h, 90d, 1y).\n"
+            "Pastas que casam com uma condição path !~ não são percorridas."
+        )
+        self.query_input.returnPressed.connect(self.scan_files)
+        query_layout.addWidget(self.query_input)
+
+        settings_layout.addLayout(query_layout)
+
+        exclude_layout = QHBoxLayout()
+        exclude_layout.setSpacing(10)
+        exclude_layout.addWidget(QLabel("Ignorar pastas:"))
+
+        self.exclude_input = QLineEdit()
+        self.exclude_input.setPlaceholderText("Ex: node_modules, .git, AppData/Local/Temp")
+        self.exclude_input.setToolTip(
+            "Globs separados por vírgula. Sem barra comparam o nome da pasta; com barra, o fim do caminho.\n"
+            "As pastas ignoradas não são lidas (nem suas subpastas)."
+        )
+        exclude_layout.addWidget(self.exclude_input)
+
+        self.exclude_system_input = QCheckBox("Pastas do sistema")
+        self.exclude_system_input.setToolTip("Lixeira, System Volume Information, WinSxS, DriverStore e similares")
+        self.exclude_system_input.setChecked(True)
+        exclude_layout.addWidget(self.exclude_system_input)
+
+        self.exclude_dev_input = QCheckBox("Pastas de desenvolvimento")
+        self.exclude_dev_input.setToolTip(".git, node_modules, __pycache__, .venv e similares")
+        exclude_layout.addWidget(self.exclude_dev_input)
+
+        settings_layout.addLayout(exclude_layout)
+
+        limits_layout = QHBoxLayout()
+        limits_layout.setSpacing(10)
+        limits_layout.addWidget(QLabel("Profundidade máxima:"))
+
+        self.max_depth_input = QSpinBox()
+        self.max_depth_input.setRange(-1, 256)
+        self.max_depth_input.setValue(-1)
+        self.max_depth_input.setSpecialValueText("Sem limite")
+        self.max_depth_input.setToolTip("Níveis de subpastas percorridos (0 = só os arquivos das pastas informadas)")
+        limits_layout.addWidget(self.max_depth_input)
+
+        self.no_reparse_input = QCheckBox("Não seguir junções nem outros volumes")
+        self.no_reparse_input.setToolTip(
+            "Não desce em junções, pontos de montagem e pastas de outro disco "
+            "(evita laços e contar o mesmo arquivo duas vezes)"
+        )
+        self.no_reparse_input.setChecked(True)
+        limits_layout.addWidget(self.no_reparse_input)
+
+        self.processes_input = QCheckBox("Um processo por disco")
+        self.processes_input.setToolTip(
+            "Com pastas em discos diferentes, varre cada disco em um processo próprio "
+            "(desligado enquanto o Diagnóstico estiver coletando)"
+        )
+        self.processes_input.setChecked(True)
+        limits_layout.addWidget(self.processes_input)
+        limits_layout.addStretch()
+
+        settings_layout.addLayout(limits_layout)
+
+        top_layout = QHBoxLayout()
+        top_layout.setSpacing(10)
+        top_layout.addWidget(QLabel("Mostrar os maiores:"))
+
+        self.top_n_input = QSpinBox()
+        self.top_n_input.setRange(0, 1000000)
+        self.top_n_input.setValue(0)
+        self.top_n_input.setSingleStep(100)
+        self.top_n_input.setSpecialValueText("Todos")
+        self.top_n_input.setSuffix(" arquivos")
+        top_layout.addWidget(self.top_n_input)
+        top_layout.addStretch()
+
+        # A busca reaproveita o índice de varreduras anteriores; esta opção relê todo o disco
+        self.force_rescan_input = QCheckBox("Forçar varredura completa")
+        self.force_rescan_input.setToolTip(
+            "Ignora o índice salvo e relê todos os diretórios "
+            "(necessário para detectar arquivos que mudaram de tamanho)"
+        )
+        top_layout.addWidget(self.force_rescan_input)
+
+        self.watch_files_input = QCheckBox("Monitorar alterações")
+        self.watch_files_input.setToolTip(
+            "Mantém a lista atualizada com as mudanças no disco depois da busca "
+            "(não vale para \"Mostrar os maiores\")"
+        )
+        self.watch_files_input.toggled.connect(self.toggle_file_watch)
+        top_layout.addWidget(self.watch_files_input)
+
+        settings_layout.addLayout(top_layout)
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
 
@@ -385,6 +634,21 @@ class FileScannerWindow(QMainWindow):
         self.scan_files_btn.clicked.connect(self.scan_files)
         btn_layout.addWidget(self.scan_files_btn)
 
+        self.pause_scan_btn = QPushButton("Pausar")
+        self.pause_scan_btn.setIcon(deep_blue_icon_from_theme("media-playback-pause"))
+        self.pause_scan_btn.setCheckable(True)
+        self.pause_scan_btn.toggled.connect(self.toggle_pause_scan)
+        self.pause_scan_btn.setEnabled(False)
+        self.pause_scan_btn.setProperty("class", "secondary")
+        btn_layout.addWidget(self.pause_scan_btn)
+
+        self.stop_scan_btn = QPushButton("Parar")
+        self.stop_scan_btn.setIcon(deep_blue_icon_from_theme("process-stop"))
+        self.stop_scan_btn.clicked.connect(self.stop_scan)
+        self.stop_scan_btn.setEnabled(False)
+        self.stop_scan_btn.setProperty("class", "secondary")
+        btn_layout.addWidget(self.stop_scan_btn)
+
         self.delete_file_btn = QPushButton("Excluir Selecionados")
         self.delete_file_btn.setIcon(deep_blue_icon_from_theme("edit-delete"))
         self.delete_file_btn.setObjectName("delete-btn")
@@ -404,15 +668,18 @@ class FileScannerWindow(QMainWindow):
         btn_layout.addStretch()
         layout.addLayout(btn_layout)
 
-        self.files_table = QTableWidget()
-        self.files_table.setColumnCount(5)
-        self.files_table.setHorizontalHeaderLabels(["Arquivo", "Tamanho", "Extensão", "Modificado", "Localização"])
+        self.files_model = FilesTableModel(self)
+        self.files_table = QTableView()
+        self.files_table.setModel(self.files_model)
         self.files_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
-        self.files_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.files_table.setSelectionMode(QTableWidget.MultiSelection)
-        self.files_table.setSortingEnabled(True)
-        self.files_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.files_table.setSelectionBehavior(QTableView.SelectRows)
+        self.files_table.setSelectionMode(QTableView.MultiSelection)
+        self.files_table.setEditTriggers(QTableView.NoEditTriggers)
         self.files_table.verticalHeader().setVisible(False)
+        # Altura fixa de linha: a view não precisa medir cada linha
+        self.files_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        # Ordem padrão do scanner: maiores primeiro
+        self.files_table.horizontalHeader().setSortIndicator(1, Qt.DescendingOrder)
         layout.addWidget(self.files_table)
 
         self.files_status_bar = QLabel("Pronto")
@@ -426,7 +693,257 @@ class FileScannerWindow(QMainWindow):
         self.files_tab.setLayout(layout)
 
         # Visual feedback for row selection in files table
-        self.files_table.itemSelectionChanged.connect(self.on_file_selected)
+        self.files_table.selectionModel().selectionChanged.connect(self.on_file_selected)
+
+    def init_folders_tab(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(15)
+
+        dirs_layout = QHBoxLayout()
+        dirs_layout.setSpacing(10)
+        dirs_layout.addWidget(QLabel("Diretórios:"))
+
+        self.folders_dirs_input = QLineEdit()
+        self.folders_dirs_input.setPlaceholderText("C:\\\\, D:\\\\")
+        self.folders_dirs_input.setText("C:\\")
+        dirs_layout.addWidget(self.folders_dirs_input)
+        layout.addLayout(dirs_layout)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(10)
+
+        self.scan_folders_btn = QPushButton("Analisar Pastas")
+        self.scan_folders_btn.setIcon(white_icon_from_theme("system-search"))
+        self.scan_folders_btn.clicked.connect(self.scan_folders)
+        btn_layout.addWidget(self.scan_folders_btn)
+
+        self.stop_folders_btn = QPushButton("Parar")
+        self.stop_folders_btn.setIcon(deep_blue_icon_from_theme("process-stop"))
+        self.stop_folders_btn.clicked.connect(self.stop_folders_scan)
+        self.stop_folders_btn.setEnabled(False)
+        self.stop_folders_btn.setProperty("class", "secondary")
+        btn_layout.addWidget(self.stop_folders_btn)
+
+        self.open_dir_btn = QPushButton("Abrir Localização")
+        self.open_dir_btn.setIcon(deep_blue_icon_from_theme("folder-open"))
+        self.open_dir_btn.setObjectName("open-folder-btn")
+        self.open_dir_btn.clicked.connect(self.open_folder_location)
+        self.open_dir_btn.setEnabled(False)
+        self.open_dir_btn.setProperty("class", "secondary")
+        btn_layout.addWidget(self.open_dir_btn)
+
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+
+        # Árvore de pastas por tamanho total: cada nível é ordenado ao ser expandido
+        self.folders_model = DirTreeModel(self)
+        self.folders_tree = QTreeView()
+        self.folders_tree.setModel(self.folders_model)
+        self.folders_tree.setUniformRowHeights(True)
+        self.folders_tree.setEditTriggers(QTreeView.NoEditTriggers)
+        self.folders_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.folders_tree)
+
+        self.folders_status_bar = QLabel("Pronto")
+        self.folders_status_bar.setProperty("class", "status-label")
+        layout.addWidget(self.folders_status_bar)
+
+        self.folders_progress_bar = QProgressBar()
+        self.folders_progress_bar.setVisible(False)
+        layout.addWidget(self.folders_progress_bar)
+
+        self.folders_tab.setLayout(layout)
+
+    def init_disks_tab(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(15)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(10)
+
+        self.refresh_disks_btn = QPushButton("Atualizar")
+        self.refresh_disks_btn.setIcon(white_icon_from_theme("view-refresh"))
+        self.refresh_disks_btn.clicked.connect(self.refresh_disks)
+        btn_layout.addWidget(self.refresh_disks_btn)
+
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+
+        self.disks_table = QTableWidget()
+        self.disks_table.setColumnCount(7)
+        self.disks_table.setHorizontalHeaderLabels(["Volume", "Total", "Usado", "Livre", "% Usado", "Tendência", "Cheio em"])
+        self.disks_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.disks_table.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
+        self.disks_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.disks_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.disks_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.disks_table)
+
+        self.disks_status_bar = QLabel("Pronto")
+        self.disks_status_bar.setProperty("class", "status-label")
+        layout.addWidget(self.disks_status_bar)
+
+        self.disks_tab.setLayout(layout)
+
+        # A thread do monitor consulta os discos; o timer só lê as amostras já feitas
+        self.volume_monitor = SystemScanner.get_volume_monitor()
+        self.volume_monitor.start()
+        self.disks_timer = QTimer(self)
+        self.disks_timer.timeout.connect(self.display_disks)
+        self.disks_timer.start(2000)
+        QTimer.singleShot(200, self.display_disks)
+
+    def init_diagnostics_tab(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(15)
+
+        options_group = QGroupBox("Coleta")
+        options_layout = QHBoxLayout()
+        options_layout.setSpacing(10)
+
+        self.diagnostics_input = QCheckBox("Medir as próximas buscas")
+        self.diagnostics_input.setToolTip("Tempo por fase, contadores e erros por código (custo desprezível)")
+        options_layout.addWidget(self.diagnostics_input)
+
+        self.profile_input = QCheckBox("Perfil (cProfile)")
+        self.profile_input.setToolTip(
+            "Perfila a busca com cProfile, incluindo as threads do walker (deixa a busca mais lenta). "
+            "Fica desligado se outro perfilador (ex.: um depurador) já estiver ativo"
+        )
+        self.profile_input.setEnabled(False)
+        options_layout.addWidget(self.profile_input)
+
+        self.trace_input = QCheckBox("Trace")
+        self.trace_input.setToolTip("Grava cada intervalo medido para abrir no chrome://tracing ou Perfetto")
+        self.trace_input.setEnabled(False)
+        options_layout.addWidget(self.trace_input)
+
+        self.diagnostics_input.toggled.connect(self.profile_input.setEnabled)
+        self.diagnostics_input.toggled.connect(self.trace_input.setEnabled)
+        options_layout.addStretch()
+        options_group.setLayout(options_layout)
+        layout.addWidget(options_group)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(10)
+
+        self.export_diagnostics_btn = QPushButton("Exportar JSON")
+        self.export_diagnostics_btn.clicked.connect(self.export_diagnostics)
+        self.export_diagnostics_btn.setEnabled(False)
+        btn_layout.addWidget(self.export_diagnostics_btn)
+
+        self.export_trace_btn = QPushButton("Exportar Trace")
+        self.export_trace_btn.clicked.connect(self.export_trace)
+        self.export_trace_btn.setEnabled(False)
+        self.export_trace_btn.setProperty("class", "secondary")
+        btn_layout.addWidget(self.export_trace_btn)
+
+        btn_layout.addStretch()
+        layout.addLayout(btn_layout)
+
+        self.diagnostics_text = QPlainTextEdit()
+        self.diagnostics_text.setReadOnly(True)
+        self.diagnostics_text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.diagnostics_text.setPlaceholderText("Marque \"Medir as próximas buscas\" e execute uma busca.")
+        layout.addWidget(self.diagnostics_text)
+
+        self.diagnostics_status_bar = QLabel("Pronto")
+        self.diagnostics_status_bar.setProperty("class", "status-label")
+        layout.addWidget(self.diagnostics_status_bar)
+
+        self.diagnostics_tab.setLayout(layout)
+
+    def new_instrumentation(self):
+        """Instrumentation para a próxima busca, ou None se a coleta estiver desligada"""
+        if self.diagnostics_tab in self.pending_tabs or not self.diagnostics_input.isChecked():
+            return None
+        return Instrumentation(profile=self.profile_input.isChecked(), trace=self.trace_input.isChecked())
+
+    def show_diagnostics(self, thread, title: str):
+        instrumentation = thread.instrumentation if thread is not None else None
+        if instrumentation is None:
+            return
+        self.last_instrumentation = instrumentation
+        stats = thread.stats
+        if stats.dirs_visited:
+            title = (f"{title} - {stats.elapsed:.2f}s, {stats.workers} threads, {stats.dirs_visited} pastas, "
+                     f"{stats.files_examined} arquivos")
+        text = f"{title}\n\n{instrumentation.summary()}"
+        report = instrumentation.profile_report(limit=25)
+        if report:
+            text += f"\n\nPerfil (cProfile, todas as threads):\n{report}"
+        elif instrumentation.profile_error:
+            text += f"\n\nPerfil não coletado: {instrumentation.profile_error}"
+        self.diagnostics_text.setPlainText(text)
+        self.export_diagnostics_btn.setEnabled(True)
+        self.export_trace_btn.setEnabled(instrumentation.trace)
+        self.diagnostics_status_bar.setText(f"Diagnóstico coletado às {time.strftime('%H:%M:%S')}")
+
+    def export_diagnostics(self):
+        if self.last_instrumentation is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar diagnóstico", "coloeus-diagnostico.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.last_instrumentation.export_json(path)
+            self.diagnostics_status_bar.setText(f"Diagnóstico exportado para {path}")
+        except OSError as e:
+            self.show_error(str(e))
+
+    def export_trace(self):
+        if self.last_instrumentation is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar trace", "coloeus-trace.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            self.last_instrumentation.export_trace(path)
+            self.diagnostics_status_bar.setText(f"Trace exportado para {path}")
+        except OSError as e:
+            self.show_error(str(e))
+
+    def refresh_disks(self):
+        self.volume_monitor.refresh()
+        self.disks_status_bar.setText("Atualizando...")
+        QTimer.singleShot(500, self.display_disks)
+
+    def display_disks(self):
+        statuses = self.volume_monitor.statuses()
+        self.disks_table.setRowCount(len(statuses))
+        for row, status in enumerate(statuses):
+            if status.growth_rate is None:
+                trend = "-"
+            else:
+                sign = "+" if status.growth_rate >= 0 else "-"
+                trend = f"{sign}{format_size(int(abs(status.growth_rate) * 3600))}/h"
+            eta = format_duration(status.seconds_to_full) if status.seconds_to_full is not None else "-"
+            values = [status.path, format_size(status.total), format_size(status.used), format_size(status.free)]
+            for column, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.disks_table.setItem(row, column, item)
+
+            bar = self.disks_table.cellWidget(row, 4)
+            if bar is None:
+                bar = QProgressBar()
+                bar.setRange(0, 1000)
+                self.disks_table.setCellWidget(row, 4, bar)
+            bar.setValue(int(status.percent_used * 10))
+            bar.setFormat(f"{status.percent_used:.1f}%")
+
+            self.disks_table.setItem(row, 5, QTableWidgetItem(trend))
+            self.disks_table.setItem(row, 6, QTableWidgetItem(eta))
+        if statuses:
+            sampled_at = max(status.sampled_at for status in statuses)
+            self.disks_status_bar.setText(
+                f"{len(statuses)} volumes - atualizado às {time.strftime('%H:%M:%S', time.localtime(sampled_at))} "
+                f"(tendência sobre as últimas amostras)"
+            )
 
     def adjust_spinbox(self, spinbox, delta):
         value = spinbox.value() + delta
@@ -437,7 +954,7 @@ class FileScannerWindow(QMainWindow):
         spinbox.setValue(value)
 
     def on_file_selected(self):
-        selected_rows = set(index.row() for index in self.files_table.selectedIndexes())
+        selected_rows = self.files_table.selectionModel().selectedRows()
         # Visual feedback: highlight row (already handled by stylesheet), show notification
         if selected_rows:
             self.visual_feedback(f"{len(selected_rows)} arquivo(s) selecionado(s)", success=True)
@@ -464,25 +981,69 @@ class FileScannerWindow(QMainWindow):
         self.programs_table.setRowCount(0)
         self.status_bar.setText("Escaneando programas instalados...")
         self.status_bar.setStyleSheet("color: #1e3a8a;")
-        self.scanner_thread = ScannerThread("programs")
-        self.scanner_thread.scan_complete.connect(self.display_programs)
-        self.scanner_thread.scan_error.connect(self.show_error)
-        self.scanner_thread.start()
+        # Thread própria: a leitura do registro não concorre com a busca de arquivos
+        self.cancel_thread(self.programs_thread)
+        self.programs_thread = ScannerThread("programs")
+        self.programs_thread.instrumentation = self.new_instrumentation()
+        self.programs_thread.scan_complete.connect(self.display_programs)
+        self.programs_thread.scan_error.connect(self.show_error)
+        self.programs_thread.start()
 
     def display_programs(self, programs: List[ProgramInfo]):
-        self.programs_table.setRowCount(len(programs))
-        for row, program in enumerate(programs):
-            self.programs_table.setItem(row, 0, QTableWidgetItem(program.name))
-            self.programs_table.setItem(row, 1, QTableWidgetItem(program.version))
-            self.programs_table.setItem(row, 2, QTableWidgetItem(str(program.size // 1024)))
-            self.programs_table.setItem(row, 3, QTableWidgetItem(program.publisher or "N/A"))
-            self.programs_table.setItem(row, 4, QTableWidgetItem(program.install_location or "N/A"))
+        self.cancel_thread(self.icon_thread)
+        self.program_items = []
+        thread = self.sender() if isinstance(self.sender(), ScannerThread) else None
+        with phase(thread.instrumentation if thread is not None else None, "populate_table"):
+            self.programs_table.setRowCount(len(programs))
+            for row, program in enumerate(programs):
+                name_item = QTableWidgetItem(program.name)
+                self.program_items.append(name_item)
+                self.programs_table.setItem(row, 0, name_item)
+                self.programs_table.setItem(row, 1, QTableWidgetItem(program.version))
+                self.programs_table.setItem(row, 2, QTableWidgetItem(str(program.size // 1024)))
+                self.programs_table.setItem(row, 3, QTableWidgetItem(program.publisher or "N/A"))
+                self.programs_table.setItem(row, 4, QTableWidgetItem(program.install_location or "N/A"))
         self.uninstall_btn.setEnabled(len(programs) > 0)
         self.status_bar.setText(f"Encontrados {len(programs)} programas")
         self.visual_feedback("Programas listados com sucesso!", success=True)
+        if thread is not None and thread.instrumentation is not None:
+            thread.instrumentation.count("programs", len(programs))
+        self.show_diagnostics(thread, "Programas instalados")
+
+        # Ícones são preenchidos aos poucos, sem atrasar a lista
+        self.icon_thread = IconThread(programs)
+        self.icon_thread.icon_resolved.connect(self.set_program_icon)
+        self.icon_thread.start()
+
+    def set_program_icon(self, index: int, icon_path: str):
+        if self.sender() is not self.icon_thread:
+            return
+        self.program_items[index].setIcon(self.icon_provider.icon(QFileInfo(icon_path)))
+
+    def cancel_thread(self, thread):
+        """Cancela uma busca em andamento sem bloquear a interface"""
+        if thread is None or not thread.isRunning():
+            return
+        thread.cancel()
+        self.stopping_threads.add(thread)
+        thread.finished.connect(lambda: self.stopping_threads.discard(thread))
 
     def scan_files(self):
-        self.files_table.setRowCount(0)
+        query = None
+        if self.query_input.text().strip():
+            try:
+                query = compile_filter(self.query_input.text())
+            except FilterSyntaxError as e:
+                # Mantém a busca atual e aponta o erro no próprio campo
+                self.files_status_bar.setText(f"Filtro inválido: {e}")
+                self.files_status_bar.setStyleSheet("color: #b91c1c;")
+                self.query_input.setFocus()
+                self.query_input.setCursorPosition(e.position)
+                return
+        # Uma nova busca substitui a que estiver em andamento
+        self.cancel_thread(self.scanner_thread)
+        self.stop_file_watch()
+        self.files_table.setSortingEnabled(False)
         self.files_status_bar.setText("Preparando busca de arquivos...")
         self.files_status_bar.setStyleSheet("color: #1e3a8a;")
         self.files_progress_bar.setVisible(True)
@@ -494,45 +1055,249 @@ class FileScannerWindow(QMainWindow):
         if self.ext_input.text().strip():
             extensions = [ext.strip().lower() for ext in self.ext_input.text().split(",")]
             extensions = [ext if ext.startswith(".") else f".{ext}" for ext in extensions]
-        self.scanner_thread = ScannerThread("files", directories, min_size, max_size, extensions)
+        # top_n só é repassado quando definido (a busca incremental não o aceita)
+        options = {"top_n": self.top_n_input.value()} if self.top_n_input.value() else {}
+        options["use_index"] = True
+        options["force_rescan"] = self.force_rescan_input.isChecked()
+        options["query"] = query
+        options["processes"] = os.cpu_count() if self.processes_input.isChecked() else None
+        options.update(self.exclusion_options())
+        self.scanner_thread = ScannerThread("files", directories, min_size, max_size, extensions, **options)
+        self.scanner_thread.instrumentation = self.new_instrumentation()
+        self.files_model.set_result(self.scanner_thread.result, available=0)
+        self.scanner_thread.scan_batch.connect(self.append_files)
+        self.scanner_thread.scan_progress.connect(self.show_files_progress)
         self.scanner_thread.scan_complete.connect(self.display_files)
+        self.scanner_thread.scan_cancelled.connect(self.files_scan_cancelled)
         self.scanner_thread.scan_error.connect(self.show_error)
         self.scanner_thread.start()
+        self.set_scan_controls(running=True)
+
+    def exclusion_options(self) -> dict:
+        """Exclusões, profundidade e limites de volume escolhidos na aba de arquivos"""
+        presets = []
+        if self.exclude_system_input.isChecked():
+            presets.append("system")
+        if self.exclude_dev_input.isChecked():
+            presets.append("dev")
+        globs = [glob.strip() for glob in self.exclude_input.text().split(",") if glob.strip()]
+        no_reparse = self.no_reparse_input.isChecked()
+        return {
+            "exclude": ExclusionRules(globs, presets=presets),
+            "max_depth": self.max_depth_input.value() if self.max_depth_input.value() >= 0 else None,
+            "same_filesystem": no_reparse,
+            "skip_reparse_points": no_reparse,
+        }
+
+    def set_scan_controls(self, running: bool):
+        # O resultado exibido não pode ser alterado enquanto a busca o preenche
+        if running:
+            self.delete_file_btn.setEnabled(False)
+        self.stop_scan_btn.setEnabled(running)
+        self.pause_scan_btn.setEnabled(running)
+        self.pause_scan_btn.blockSignals(True)
+        self.pause_scan_btn.setChecked(False)
+        self.pause_scan_btn.setText("Pausar")
+        self.pause_scan_btn.blockSignals(False)
+
+    def stop_scan(self):
+        if self.scanner_thread is not None and self.scanner_thread.isRunning():
+            self.scanner_thread.cancel()
+            self.stop_scan_btn.setEnabled(False)
+            self.pause_scan_btn.setEnabled(False)
+            self.files_status_bar.setText("Interrompendo busca...")
+
+    def toggle_pause_scan(self, paused: bool):
+        thread = self.scanner_thread
+        if thread is None or not thread.isRunning():
+            return
+        if paused:
+            thread.pause()
+            self.pause_scan_btn.setText("Continuar")
+            self.files_status_bar.setText(f"Busca pausada - {len(self.files_model.result)} arquivos encontrados")
+        else:
+            thread.resume()
+            self.pause_scan_btn.setText("Pausar")
+            self.files_status_bar.setText(f"Buscando... {len(self.files_model.result)} arquivos encontrados")
+
+    @staticmethod
+    def update_progress_bar(bar: QProgressBar, progress: ScanProgress):
+        """Barra determinada quando há estimativa do total, senão indeterminada"""
+        fraction = progress.fraction
+        if fraction is None:
+            bar.setRange(0, 0)
+        else:
+            bar.setRange(0, 1000)
+            bar.setValue(int(fraction * 1000))
+
+    def show_files_progress(self, progress: ScanProgress):
+        if self.sender() is not self.scanner_thread or progress.finished:
+            return
+        self.update_progress_bar(self.files_progress_bar, progress)
+        state = "Busca pausada" if self.scanner_thread.cancel_token.paused else "Buscando..."
+        self.files_status_bar.setText(
+            f"{state} {progress.dirs_visited} pastas, {progress.files_examined} arquivos examinados, "
+            f"{progress.files_matched} encontrados ({format_size(progress.bytes_matched)}) - {progress.current_dir}"
+        )
+
+    def files_scan_cancelled(self, files: ScanResult):
+        if self.sender() is not self.scanner_thread:
+            return
+        self.display_files(files)
+        self.files_status_bar.setText(f"Busca interrompida - {len(files)} arquivos encontrados até o momento")
+
+    def append_files(self, files: ScanResult):
+        # Lotes de uma busca anterior não pertencem ao resultado exibido
+        if self.sender() is not self.scanner_thread:
+            return
+        # Resultados parciais: a ordenação final é aplicada em display_files
+        self.files_model.rows_appended(len(files))
 
-    def display_files(self, files: List[FileInfo]):
+    def display_files(self, files: ScanResult):
+        # Uma busca substituída pode terminar depois da atual começar
+        if self.sender() is not self.scanner_thread and self.sender() in self.stopping_threads:
+            return
+        self.set_scan_controls(running=False)
         self.files_progress_bar.setVisible(False)
-        self.files_table.setRowCount(len(files))
-        for row, file in enumerate(files):
-            filename = os.path.basename(file.path)
-            dirname = os.path.dirname(file.path)
-            self.files_table.setItem(row, 0, QTableWidgetItem(filename))
-            size_item = QTableWidgetItem()
-            size = file.size
-            if size >= 1024**3:
-                size_item.setData(Qt.DisplayRole, f"{size / (1024**3):.2f} GB")
-            elif size >= 1024**2:
-                size_item.setData(Qt.DisplayRole, f"{size / (1024**2):.2f} MB")
-            elif size >= 1024:
-                size_item.setData(Qt.DisplayRole, f"{size / 1024:.2f} KB")
-            else:
-                size_item.setData(Qt.DisplayRole, f"{size} B")
-            self.files_table.setItem(row, 1, size_item)
-            self.files_table.setItem(row, 2, QTableWidgetItem(file.extension))
-            date_item = QTableWidgetItem()
-            date_item.setData(Qt.DisplayRole, time.strftime("%Y-%m-%d %H:%M", time.localtime(file.last_modified)))
-            self.files_table.setItem(row, 3, date_item)
-            self.files_table.setItem(row, 4, QTableWidgetItem(dirname))
+        thread = self.sender() if isinstance(self.sender(), ScannerThread) else None
+        with phase(thread.instrumentation if thread is not None else None, "populate_table"):
+            self.files_model.set_result(files, sorted_by=(1, Qt.DescendingOrder))
+        self.files_table.horizontalHeader().setSortIndicator(1, Qt.DescendingOrder)
+        self.files_table.setSortingEnabled(True)
         self.delete_file_btn.setEnabled(len(files) > 0)
         self.open_folder_btn.setEnabled(len(files) > 0)
-        total_size = sum(f.size for f in files)
-        if total_size >= 1024**3:
-            total_size_str = f"{total_size / (1024**3):.2f} GB"
-        elif total_size >= 1024**2:
-            total_size_str = f"{total_size / (1024**2):.2f} MB"
-        else:
-            total_size_str = f"{total_size / 1024:.2f} KB"
-        self.files_status_bar.setText(f"Encontrados {len(files)} arquivos - Total: {total_size_str}")
+        self.update_files_summary(files)
         self.visual_feedback("Busca concluída!", success=True)
+        self.show_diagnostics(thread, "Busca de arquivos")
+        self.start_file_watch()
+
+    def update_files_summary(self, files: ScanResult):
+        """Quantidade e total (contador exato do ScanResult) exibidos abaixo da tabela"""
+        stats = self.scanner_thread.stats if self.scanner_thread is not None else ScanStats()
+        pruned = f", {stats.dirs_pruned} pastas ignoradas pelo filtro" if stats.dirs_pruned else ""
+        self.files_status_bar.setText(
+            f"Encontrados {len(files)} arquivos - Total: {format_size(files.total_size)} "
+            f"({stats.dirs_per_second:.0f} pastas/s, {stats.workers} threads{pruned})"
+        )
+
+    def toggle_file_watch(self, enabled: bool):
+        if enabled:
+            self.start_file_watch()
+        else:
+            self.stop_file_watch()
+
+    def start_file_watch(self):
+        """Observa as pastas da última busca concluída, se a opção estiver marcada"""
+        self.stop_file_watch()
+        thread = self.scanner_thread
+        # Com a busca em andamento, o monitoramento começa em display_files
+        if not self.watch_files_input.isChecked() or thread is None or self.stop_scan_btn.isEnabled():
+            return
+        # Resultados parciais ou só com os maiores N não têm como ser mantidos
+        if thread.cancel_token.cancelled or thread.kwargs.get("top_n"):
+            return
+        directories, min_size, max_size, extensions = thread.args
+        self.watch_bridge = FileWatchBridge(self)
+        self.watch_bridge.changes_ready.connect(self.apply_file_changes)
+        self.file_watcher = SystemScanner.watch_files(
+            directories, self.watch_bridge.changes_ready.emit, min_size, max_size, extensions,
+            query=thread.kwargs.get("query"), exclude=thread.kwargs.get("exclude"),
+            max_depth=thread.kwargs.get("max_depth"), same_filesystem=thread.kwargs.get("same_filesystem", False),
+            skip_reparse_points=thread.kwargs.get("skip_reparse_points", False)
+        )
+
+    def stop_file_watch(self):
+        if self.file_watcher is not None:
+            # Não espera a releitura em andamento: o lote dela é descartado
+            self.file_watcher.stop(timeout=0)
+            self.file_watcher = None
+        if self.watch_bridge is not None:
+            self.watch_bridge.deleteLater()
+            self.watch_bridge = None
+
+    def apply_file_changes(self, changes):
+        # Lotes de um monitoramento encerrado não pertencem ao resultado exibido
+        if self.sender() is not self.watch_bridge:
+            return
+        files = self.files_model.result
+        self.files_model.apply_changes(changes)
+        has_rows = len(files) > 0
+        self.open_folder_btn.setEnabled(has_rows)
+        if self.delete_thread is None or not self.delete_thread.isRunning():
+            self.delete_file_btn.setEnabled(has_rows)
+        self.files_status_bar.setText(
+            f"Atualizado: {len(changes.dirs) + len(changes.trees)} pasta(s) alterada(s) - "
+            f"{len(files)} arquivos, Total: {format_size(files.total_size)}"
+        )
+
+    def scan_folders(self):
+        self.cancel_thread(self.folders_thread)
+        self.folders_status_bar.setText("Calculando o tamanho das pastas...")
+        self.folders_status_bar.setStyleSheet("color: #1e3a8a;")
+        self.folders_progress_bar.setVisible(True)
+        self.folders_progress_bar.setRange(0, 0)
+        self.scan_folders_btn.setEnabled(False)
+        self.open_dir_btn.setEnabled(False)
+        directories = [d.strip() for d in self.folders_dirs_input.text().split(",") if d.strip()]
+        self.folders_model.set_tree(DirTree())
+        self.folders_thread = ScannerThread("folders", directories, use_index=True)
+        self.folders_thread.instrumentation = self.new_instrumentation()
+        self.folders_thread.scan_progress.connect(self.show_folders_progress)
+        self.folders_thread.scan_complete.connect(self.display_folders)
+        self.folders_thread.scan_cancelled.connect(self.folders_scan_cancelled)
+        self.folders_thread.scan_error.connect(self.show_error)
+        self.folders_thread.start()
+        self.stop_folders_btn.setEnabled(True)
+
+    def stop_folders_scan(self):
+        if self.folders_thread is not None and self.folders_thread.isRunning():
+            self.folders_thread.cancel()
+            self.stop_folders_btn.setEnabled(False)
+            self.folders_status_bar.setText("Interrompendo análise...")
+
+    def show_folders_progress(self, progress: ScanProgress):
+        if self.sender() is not self.folders_thread or progress.finished:
+            return
+        self.update_progress_bar(self.folders_progress_bar, progress)
+        self.folders_status_bar.setText(
+            f"Calculando... {progress.dirs_visited} pastas, {format_size(progress.bytes_examined)} "
+            f"- {progress.current_dir}"
+        )
+
+    def folders_scan_cancelled(self, tree: DirTree):
+        if self.sender() is not self.folders_thread:
+            return
+        self.display_folders(tree)
+        self.folders_status_bar.setText(f"Análise interrompida - {len(tree)} pastas analisadas até o momento")
+
+    def display_folders(self, tree: DirTree):
+        if self.sender() is not self.folders_thread and self.sender() in self.stopping_threads:
+            return
+        self.folders_progress_bar.setVisible(False)
+        self.scan_folders_btn.setEnabled(True)
+        self.stop_folders_btn.setEnabled(False)
+        self.folders_model.set_tree(tree)
+        # Já mostra o primeiro nível de cada diretório escaneado
+        for row in range(self.folders_model.rowCount()):
+            self.folders_tree.expand(self.folders_model.index(row, 0))
+        self.open_dir_btn.setEnabled(len(tree) > 0)
+        total_size = sum(root.total_size for root in tree.roots)
+        stats = self.folders_thread.stats
+        self.folders_status_bar.setText(
+            f"{len(tree)} pastas analisadas - Total: {format_size(total_size)} "
+            f"({stats.dirs_per_second:.0f} pastas/s, {stats.workers} threads)"
+        )
+        self.folders_status_bar.setStyleSheet("color: #000;")
+        self.show_diagnostics(self.sender() if isinstance(self.sender(), ScannerThread) else None, "Análise de pastas")
+
+    def open_folder_location(self):
+        node = self.folders_model.node(self.folders_tree.currentIndex())
+        if node is not None:
+            if os.path.exists(node.path):
+                os.startfile(node.path)
+                self.visual_feedback("Abrindo pasta...", success=True)
+            else:
+                self.visual_feedback("Diretório não encontrado.", success=False)
 
     def uninstall_program(self):
         selected_row = self.programs_table.currentRow()
@@ -575,26 +1340,13 @@ class FileScannerWindow(QMainWindow):
                     self.status_bar.setText("Erro ao desinstalar programa")
 
     def delete_files(self):
-        selected_rows = set(index.row() for index in self.files_table.selectedIndexes())
+        selected = self.files_table.selectionModel().selectedRows()
+        selected_rows = [index.row() for index in selected]
         if not selected_rows:
             self.visual_feedback("Nenhum arquivo selecionado.", success=False)
             return
-        file_paths = []
-        total_size = 0
-        for row in selected_rows:
-            file_name = self.files_table.item(row, 0).text()
-            file_dir = self.files_table.item(row, 4).text()
-            file_path = os.path.join(file_dir, file_name)
-            file_paths.append(file_path)
-            size_text = self.files_table.item(row, 1).text()
-            if "GB" in size_text:
-                total_size += float(size_text.replace(" GB", "")) * 1024**3
-            elif "MB" in size_text:
-                total_size += float(size_text.replace(" MB", "")) * 1024**2
-            elif "KB" in size_text:
-                total_size += float(size_text.replace(" KB", "")) * 1024
-            else:
-                total_size += float(size_text.replace(" B", ""))
+        file_paths = [self.files_model.path(row) for row in selected_rows]
+        total_size = sum(self.files_model.size(row) for row in selected_rows)
         if total_size >= 1024**3:
             total_size_str = f"{total_size / (1024**3):.2f} GB"
         elif total_size >= 1024**2:
@@ -627,21 +1379,59 @@ class FileScannerWindow(QMainWindow):
         """)
         reply = msg_box.exec()
         if reply == QMessageBox.Yes:
-            success_count = 0
-            for file_path in file_paths:
-                if SystemScanner.delete_file(file_path):
-                    success_count += 1
-            self.files_status_bar.setText(f"{success_count}/{len(file_paths)} arquivos excluídos")
-            if success_count > 0:
-                self.visual_feedback("Arquivos excluídos!", success=True)
-                self.scan_files()
-            if success_count < len(file_paths):
-                self.visual_feedback(f"{len(file_paths) - success_count} arquivo(s) não puderam ser excluídos.", success=False)
+            self.delete_file_btn.setEnabled(False)
+            self.files_status_bar.setText(f"Excluindo {len(file_paths)} arquivo(s)...")
+            self.files_status_bar.setStyleSheet("color: #1e3a8a;")
+            self.files_progress_bar.setVisible(True)
+            self.files_progress_bar.setRange(0, len(file_paths))
+            self.files_progress_bar.setValue(0)
+            self.delete_thread = DeleteThread(file_paths)
+            # Acompanham as linhas mesmo se a tabela for reordenada durante a exclusão
+            self.delete_thread.rows = [QPersistentModelIndex(index) for index in selected]
+            self.delete_thread.result = self.files_model.result
+            self.delete_thread.delete_progress.connect(self.show_delete_progress)
+            self.delete_thread.delete_complete.connect(self.files_deleted)
+            self.delete_thread.delete_error.connect(self.show_error)
+            self.delete_thread.finished.connect(
+                lambda: self.delete_file_btn.setEnabled(self.files_model.rowCount() > 0 and not self.stop_scan_btn.isEnabled())
+            )
+            self.delete_thread.start()
+
+    def show_delete_progress(self, progress: DeleteProgress):
+        self.files_progress_bar.setValue(progress.done)
+        if progress.pending_elevation:
+            self.files_status_bar.setText(
+                f"Aguardando permissão de administrador para {progress.pending_elevation} arquivo(s)..."
+            )
+        else:
+            self.files_status_bar.setText(f"Excluindo... {progress.done}/{progress.total}")
+
+    def files_deleted(self, results: List[DeleteResult]):
+        self.files_progress_bar.setVisible(False)
+        thread = self.sender()
+        success_count = sum(1 for result in results if result.deleted)
+        # Tira da tabela só o que foi excluído (se ela ainda mostra o mesmo resultado)
+        files = self.files_model.result
+        if success_count and thread.result is files:
+            rows = [row.row() for row, result in zip(thread.rows, results) if result.deleted and row.isValid()]
+            # Pastas excluídas levam junto as linhas de dentro delas
+            deleted_dirs = [self.files_model.path(row) for row in rows if files.is_dirs[files.storage_index(row)]]
+            if deleted_dirs:
+                rows += files.positions(files.rows_under(deleted_dirs)).values()
+            self.files_model.remove_rows(rows)
+        self.files_status_bar.setText(
+            f"{success_count}/{len(results)} arquivos excluídos - restam {len(files)} arquivos, "
+            f"Total: {format_size(files.total_size)}"
+        )
+        if success_count > 0:
+            self.visual_feedback("Arquivos excluídos!", success=True)
+        if success_count < len(results):
+            self.visual_feedback(f"{len(results) - success_count} arquivo(s) não puderam ser excluídos.", success=False)
 
     def open_file_location(self):
-        selected_row = self.files_table.currentRow()
+        selected_row = self.files_table.currentIndex().row()
         if selected_row >= 0:
-            file_dir = self.files_table.item(selected_row, 4).text()
+            file_dir = self.files_model.directory(selected_row)
             if os.path.exists(file_dir):
                 os.startfile(file_dir)
                 self.visual_feedback("Abrindo pasta...", success=True)
@@ -649,7 +1439,12 @@ class FileScannerWindow(QMainWindow):
                 self.visual_feedback("Diretório não encontrado.", success=False)
 
     def show_error(self, error_msg):
+        self.build_pending_tabs()
         self.files_progress_bar.setVisible(False)
+        self.folders_progress_bar.setVisible(False)
+        self.scan_folders_btn.setEnabled(True)
+        self.stop_folders_btn.setEnabled(False)
+        self.set_scan_controls(running=False)
         self.status_bar.setText("Erro durante a operação")
         self.status_bar.setStyleSheet("color: #b91c1c;")
         self.files_status_bar.setText("Erro durante a operação")
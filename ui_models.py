@@ -0,0 +1,284 @@
+import time
+from typing import List, Optional
+from PySide6.QtCore import Qt, QAbstractItemModel, QAbstractTableModel, QModelIndex
+from script import ChangeSet, ScanResult, DirTree, DirNode
+
+
+def format_size(size: int) -> str:
+    """Formata um tamanho em bytes como na tabela de arquivos"""
+    if size >= 1024**3:
+        return f"{size / (1024**3):.2f} GB"
+    if size >= 1024**2:
+        return f"{size / (1024**2):.2f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.2f} KB"
+    return f"{size} B"
+
+
+def format_duration(seconds: float) -> str:
+    """Formata uma duração aproximada (ex.: tempo até um disco encher)"""
+    if seconds < 60:
+        return "< 1 min"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.0f} dias"
+
+
+class FilesTableModel(QAbstractTableModel):
+    """
+    Modelo virtual da tabela de arquivos sobre as colunas de um ScanResult.
+    As células são formatadas sob demanda em data() (só as linhas visíveis
+    são consultadas pela view) e as linhas são expostas aos poucos via
+    canFetchMore/fetchMore.
+    """
+
+    HEADERS = ["Arquivo", "Tamanho", "Extensão", "Modificado", "Localização"]
+    # Colunas do ScanResult usadas para ordenar (valores brutos, não o texto exibido)
+    SORT_COLUMNS = ["name", "size", "extension", "mtime", "directory"]
+    FETCH_BATCH = 5000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._result = ScanResult()
+        # Linhas que já podem ser lidas com segurança (o ScanResult pode estar
+        # crescendo em outra thread) e linhas já expostas à view
+        self._available = 0
+        self._loaded = 0
+        # (coluna, ordem) em que o resultado já está ordenado
+        self._sorted_by = None
+
+    @property
+    def result(self) -> ScanResult:
+        return self._result
+
+    def set_result(self, result: ScanResult, available: Optional[int] = None, sorted_by=None):
+        """
+        Troca o resultado exibido. available indica quantas linhas já estão
+        prontas (padrão: todas) e sorted_by a (coluna, ordem) em que o
+        resultado já está, para a view não reordená-lo à toa.
+        """
+        self.beginResetModel()
+        self._result = result
+        self._available = len(result) if available is None else available
+        self._loaded = min(self._available, self.FETCH_BATCH)
+        self._sorted_by = sorted_by
+        self.endResetModel()
+
+    def rows_appended(self, count: int):
+        """Publica linhas acrescentadas ao resultado durante uma busca incremental"""
+        self._available += count
+        # Mantém a primeira página preenchida sem depender da rolagem
+        if self._loaded < self.FETCH_BATCH:
+            self.fetchMore(QModelIndex())
+
+    def remove_rows(self, rows: List[int]):
+        """
+        Remove linhas (posições atuais) do resultado e da view, um trecho
+        contíguo por vez, sem recarregar o modelo. Linhas ainda não expostas
+        à view saem só do resultado.
+        """
+        rows = sorted({row for row in rows if 0 <= row < self._available}, reverse=True)
+        start = 0
+        while start < len(rows):
+            end = start
+            while end + 1 < len(rows) and rows[end + 1] == rows[end] - 1:
+                end += 1
+            first, last = rows[end], rows[start]
+            if first >= self._loaded:
+                self._result.remove_positions(range(first, last + 1))
+                self._available -= last - first + 1
+            else:
+                # Trechos que cruzam o limite são divididos: a parte não exposta sai antes
+                if last >= self._loaded:
+                    self._result.remove_positions(range(self._loaded, last + 1))
+                    self._available -= last - self._loaded + 1
+                    last = self._loaded - 1
+                self.beginRemoveRows(QModelIndex(), first, last)
+                self._result.remove_positions(range(first, last + 1))
+                self._loaded -= last - first + 1
+                self._available -= last - first + 1
+                self.endRemoveRows()
+            start = end + 1
+
+    def apply_changes(self, changes: ChangeSet):
+        """
+        Aplica um lote do FileWatcher: remove as linhas das pastas relidas,
+        acrescenta as linhas atuais delas e reordena uma vez pela coluna ativa
+        """
+        result = self._result
+        stale = changes.stale_rows(result)
+        if stale:
+            self.remove_rows(list(result.positions(stale).values()))
+        added = len(changes.rows)
+        if added:
+            # Com tudo exposto, as novas linhas entram na view; senão chegam via fetchMore
+            expose = self._loaded == self._available
+            if expose:
+                self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + added - 1)
+            result.extend(changes.rows)
+            self._available += added
+            if expose:
+                self._loaded += added
+                self.endInsertRows()
+        if added and self._sorted_by is not None:
+            column, order = self._sorted_by
+            self._sorted_by = None
+            self.sort(column, order)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < self._available
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.FETCH_BATCH, self._available - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        result = self._result
+        i = result.storage_index(index.row())
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return result.names[i]
+            if column == 1:
+                return format_size(result.sizes[i])
+            if column == 2:
+                return result.extension_at(i)
+            if column == 3:
+                return time.strftime("%Y-%m-%d %H:%M", time.localtime(result.mtimes[i]))
+            if column == 4:
+                return result.dirs[result.parents[i]]
+        elif role == Qt.TextAlignmentRole and column == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        if self._sorted_by == (column, order):
+            return
+        result = self._result
+        self.layoutAboutToBeChanged.emit()
+        # Guarda a linha real de cada índice persistente (seleção) para remapeá-lo depois
+        persistent = self.persistentIndexList()
+        storage = [result.storage_index(index.row()) for index in persistent]
+        result.sort_by(self.SORT_COLUMNS[column], descending=order == Qt.DescendingOrder)
+        if persistent:
+            positions = result.positions(storage)
+            self.changePersistentIndexList(persistent, [
+                self.index(positions[s], index.column()) if positions[s] < self._loaded else QModelIndex()
+                for s, index in zip(storage, persistent)
+            ])
+        self._sorted_by = (column, order)
+        self.layoutChanged.emit()
+
+    def path(self, row: int) -> str:
+        return self._result.path_at(self._result.storage_index(row))
+
+    def directory(self, row: int) -> str:
+        result = self._result
+        return result.dirs[result.parents[result.storage_index(row)]]
+
+    def size(self, row: int) -> int:
+        return self._result.sizes[self._result.storage_index(row)]
+
+
+class DirTreeModel(QAbstractItemModel):
+    """
+    Modelo em árvore sobre um DirTree. Cada índice aponta para o DirNode
+    (internalPointer) e as subpastas de um nó só são ordenadas por tamanho
+    quando a view o expande.
+    """
+
+    HEADERS = ["Pasta", "Tamanho", "% da pasta pai", "Arquivos", "Maior item"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tree = DirTree()
+
+    @property
+    def tree(self) -> DirTree:
+        return self._tree
+
+    def set_tree(self, tree: DirTree):
+        self.beginResetModel()
+        self._tree = tree
+        self.endResetModel()
+
+    def _children(self, parent: QModelIndex):
+        return parent.internalPointer().sorted_children() if parent.isValid() else self._tree.roots
+
+    def node(self, index: QModelIndex) -> Optional[DirNode]:
+        return index.internalPointer() if index.isValid() else None
+
+    def index(self, row, column, parent=QModelIndex()):
+        children = self._children(parent)
+        if not 0 <= row < len(children) or not 0 <= column < len(self.HEADERS):
+            return QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() and parent.column() != 0:
+            return 0
+        return len(self._children(parent))
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()) -> bool:
+        # Evita ordenar as subpastas só para desenhar o indicador de expansão
+        return bool(parent.internalPointer().children) if parent.isValid() else bool(self._tree.roots)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node: DirNode = index.internalPointer()
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return node.path if node.parent is None else node.name
+            if column == 1:
+                return format_size(node.total_size)
+            if column == 2:
+                if node.parent is None or not node.parent.total_size:
+                    return ""
+                return f"{100 * node.total_size / node.parent.total_size:.1f}%"
+            if column == 3:
+                return str(node.total_files)
+            if column == 4:
+                name, size = node.largest_child
+                return f"{name} ({format_size(size)})" if name else ""
+        elif role == Qt.TextAlignmentRole and column in (1, 2, 3):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
@@ -0,0 +1,260 @@
+import os
+import re
+import sys
+import time
+import shutil
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Idade máxima de uma amostra antes de o disco ser consultado de novo
+DEFAULT_TTL = 5.0
+# Amostras guardadas por volume (com o intervalo padrão, 1 hora de histórico)
+DEFAULT_HISTORY = 360
+# Intervalo da amostragem em segundo plano
+DEFAULT_INTERVAL = 10.0
+
+# Sistemas de arquivos virtuais ignorados na lista de volumes do Linux
+_PSEUDO_FILESYSTEMS = {
+    "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs", "devpts", "devtmpfs",
+    "efivarfs", "fusectl", "hugetlbfs", "mqueue", "nsfs", "overlay", "proc", "pstore", "ramfs",
+    "securityfs", "squashfs", "sysfs", "tmpfs", "tracefs",
+}
+_OCTAL_ESCAPE = re.compile(rb"\\([0-7]{3})")
+
+
+@dataclass(frozen=True)
+class DiskSample:
+    """Uso de um volume em um instante (time.time())"""
+    timestamp: float
+    total: int
+    used: int
+    free: int
+
+    @property
+    def percent_used(self) -> float:
+        return (self.used / self.total) * 100 if self.total > 0 else 0
+
+
+@dataclass
+class VolumeStatus:
+    """Última amostra de um volume com a tendência calculada sobre o histórico"""
+    path: str
+    total: int
+    used: int
+    free: int
+    percent_used: float
+    sampled_at: float
+    # Variação do espaço usado em bytes/s (None sem histórico suficiente)
+    growth_rate: Optional[float] = None
+    # Segundos até encher no ritmo atual (None se o uso não está crescendo)
+    seconds_to_full: Optional[float] = None
+
+
+def list_volumes() -> List[str]:
+    """Raízes dos volumes montados (letras de unidade no Windows, pontos de montagem no Linux)"""
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        mask = kernel32.GetLogicalDrives()
+        volumes = []
+        for index in range(26):
+            if mask & (1 << index):
+                root = f"{chr(ord('A') + index)}:\\"
+                # 1 = raiz inválida; 5 = CD/DVD (consultar sem mídia trava ou falha)
+                if kernel32.GetDriveTypeW(root) not in (1, 5):
+                    volumes.append(root)
+        return volumes
+
+    volumes = []
+    try:
+        with open("/proc/mounts", "rb") as fh:
+            for line in fh:
+                parts = line.split()
+                if len(parts) < 3 or os.fsdecode(parts[2]) in _PSEUDO_FILESYSTEMS:
+                    continue
+                # Espaços e outros caracteres vêm escapados em octal (\040)
+                mount_point = os.fsdecode(_OCTAL_ESCAPE.sub(lambda m: bytes([int(m.group(1), 8)]), parts[1]))
+                if mount_point not in volumes:
+                    volumes.append(mount_point)
+    except OSError as e:
+        logger.debug(f"Error reading mounted volumes: {e}")
+    return volumes or [os.path.abspath(os.sep)]
+
+
+class VolumeMonitor:
+    """
+    Cache compartilhado do uso de disco por volume.
+
+    sample() só consulta o disco quando a última amostra do volume passou
+    de ttl segundos; cada amostra entra em um histórico circular (deque com
+    maxlen) usado para estimar a tendência e o tempo até encher. Pode ser
+    lido ao mesmo tempo pela interface e pelos scanners: o estado fica sob
+    um lock, e as consultas ao disco são feitas fora dele.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        history: int = DEFAULT_HISTORY,
+        list_volumes: Callable[[], List[str]] = list_volumes,
+        disk_usage: Callable[[str], tuple] = shutil.disk_usage
+    ):
+        self.ttl = ttl
+        self.history_size = history
+        self._list_volumes = list_volumes
+        self._disk_usage = disk_usage
+        self._lock = threading.Lock()
+        self._history: Dict[str, Deque[DiskSample]] = {}
+        self._volumes: Optional[List[str]] = None
+        self._volumes_time = 0.0
+        self._stop: Optional[threading.Event] = None
+        self._wake = threading.Event()
+        self._force = False
+        self._thread: Optional[threading.Thread] = None
+
+    def volumes(self, refresh: bool = False) -> List[str]:
+        """Volumes montados (a lista também respeita o ttl)"""
+        with self._lock:
+            if not refresh and self._volumes is not None and time.monotonic() - self._volumes_time < self.ttl:
+                return list(self._volumes)
+        volumes = self._list_volumes()
+        with self._lock:
+            self._volumes = volumes
+            self._volumes_time = time.monotonic()
+        return list(volumes)
+
+    def latest(self, path: str) -> Optional[DiskSample]:
+        """Última amostra do volume, sem consultar o disco"""
+        with self._lock:
+            samples = self._history.get(path)
+            return samples[-1] if samples else None
+
+    def sample(self, path: str, max_age: Optional[float] = None) -> Optional[DiskSample]:
+        """
+        Amostra do volume com no máximo max_age segundos (padrão: ttl),
+        consultando o disco só se necessário. None se o volume não responder.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        cached = self.latest(path)
+        if cached is not None and time.time() - cached.timestamp < max_age:
+            return cached
+        try:
+            total, used, free = self._disk_usage(path)
+        except OSError as e:
+            logger.error(f"Error getting disk usage for {path}: {e}")
+            return None
+        sample = DiskSample(time.time(), total, used, free)
+        with self._lock:
+            samples = self._history.get(path)
+            if samples is None:
+                samples = self._history[path] = deque(maxlen=self.history_size)
+            # Outra thread pode ter amostrado o mesmo volume enquanto este consultava o disco
+            if not samples or samples[-1].timestamp <= sample.timestamp:
+                samples.append(sample)
+        return sample
+
+    def sample_all(self, max_age: Optional[float] = None) -> Dict[str, DiskSample]:
+        samples = {}
+        for path in self.volumes():
+            sample = self.sample(path, max_age)
+            if sample is not None:
+                samples[path] = sample
+        return samples
+
+    def usage(self, path: str) -> Dict[str, float]:
+        """Uso do volume no formato de SystemScanner.get_disk_usage (zeros se falhar)"""
+        sample = self.sample(path)
+        if sample is None:
+            return {"total": 0, "used": 0, "free": 0, "percent_used": 0, "path": path}
+        return {
+            "total": sample.total,
+            "used": sample.used,
+            "free": sample.free,
+            "percent_used": sample.percent_used,
+            "path": path
+        }
+
+    def history(self, path: str) -> List[DiskSample]:
+        """Cópia do histórico do volume, da amostra mais antiga para a mais nova"""
+        with self._lock:
+            return list(self._history.get(path, ()))
+
+    @staticmethod
+    def growth_rate(samples: List[DiskSample]) -> Optional[float]:
+        """Inclinação (bytes/s) da reta de mínimos quadrados do espaço usado"""
+        if len(samples) < 2:
+            return None
+        t0 = samples[0].timestamp
+        n = len(samples)
+        mean_t = sum(s.timestamp - t0 for s in samples) / n
+        mean_used = sum(s.used for s in samples) / n
+        variance = sum((s.timestamp - t0 - mean_t) ** 2 for s in samples)
+        if variance <= 0:
+            return None
+        covariance = sum((s.timestamp - t0 - mean_t) * (s.used - mean_used) for s in samples)
+        return covariance / variance
+
+    def status(self, path: str) -> Optional[VolumeStatus]:
+        """Situação do volume a partir do histórico já amostrado (sem consultar o disco)"""
+        samples = self.history(path)
+        if not samples:
+            return None
+        last = samples[-1]
+        rate = self.growth_rate(samples)
+        seconds_to_full = last.free / rate if rate and rate > 0 else None
+        return VolumeStatus(
+            path=path,
+            total=last.total,
+            used=last.used,
+            free=last.free,
+            percent_used=last.percent_used,
+            sampled_at=last.timestamp,
+            growth_rate=rate,
+            seconds_to_full=seconds_to_full
+        )
+
+    def statuses(self) -> List[VolumeStatus]:
+        """Situação de todos os volumes conhecidos, sem consultar o disco"""
+        with self._lock:
+            paths = list(self._volumes or self._history)
+        return [status for status in map(self.status, paths) if status is not None]
+
+    def start(self, interval: float = DEFAULT_INTERVAL):
+        """Amostra todos os volumes a cada interval segundos em uma thread de fundo"""
+        if self.running:
+            return
+        stop = self._stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                force, self._force = self._force, False
+                try:
+                    # Uma amostra de até meio intervalo atrás (ex.: de um scanner) ainda vale
+                    self.sample_all(max_age=0 if force else min(self.ttl, interval / 2))
+                except Exception as e:
+                    logger.error(f"Error sampling volumes: {e}")
+                self._wake.wait(interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name="VolumeMonitor", daemon=True)
+        self._thread.start()
+
+    def refresh(self):
+        """Pede à thread de fundo uma nova amostra de todos os volumes, ignorando o ttl"""
+        self._force = True
+        self._wake.set()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
@@ -0,0 +1,501 @@
+import os
+import sys
+import time
+import errno
+import struct
+import select
+import logging
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from scanner_engine import ParallelWalker, ScanFilter
+from scan_result import ScanResult
+
+logger = logging.getLogger(__name__)
+
+# Espera sem novos eventos antes de entregar um lote de mudanças
+DEBOUNCE = 0.5
+# Atraso máximo de um lote durante uma rajada contínua de eventos
+MAX_DELAY = 2.0
+# Intervalo entre comparações do modo de polling
+POLL_INTERVAL = 2.0
+
+
+def _prefix(path: str) -> str:
+    return os.path.join(path, "")
+
+
+def _outermost(paths: Iterable[str]) -> List[str]:
+    """Remove os caminhos que estão dentro de outro caminho da lista"""
+    result: List[str] = []
+    for path in sorted(set(paths)):
+        if not result or not _prefix(path).startswith(_prefix(result[-1])):
+            result.append(path)
+    return result
+
+
+@dataclass
+class ChangeSet:
+    """
+    Mudanças coalescidas de um intervalo: as pastas relidas (só o conteúdo
+    direto), as subárvores novas varridas por inteiro e as linhas atuais
+    delas que passam pelo filtro
+    """
+    dirs: List[str] = field(default_factory=list)
+    trees: List[str] = field(default_factory=list)
+    rows: ScanResult = field(default_factory=ScanResult)
+    # Notificações brutas agrupadas neste lote
+    events: int = 0
+
+    def stale_rows(self, result: ScanResult) -> List[int]:
+        """
+        Índices de armazenamento das linhas de result substituídas por este
+        lote: as das pastas relidas, as das subárvores novas e as de pastas
+        dentro delas que deixaram de existir
+        """
+        dirs = set(self.dirs)
+        trees = tuple(_prefix(tree) for tree in self.trees)
+        changed = tuple(_prefix(dirpath) for dirpath in self.dirs) + trees
+        stale_ids = set()
+        for dir_id, dirpath in enumerate(result.dirs):
+            prefix = _prefix(dirpath)
+            if dirpath in dirs or (trees and prefix.startswith(trees)):
+                stale_ids.add(dir_id)
+            elif prefix.startswith(changed) and not os.path.isdir(dirpath):
+                stale_ids.add(dir_id)
+        if not stale_ids:
+            return []
+        parents = result.parents
+        return [i for i in result.storage_indices() if parents[i] in stale_ids]
+
+
+class _Backend:
+    """
+    Fonte de notificações: chama notify(pasta, subárvore nova) até stop ser
+    sinalizado. skip(pasta), se informado, indica as subárvores que não
+    precisam ser observadas (exclusões do ScanFilter)
+    """
+
+    def __init__(self, roots: List[str], notify: Callable[[str, bool], None], skip: Optional[Callable[[str], bool]] = None):
+        self.roots = roots
+        self.notify = notify
+        self.skip = skip
+
+    def _subdirs(self, dirpath: str) -> List[str]:
+        """Subpastas (sem seguir links) que devem ser observadas"""
+        subdirs = []
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False) and not (self.skip and self.skip(entry.path)):
+                        subdirs.append(entry.path)
+                except OSError:
+                    continue
+        return subdirs
+
+    def run(self, stop: threading.Event):
+        raise NotImplementedError
+
+
+class PollingBackend(_Backend):
+    """
+    Compara o mtime de todas as pastas a cada intervalo. O mtime de uma pasta
+    muda quando entradas são criadas, removidas ou renomeadas nela; arquivos
+    que só mudam de conteúdo não são percebidos neste modo.
+    """
+
+    def __init__(
+        self,
+        roots: List[str],
+        notify: Callable[[str, bool], None],
+        interval: float = POLL_INTERVAL,
+        skip: Optional[Callable[[str], bool]] = None
+    ):
+        super().__init__(roots, notify, skip)
+        self.interval = interval
+
+    def _snapshot(self) -> Dict[str, float]:
+        mtimes: Dict[str, float] = {}
+        pending = list(self.roots)
+        while pending:
+            dirpath = pending.pop()
+            try:
+                mtimes[dirpath] = os.stat(dirpath).st_mtime
+                pending.extend(self._subdirs(dirpath))
+            except OSError as e:
+                logger.debug(f"Error polling {dirpath}: {e}")
+        return mtimes
+
+    def run(self, stop: threading.Event):
+        mtimes = self._snapshot()
+        while not stop.wait(self.interval):
+            current = self._snapshot()
+            for dirpath, mtime in current.items():
+                previous = mtimes.get(dirpath)
+                if previous is None:
+                    self.notify(dirpath, True)
+                elif previous != mtime:
+                    self.notify(dirpath, False)
+            for dirpath in mtimes.keys() - current.keys():
+                self.notify(os.path.dirname(dirpath), False)
+            mtimes = current
+
+
+class InotifyBackend(_Backend):
+    """inotify (Linux) via ctypes, com um watch por pasta"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONT_FOLLOW = 0x02000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, roots: List[str], notify: Callable[[str, bool], None], skip: Optional[Callable[[str], bool]] = None):
+        super().__init__(roots, notify, skip)
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths: Dict[int, str] = {}
+        # Os watches são criados já no construtor: mudanças feitas logo depois não se perdem
+        for root in roots:
+            self._watch_tree(root)
+
+    def _add_watch(self, dirpath: str):
+        import ctypes
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), self.MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                # Limite de fs.inotify.max_user_watches: o FileWatcher cai para o polling
+                raise OSError(error, "inotify watch limit reached")
+            logger.debug(f"Error watching {dirpath}: {os.strerror(error)}")
+            return
+        self._paths[wd] = dirpath
+
+    def _watch_tree(self, root: str):
+        pending = [root]
+        while pending:
+            dirpath = pending.pop()
+            self._add_watch(dirpath)
+            try:
+                pending.extend(self._subdirs(dirpath))
+            except OSError as e:
+                logger.debug(f"Error accessing {dirpath}: {e}")
+
+    def run(self, stop: threading.Event):
+        event_size = self._EVENT.size
+        try:
+            while not stop.is_set():
+                ready, _, _ = select.select([self._fd], [], [], 0.2)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                offset = 0
+                while offset + event_size <= len(data):
+                    wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+                    name = data[offset + event_size:offset + event_size + length].split(b"\0", 1)[0]
+                    offset += event_size + length
+                    self._handle(wd, mask, os.fsdecode(name))
+        finally:
+            os.close(self._fd)
+
+    def _handle(self, wd: int, mask: int, name: str):
+        if mask & self.IN_Q_OVERFLOW:
+            # Eventos perdidos: relê tudo
+            for root in self.roots:
+                self.notify(root, True)
+            return
+        dirpath = self._paths.get(wd)
+        if dirpath is None:
+            return
+        if mask & self.IN_IGNORED:
+            del self._paths[wd]
+            return
+        if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+            self.notify(os.path.dirname(dirpath), False)
+            return
+        if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+            subdir = os.path.join(dirpath, name)
+            if self.skip and self.skip(subdir):
+                self.notify(dirpath, False)
+                return
+            try:
+                self._watch_tree(subdir)
+            except OSError as e:
+                logger.warning(f"Stopped watching new directory {subdir}: {e}")
+            self.notify(subdir, True)
+        self.notify(dirpath, False)
+
+
+class ReadDirectoryChangesBackend(_Backend):
+    """ReadDirectoryChangesW (Windows) via ctypes, uma thread por raiz com bWatchSubtree"""
+
+    FILE_LIST_DIRECTORY = 0x0001
+    FILE_SHARE_ALL = 0x00000001 | 0x00000002 | 0x00000004
+    OPEN_EXISTING = 3
+    FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+    FILTER = 0x00000001 | 0x00000002 | 0x00000008 | 0x00000010  # nome de arquivo/pasta, tamanho, gravação
+    FILE_ACTION_ADDED = 1
+    FILE_ACTION_RENAMED_NEW_NAME = 5
+    _INFO = struct.Struct("III")
+
+    def __init__(self, roots: List[str], notify: Callable[[str, bool], None], skip: Optional[Callable[[str], bool]] = None):
+        super().__init__(roots, notify, skip)
+        import ctypes
+        from ctypes import wintypes
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateFileW.restype = wintypes.HANDLE
+        kernel32.CreateFileW.argtypes = [
+            wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+            wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE
+        ]
+        kernel32.ReadDirectoryChangesW.argtypes = [
+            wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD, wintypes.BOOL, wintypes.DWORD,
+            ctypes.POINTER(wintypes.DWORD), wintypes.LPVOID, wintypes.LPVOID
+        ]
+        kernel32.CancelIoEx.argtypes = [wintypes.HANDLE, wintypes.LPVOID]
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._kernel32 = kernel32
+        self._handles = {}
+        for root in roots:
+            handle = kernel32.CreateFileW(
+                root, self.FILE_LIST_DIRECTORY, self.FILE_SHARE_ALL, None,
+                self.OPEN_EXISTING, self.FILE_FLAG_BACKUP_SEMANTICS, None
+            )
+            if handle in (None, wintypes.HANDLE(-1).value):
+                raise ctypes.WinError(ctypes.get_last_error())
+            self._handles[root] = handle
+
+    def run(self, stop: threading.Event):
+        threads = [
+            threading.Thread(target=self._watch_root, args=(root, handle, stop), daemon=True)
+            for root, handle in self._handles.items()
+        ]
+        for thread in threads:
+            thread.start()
+        stop.wait()
+        # Interrompe as chamadas bloqueadas de ReadDirectoryChangesW
+        for handle in self._handles.values():
+            self._kernel32.CancelIoEx(handle, None)
+        for thread in threads:
+            thread.join()
+        for handle in self._handles.values():
+            self._kernel32.CloseHandle(handle)
+
+    def _watch_root(self, root: str, handle, stop: threading.Event):
+        buffer = self._ctypes.create_string_buffer(64 * 1024)
+        returned = self._wintypes.DWORD()
+        info_size = self._INFO.size
+        while not stop.is_set():
+            ok = self._kernel32.ReadDirectoryChangesW(
+                handle, buffer, len(buffer), True, self.FILTER, self._ctypes.byref(returned), None, None
+            )
+            if not ok:
+                if not stop.is_set():
+                    logger.error(f"Stopped watching {root}: {self._ctypes.WinError(self._ctypes.get_last_error())}")
+                return
+            if returned.value == 0:
+                # Buffer estourou: relê a raiz inteira
+                self.notify(root, True)
+                continue
+            data = buffer.raw[:returned.value]
+            offset = 0
+            while True:
+                next_offset, action, length = self._INFO.unpack_from(data, offset)
+                name = data[offset + info_size:offset + info_size + length].decode("utf-16-le")
+                path = os.path.join(root, name)
+                if action in (self.FILE_ACTION_ADDED, self.FILE_ACTION_RENAMED_NEW_NAME) and os.path.isdir(path):
+                    self.notify(path, True)
+                self.notify(os.path.dirname(path), False)
+                if not next_offset:
+                    break
+                offset += next_offset
+
+
+def default_backend() -> str:
+    if sys.platform == "win32":
+        return "windows"
+    if sys.platform.startswith("linux"):
+        return "inotify"
+    return "polling"
+
+
+class FileWatcher:
+    """
+    Mantém um resultado de varredura atualizado: recebe notificações do
+    sistema de arquivos (inotify, ReadDirectoryChangesW ou polling),
+    agrupa-as por pasta e, depois de debounce segundos sem eventos (ou no
+    máximo max_delay segundos depois do primeiro), relê só as pastas
+    afetadas e entrega um único ChangeSet ao callback, na thread do watcher.
+    """
+
+    def __init__(
+        self,
+        roots: List[str],
+        callback: Callable[[ChangeSet], None],
+        scan_filter: Optional[ScanFilter] = None,
+        workers: Optional[int] = None,
+        backend: Optional[str] = None,
+        debounce: float = DEBOUNCE,
+        max_delay: float = MAX_DELAY,
+        poll_interval: float = POLL_INTERVAL
+    ):
+        self.roots = [os.path.normpath(root) for root in roots if os.path.isdir(root)]
+        self.callback = callback
+        self.scan_filter = scan_filter or ScanFilter()
+        self.workers = workers
+        self.backend_name = backend or default_backend()
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._dirs: Set[str] = set()
+        self._trees: Set[str] = set()
+        self._events = 0
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _notify(self, dirpath: str, new_tree: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            (self._trees if new_tree else self._dirs).add(os.path.normpath(dirpath))
+            if not self._events:
+                self._first_event = now
+            self._events += 1
+            self._last_event = now
+        self._wake.set()
+
+    def _skipped(self, path: str) -> bool:
+        """Se a pasta está numa subárvore que a varredura não percorre (exclusões ou max_depth)"""
+        return self._depth(path) is None
+
+    def _depth(self, path: str) -> Optional[int]:
+        """Profundidade da pasta abaixo de sua raiz, ou None se o ScanFilter a deixa de fora"""
+        for root in self.roots:
+            if path == root:
+                return 0
+            if not path.startswith(_prefix(root)):
+                continue
+            current = root
+            parts = os.path.relpath(path, root).split(os.sep)
+            for depth, name in enumerate(parts, 1):
+                current = os.path.join(current, name)
+                if self.scan_filter.skips_subtree(current, name, depth):
+                    return None
+            return len(parts)
+        return None
+
+    def _make_backend(self) -> _Backend:
+        if self.backend_name == "polling":
+            return PollingBackend(self.roots, self._notify, self.poll_interval, skip=self._skipped)
+        try:
+            if self.backend_name == "windows":
+                return ReadDirectoryChangesBackend(self.roots, self._notify, skip=self._skipped)
+            return InotifyBackend(self.roots, self._notify, skip=self._skipped)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"Falling back to polling for file changes: {e}")
+            self.backend_name = "polling"
+            return PollingBackend(self.roots, self._notify, self.poll_interval, skip=self._skipped)
+
+    def start(self):
+        """Começa a observar (os eventos já são registrados quando start retorna)"""
+        backend = self._make_backend()
+        self._threads = [
+            threading.Thread(target=backend.run, args=(self._stop,), daemon=True),
+            threading.Thread(target=self._dispatch, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Watching {len(self.roots)} directories for changes ({self.backend_name})")
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _dispatch(self):
+        while not self._stop.is_set():
+            self._wake.wait(0.1)
+            self._wake.clear()
+            with self._lock:
+                if not self._events:
+                    continue
+                now = time.monotonic()
+                if now - self._last_event < self.debounce and now - self._first_event < self.max_delay:
+                    continue
+                dirs, trees, events = self._dirs, self._trees, self._events
+                self._dirs, self._trees, self._events = set(), set(), 0
+            try:
+                changes = self._collect(dirs, trees, events)
+            except Exception as e:
+                logger.error(f"Error reading changed directories: {e}")
+                continue
+            if not self._stop.is_set():
+                self.callback(changes)
+
+    def _collect(self, dirs: Set[str], trees: Set[str], events: int) -> ChangeSet:
+        """Relê as pastas alteradas e varre as subárvores novas"""
+        roots = tuple(_prefix(root) for root in self.roots)
+        trees_list = [tree for tree in _outermost(trees) if _prefix(tree).startswith(roots)]
+        tree_prefixes = tuple(_prefix(tree) for tree in trees_list)
+        dirs_list = sorted(
+            d for d in dirs if _prefix(d).startswith(roots) and not _prefix(d).startswith(tree_prefixes or ("\0",))
+        )
+        # Pastas excluídas pelo ScanFilter não fazem parte do resultado
+        depths = {path: self._depth(path) for path in dirs_list + trees_list}
+        dirs_list = [d for d in dirs_list if depths[d] is not None]
+        trees_list = [tree for tree in trees_list if depths[tree] is not None]
+        changes = ChangeSet(dirs=dirs_list, trees=trees_list, events=events)
+        # A linha de cada pasta relida pertence à pasta pai, que já está no lote se mudou
+        jobs = [(dirs_list, False, self.scan_filter)]
+        if self.scan_filter.max_depth is None:
+            jobs.append((trees_list, True, self.scan_filter))
+        else:
+            # A profundidade restante de cada subárvore nova depende de onde ela está
+            jobs.extend(
+                ([tree], True, replace(self.scan_filter, max_depth=self.scan_filter.max_depth - depths[tree]))
+                for tree in trees_list
+            )
+        for paths, recursive, scan_filter in jobs:
+            existing = [path for path in paths if os.path.isdir(path)]
+            if not existing:
+                continue
+            walker = ParallelWalker(scan_filter, workers=self.workers, recursive=recursive, include_roots=False)
+            for dirpath, rows in walker.walk(existing):
+                if rows:
+                    changes.rows.add_rows(dirpath, rows)
+        return changes